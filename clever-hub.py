@@ -1,5 +1,5 @@
 import os
-from pathlib import Path
+import json
 import numpy as np
 import pandas as pd
 import streamlit as st
@@ -7,17 +7,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.figure_factory as ff
-import unicodedata
 from datetime import datetime, timedelta
 import warnings
-import io
-import hashlib
-import requests
+import time
 from matplotlib.patches import Patch
 # -------------------- NOUVEL IMPORT AJOUTÉ --------------------
 import mplsoccer
 from mplsoccer import Pitch
-import matplotlib.cm as cm
+from matplotlib import colormaps
 import matplotlib.colors as mcolors
 warnings.filterwarnings('ignore')
 st.set_page_config(page_title="Football Hub - Analytics", page_icon="⚽", layout="wide")
@@ -92,6 +89,13 @@ st.markdown(
         font-weight: 700; 
         line-height: 1.2;
     }
+    .card-grid {
+        display: grid;
+        gap: 8px;
+        align-items: start;
+    }
+    .card-stack { display: flex; flex-direction: column; gap: 8px; }
+    .card-stack h5 { margin: 0 0 4px 0; font-size: 16px; }
     .avatar { 
         width: 54px; 
         height: 54px; 
@@ -139,362 +143,358 @@ st.markdown(
     unsafe_allow_html=True,
 )
 # -------------------- HELPERS AVANCÉS --------------------
-def get_mtime(path: Path) -> float:
-    try:
-        return path.stat().st_mtime
-    except FileNotFoundError:
-        return 0.0
-def to_num(x) -> pd.Series:
-    """Série numérique robuste — retourne TOUJOURS une pd.Series"""
-    if isinstance(x, pd.Series):
-        s = x.astype(str).str.replace(",", ".", regex=False)
-        return pd.to_numeric(s, errors="coerce").fillna(0)
-    elif isinstance(x, (list, tuple, np.ndarray)):
-        s = pd.Series(x).astype(str).str.replace(",", ".", regex=False)
-        return pd.to_numeric(s, errors="coerce").fillna(0)
-    else:
-        s = pd.Series([str(x)]).str.replace(",", ".", regex=False)
-        return pd.to_numeric(s, errors="coerce").fillna(0)
-def df_has_cols(df: pd.DataFrame, cols: list) -> bool:
-    return all(c in df.columns for c in cols)
-def norm_col(c: str) -> str:
-    c = unicodedata.normalize("NFKD", str(c)).encode("ascii", "ignore").decode("ascii")
-    return c.strip().lower().replace("  ", " ")
-def rename_like(df: pd.DataFrame, mapping: dict):
-    if df.empty: return df
-    norm_map = {col: norm_col(col) for col in df.columns}
-    inv = {norm_col(k): v for k, v in mapping.items()}
-    new_names = {}
-    for col, ncol in norm_map.items():
-        if ncol in inv:
-            new_names[col] = inv[ncol]
-    return df.rename(columns=new_names)
-def calculate_performance_score(player_data):
-    """Calcule un score de performance global basé sur plusieurs métriques"""
-    if player_data.empty:
-        return 0
-    weights = {
-        'passing_efficiency': 0.25,
-        'duel_success': 0.20,
-        'attacking_contribution': 0.25,
-        'defensive_contribution': 0.20,
-        'ball_retention': 0.10
-    }
-    passes_tent_col = player_data.get("Passe tentées", pd.Series([0]))
-    passes_comp_col = player_data.get("Passe complete", pd.Series([0]))
-    passes_tent = to_num(passes_tent_col).sum()
-    passes_comp = to_num(passes_comp_col).sum()
-    passing_eff = (passes_comp / passes_tent * 100) if passes_tent > 0 else 0
-    duel_tot_col_name = "Duel tenté" if "Duel tenté" in player_data.columns else "Duel tente"
-    duels_tent_col = player_data.get(duel_tot_col_name, pd.Series([0]))
-    duels_gagnes_col = player_data.get("Duel gagne", pd.Series([0]))
-    duels_tent = to_num(duels_tent_col).sum()
-    duels_gagnes = to_num(duels_gagnes_col).sum()
-    duel_eff = (duels_gagnes / duels_tent * 100) if duels_tent > 0 else 0
-    buts_col = player_data.get("Buts", pd.Series([0]))
-    tirs_col = player_data.get("Tir", pd.Series([0]))
-    xg_col = player_data.get("xG", pd.Series([0]))
-    buts = to_num(buts_col).sum()
-    tirs = to_num(tirs_col).sum()
-    xg = to_num(xg_col).sum()
-    attacking_score = (buts * 10) + (tirs * 2) + (xg * 5)
-    interceptions_col = player_data.get("Interception", pd.Series([0]))
-    recoveries_col = player_data.get("Recuperation du ballon", pd.Series([0]))
-    interceptions = to_num(interceptions_col).sum()
-    recoveries = to_num(recoveries_col).sum()
-    defensive_score = (interceptions * 3) + (recoveries * 2)
-    touches_col = player_data.get("Ballon touché", pd.Series([0]))
-    touches = to_num(touches_col).sum()
-    ball_retention_score = touches / len(player_data) if len(player_data) > 0 else 0
-    final_score = (
-        (passing_eff * weights['passing_efficiency']) +
-        (duel_eff * weights['duel_success']) +
-        (min(attacking_score, 100) * weights['attacking_contribution']) +
-        (min(defensive_score, 100) * weights['defensive_contribution']) +
-        (min(ball_retention_score, 100) * weights['ball_retention'])
-    )
-    return min(final_score, 100)
-def get_performance_badge(score):
-    if score >= 80:
-        return '<span class="performance-badge badge-excellent">Excellent</span>'
-    elif score >= 65:
-        return '<span class="performance-badge badge-good">Bon</span>'
-    elif score >= 50:
-        return '<span class="performance-badge badge-average">Moyen</span>'
-    else:
-        return '<span class="performance-badge badge-poor">À améliorer</span>'
-def create_radar_chart(data, categories, title="Performance Radar"):
-    fig = go.Figure()
-    fig.add_trace(go.Scatterpolar(
-        r=data,
-        theta=categories,
-        fill='toself',
-        name='Performance',
-        line=dict(color='#3b82f6', width=2),
-        fillcolor='rgba(59, 130, 246, 0.2)',
-        marker=dict(size=8, color='#3b82f6')
-    ))
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                gridcolor='rgba(255, 255, 255, 0.2)',
-                linecolor='rgba(255, 255, 255, 0.3)'
-            ),
-            angularaxis=dict(
-                gridcolor='rgba(255, 255, 255, 0.2)',
-                linecolor='rgba(255, 255, 255, 0.3)'
-            ),
-            bgcolor='rgba(0, 0, 0, 0)'
-        ),
-        showlegend=False,
-        title=dict(text=title, x=0.5, font=dict(color='#e2e8f0')),
-        paper_bgcolor='rgba(0, 0, 0, 0)',
-        plot_bgcolor='rgba(0, 0, 0, 0)',
-        font=dict(color='#e2e8f0')
-    )
-    return fig
-def predict_performance_trend_manual(x, y, periods_ahead=5):
-    if len(x) < 2:
-        return None
-    n = len(x)
-    sum_x = np.sum(x)
-    sum_y = np.sum(y)
-    sum_xy = np.sum(x * y)
-    sum_x2 = np.sum(x ** 2)
-    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
-    intercept = (sum_y - slope * sum_x) / n
-    future_x = np.arange(len(x) + 1, len(x) + periods_ahead + 1)
-    predictions = slope * future_x + intercept
-    y_mean = np.mean(y)
-    ss_tot = np.sum((y - y_mean) ** 2)
-    ss_res = np.sum((y - (slope * x + intercept)) ** 2)
-    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-    return {
-        'slope': slope,
-        'intercept': intercept,
-        'predictions': predictions,
-        'future_matches': future_x,
-        'r_squared': r_squared
-    }
-# -------------------- BENCHMARKS PAR POSTE DÉTAIL --------------------
-BENCHMARKS_PAR_POSTE = {
-    "Attaquant central": {
-        'pass_accuracy': 75,
-        'prog_passes_per_90': 3,
-        'key_passes_per_match': 0.8,
-        'shot_accuracy': 35,
-        'xg_per_90': 0.4,
-        'goals_per_xg': 0.9,
-        'duel_win_rate': 45,
-        'interceptions_per_90': 0.8,
-        'recoveries_per_90': 4,
-    },
-    "Milieu relayeur": {
-        'pass_accuracy': 88,
-        'prog_passes_per_90': 6,
-        'key_passes_per_match': 0.5,
-        'shot_accuracy': 20,
-        'xg_per_90': 0.1,
-        'goals_per_xg': 1.5,
-        'duel_win_rate': 55,
-        'interceptions_per_90': 2.5,
-        'recoveries_per_90': 8,
-    },
-    "Milieu offensif": {
-        'pass_accuracy': 82,
-        'prog_passes_per_90': 8,
-        'key_passes_per_match': 1.5,
-        'shot_accuracy': 30,
-        'xg_per_90': 0.3,
-        'goals_per_xg': 1.1,
-        'duel_win_rate': 50,
-        'interceptions_per_90': 1.5,
-        'recoveries_per_90': 6,
-    },
-    "Défenseur axial": {
-        'pass_accuracy': 85,
-        'prog_passes_per_90': 4,
-        'key_passes_per_match': 0.2,
-        'shot_accuracy': 15,
-        'xg_per_90': 0.05,
-        'goals_per_xg': 2.0,
-        'duel_win_rate': 60,
-        'interceptions_per_90': 3.0,
-        'recoveries_per_90': 7,
-    },
-    # Ajoutez d'autres postes selon vos besoins
-    "Défaut": {  # Pour les postes non définis
-        'pass_accuracy': 80,
-        'prog_passes_per_90': 5,
-        'key_passes_per_match': 1.0,
-        'shot_accuracy': 30,
-        'xg_per_90': 0.2,
-        'goals_per_xg': 1.0,
-        'duel_win_rate': 50,
-        'interceptions_per_90': 2.0,
-        'recoveries_per_90': 6,
-    }
-}
-# -------------------- MAPPING POSTE → COORDONNÉES TERRAIN (CORRIGÉ) --------------------
-# -------------------- MAPPING POSTE → COORDONNÉES TERRAIN (AJUSTÉ POUR LA SURFACE) --------------------
-POSTE_COORDONNEES = {
-    "Gardien de but": (2, 50),           # Tout en bas, au centre
-    "Défenseur axial": (20, 50),         # Dans la défense centrale
-    "Défenseur latéral droit": (20, 80), # Sur le côté droit défensif
-    "Défenseur latéral gauche": (20, 20),# Sur le côté gauche défensif
-    "Milieu relayeur": (50, 50),         # Au centre du terrain
-    "Milieu offensif": (70, 50),         # Dans l'entrejeu, proche de l'attaque
-    "Milieu droit": (65, 75),            # A droite, dans le milieu offensif
-    "Milieu gauche": (65, 25),           # A gauche, dans le milieu offensif
-    "Attaquant central": (100, 50),       # DANS la surface de réparation adverse (93 au lieu de 90)
-    "Attaquant de côté droit": (88, 70), # A droite, DANS la surface
-    "Attaquant de côté gauche": (88, 30),# A gauche, DANS la surface
-    # Valeurs par défaut si le poste n'est pas trouvé
-    "Défaut": (50, 50),
-}
-def calculate_kpis(data, total_min, total_matches, player_id=None, df_players=None):
-    kpis = {}
-    passes_tent_col = data.get("Passe tentées", pd.Series([0]))
-    passes_comp_col = data.get("Passe complete", pd.Series([0]))
-    passes_tent = to_num(passes_tent_col).sum()
-    passes_comp = to_num(passes_comp_col).sum()
-    kpis['pass_accuracy'] = (passes_comp / passes_tent * 100) if passes_tent > 0 else 0
-    prog_passes_col = data.get("Passe progressive", pd.Series([0])) if "Passe progressive" in data.columns else pd.Series([0])
-    prog_passes = to_num(prog_passes_col).sum()
-    kpis['prog_passes_per_90'] = (prog_passes / total_min * 90) if total_min > 0 else 0
-    key_passes_col = data.get("Passe decisive", pd.Series([0])) if "Passe decisive" in data.columns else pd.Series([0])
-    key_passes = to_num(key_passes_col).sum()
-    kpis['key_passes_per_match'] = key_passes / total_matches if total_matches > 0 else 0
-    tirs_col = data.get("Tir", pd.Series([0]))
-    tirs_cadres_col = data.get("Tir cadre", pd.Series([0]))
-    tirs = to_num(tirs_col).sum()
-    tirs_cadres = to_num(tirs_cadres_col).sum()
-    kpis['shot_accuracy'] = (tirs_cadres / tirs * 100) if tirs > 0 else 0
-    xg_col = data.get("xG", pd.Series([0]))
-    xg = to_num(xg_col).sum()
-    kpis['xg_per_90'] = (xg / total_min * 90) if total_min > 0 else 0
-    buts_col = data.get("Buts", pd.Series([0]))
-    buts = to_num(buts_col).sum()
-    kpis['goals_per_xg'] = buts / xg if xg > 0 else 0
-    duel_tot_col_name = "Duel tenté" if "Duel tenté" in data.columns else "Duel tente"
-    duels_tent_col = data.get(duel_tot_col_name, pd.Series([0]))
-    duels_gagnes_col = data.get("Duel gagne", pd.Series([0]))
-    duels_tent = to_num(duels_tent_col).sum()
-    duels_gagnes = to_num(duels_gagnes_col).sum()
-    kpis['duel_win_rate'] = (duels_gagnes / duels_tent * 100) if duels_tent > 0 else 0
-    interceptions_col = data.get("Interception", pd.Series([0]))
-    interceptions = to_num(interceptions_col).sum()
-    kpis['interceptions_per_90'] = (interceptions / total_min * 90) if total_min > 0 else 0
-    recoveries_col = data.get("Recuperation du ballon", pd.Series([0]))
-    recoveries = to_num(recoveries_col).sum()
-    kpis['recoveries_per_90'] = (recoveries / total_min * 90) if total_min > 0 else 0
-    # Récupérer le poste détaillé du joueur pour appliquer les bons benchmarks
-    if player_id is not None and df_players is not None and not df_players.empty:
-        player_row = df_players[df_players["PlayerID_norm"] == str(player_id)]
-        if not player_row.empty:
-            poste_detail = player_row.iloc[0].get('Poste Détail', 'Défaut')
-            benchmarks = BENCHMARKS_PAR_POSTE.get(poste_detail, BENCHMARKS_PAR_POSTE['Défaut'])
-        else:
-            benchmarks = BENCHMARKS_PAR_POSTE['Défaut']
-    else:
-        benchmarks = BENCHMARKS_PAR_POSTE['Défaut']
-    # Ajouter les benchmarks au dictionnaire retourné
-    kpis['benchmarks'] = benchmarks
-    return kpis
+from hub.core import (
+    to_num, get_performance_badge, create_radar_chart,
+    create_multi_radar_chart, predict_performance_trend_manual, calculate_kpis, kpi_history,
+    PERFORMANCE_WEIGHTS,
+)
+from hub.data import (
+    DownloadError, parse_excel, TRACKING_REQUIRED_COLS,
+)
+from hub.memory import MB, FigureLedger, RssTrend, frame_memory, memory_report
+from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+from hub.store import HubStore, ingest as ingest_store
+from hub.sources import load_sources, partition_key, coords_key, partition_sig, latest_partitions, fetch_partition, load_partition, federation_sig, federate
+from hub.pitch_plotly import (
+    plotly_event_map, plotly_grid, plotly_position_map, plotly_pitch, plotly_pass_network, WEBGL_THRESHOLD,
+    facet_counts, plotly_small_multiples, SMALL_MULTIPLES_MAX, plotly_density,
+)
+from hub.density import FINE_BINS, COARSE_BINS, DEFAULT_SIGMA as HEAT_DEFAULT_SIGMA, density_grids
+from hub.spatial import EventSpatialIndex, REGIONS
+from hub.coords import PITCH_TYPE
+from hub.xt import DEFAULT_BINS as XT_DEFAULT_BINS, fit_xt, score_passes, player_xt_totals
+from hub.xg import fit_xg, score_shots
+from hub.network import build_pass_networks, network_slice
+from hub.radar import SCALES as RADAR_SCALES, build_radar_tables, radar_categories, radar_vector, radar_matrix
+from hub.cube import SPLIT_COLUMNS, build_cube, cube_journees, cube_split, cube_totals, cube_kpis, player_journees
+from hub.compare import comparison_totals, cumulative_curves
+from hub.cards import card_grid_html, card_stack_html
+from hub.scoring import SCORE_COMPONENTS, build_score_components, weighted_scores, score_ranking
+from hub.roles import METHODS as ROLE_METHODS, DEFAULT_K as ROLE_DEFAULT_K, cluster_roles
+from hub.similarity import METRICS as SIMILARITY_METRICS, DEFAULT_MIN_MINUTES as SIM_MIN_MINUTES, build_profiles, build_similarity_model, nearest_players
+from hub.timeline import build_timelines
+from hub.warmup import CacheWarmer, player_builders
+from hub.explorer import PAGE_SIZES, column_domains, filter_rows, sort_rows, page_rows, page_count, export_csv, export_parquet
+# Moteurs de rendu terrain sélectionnables par vue
+PITCH_RENDERER_MPL = "🖼️ Matplotlib (mplsoccer)"
+PITCH_RENDERER_PLOTLY = "⚡ Plotly (interactif)"
+PITCH_RENDERERS = [PITCH_RENDERER_MPL, PITCH_RENDERER_PLOTLY]
+# Heatmaps Visualisation : cases 6×5 en % ou densité fine 120×80 lissée
+HEAT_COARSE = "▦ Cases 6×5 (%)"
+HEAT_FINE = "🌫️ Densité lissée 120×80"
+HEAT_MODES = [HEAT_COARSE, HEAT_FINE]
+
+# ==================== DIAGNOSTICS MÉMOIRE ====================
+@st.cache_resource(show_spinner=False)
+def _memory_probes() -> tuple[RssTrend, FigureLedger]:
+    # Historique RSS et compteurs de figures du process (partagés entre sessions)
+    return RssTrend(), FigureLedger()
+rss_trend, figure_ledger = _memory_probes()
+rss_trend.sample()
+def show_figure(fig):
+    """Affiche une figure matplotlib puis la ferme (sinon pyplot la garde en mémoire)."""
+    figure_ledger.shown_one()
+    st.pyplot(fig, use_container_width=True)
+    figure_ledger.close(fig)
+def cache_memory() -> pd.DataFrame:
+    """Taille (Mo) de chaque fonction cache_data et entrées de chaque cache_resource (statistiques publiques).
+
+    Sans ``server.enableExpensiveMemoryStats``, Streamlit ne mesure pas les ressources : la statistique
+    publique d'un cache_resource est alors son nombre d'entrées.
+    """
+    rows = []
+    for stat in (s for stats in get_data_cache_stats_provider().get_stats().values() for s in stats):
+        rows.append({"Cache": stat.cache_name, "Type": "cache_data", "Entrées": None, "Mo": stat.byte_length / MB})
+    measured = st.get_option("server.enableExpensiveMemoryStats")
+    for stat in (s for stats in get_resource_cache_stats_provider().get_stats().values() for s in stats):
+        rows.append({"Cache": stat.cache_name, "Type": "cache_resource", "Entrées": None if measured else stat.byte_length,
+                     "Mo": stat.byte_length / MB if measured else None})
+    frame = pd.DataFrame(rows, columns=["Cache", "Type", "Entrées", "Mo"])
+    return frame.groupby(["Cache", "Type"], as_index=False).sum(min_count=1).set_index("Cache")
 
 # ==================== GOOGLE SHEETS → XLSX (public) ====================
-FILE_ID = "1giSdEgXz3VytLq9Acn9rlQGbUhNAo2bI"
-def _download_gsheets_as_xlsx(file_id: str) -> tuple[bytes, str, int]:
-    url = f"https://docs.google.com/spreadsheets/d/{file_id}/export?format=xlsx"
-    r = requests.get(url, allow_redirects=True, timeout=30)
-    if r.status_code != 200 or r.headers.get("Content-Type","").startswith("text/html"):
-        raise RuntimeError(
-            f"Échec export Google Sheets (HTTP {r.status_code}). "
-            "Vérifie que le fichier est public en lecture."
-        )
-    content = r.content
-    sig = hashlib.md5(content).hexdigest()
-    size = len(content)
-    return content, sig, size
 @st.cache_data(show_spinner=False)
-def _parse_excel_bytes(xlsx_bytes: bytes, sig: str) -> dict:
-    xl = pd.ExcelFile(io.BytesIO(xlsx_bytes), engine="openpyxl")
-    return {name: xl.parse(name).copy(deep=True) for name in xl.sheet_names}
+def _parse_excel(_path, sig: str) -> dict:
+    # Lu depuis le fichier (clé = signature md5, pas le contenu)
+    return parse_excel(_path)
 # --- UI: reload
 with st.sidebar:
     if st.button("🔄 Recharger depuis Drive", use_container_width=True):
+        # Données et ressources (dernier classeur, index, timelines, store, préchauffage) reconstruites
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
+@st.cache_resource(show_spinner=False)
+def _last_workbook() -> dict:
+    # Chemin et signature du dernier classeur téléchargé avec succès par partition (partagé entre sessions) :
+    # repli si Drive est indisponible
+    return {}
+@st.cache_data(show_spinner=False)
+def _load_partition(_data: dict, sig: str, source: str, season: str, coords: str, shared_ids: bool) -> dict:
+    # Feuilles normalisées d'une partition (Tracking préparé), une fois par classeur et par repère déclaré
+    return load_partition(_data, {"source": source, "season": season, "shared_ids": shared_ids,
+                                  **({"coords": json.loads(coords)} if coords else {})})
+@st.cache_resource(show_spinner=False, max_entries=1, on_release=lambda store: store.close())
+def _hub_store(_frames: dict, sig: str) -> HubStore:
+    # Ingestion si le store sur disque porte une autre signature, puis connexion en lecture ;
+    # un seul store ouvert : l'ancien est fermé quand la signature change
+    ingest_store(_frames, sig)
+    return HubStore()
+@st.cache_data(show_spinner=False)
+def _federate(_partitions: list, sig: str) -> dict:
+    return federate(_partitions)
+# --- Partitions enregistrées (source × saison) : seules les sélectionnées sont chargées
+SOURCES = load_sources()
+with st.sidebar:
+    if len(SOURCES) > 1:
+        selected_partitions = st.multiselect("🗂️ Sources / saisons", [partition_key(src) for src in SOURCES],
+                                             default=latest_partitions(SOURCES), key="partitions")
+    else:
+        selected_partitions = [partition_key(SOURCES[0])]
+if not selected_partitions:
+    st.info("ℹ️ Sélectionne au moins une source.")
+    st.stop()
 # --- Téléchargement + parsing
+partitions, partition_sigs = [], []
 try:
-    xlsx_bytes, FILE_SIG, FILE_SIZE = _download_gsheets_as_xlsx(FILE_ID)
-    data = _parse_excel_bytes(xlsx_bytes, FILE_SIG)
+    for src in SOURCES:
+        key = partition_key(src)
+        if key not in selected_partitions:
+            continue
+        try:
+            path, sig, size = fetch_partition(src)
+            _last_workbook()[key] = {"path": path, "sig": sig, "size": size}
+        except DownloadError as e:
+            last = _last_workbook().get(key)
+            if not (e.transient and last):
+                raise
+            st.warning(f"⚠️ {key} : Drive momentanément indisponible ({e}) : dernière version chargée affichée.")
+            path, sig, size = last["path"], last["sig"], last["size"]
+        partitions.append(_load_partition(_parse_excel(path, sig), sig, src["source"], str(src["season"]), coords_key(src),
+                                          bool(src.get("shared_ids"))))
+        # Repère et identifiants partagés font partie de la signature : les changer invalide les caches en aval
+        partition_sigs.append(partition_sig(sig, src))
 except Exception as e:
     st.error(f"❌ Impossible de charger depuis Drive : {e}")
     st.stop()
-# === Déballage des feuilles ===
-df_players = data.get("Joueur", pd.DataFrame())
-df_match   = data.get("Match", pd.DataFrame())
-df_well    = data.get("Wellness", pd.DataFrame())
-df_tracking = data.get("Tracking", pd.DataFrame())  # <-- NOUVEAU : onglet Tracking
-
-for df in (df_players, df_match, df_well, df_tracking):
-    if not df.empty and "PlayerID" in df.columns:
-        df["PlayerID_norm"] = df["PlayerID"].astype(str).str.strip()
-
-mapping = {
-    "minute jouee": "Minutes Jouées",
-    "tir cadre": "Tir cadre",
-    "passe courte tentee": "Passe courte tentée",
-    "passe courte complete": "Passe courte complète",
-    "passe moyenne tentee": "Passe moyenne tentée",
-    "passe moyenne complete": "Passe moyenne complète",
-    "passe longue tentee": "Passe longue tentée",
-    "passe longue complete": "Passe longue complète",
-    "duel tente": "Duel tenté",
-    "duel gagne": "Duel gagné",
-    "duel aérien gagné": "Duel aérien gagné",
-    "duel aérien perdu": "Duel aérien perdu",
-    "distance parcourue avec ballon": "Distance parcouru avec ballon (m)",
-    "distance parcourue progression": "Distance parcouru progression(m)",
-    "ballon touche haute": "Ballon touché haute",
-    "ballon touche médian": "Ballon touché médian",
-    "ballon touche basse": "Ballon touché basse",
-    "ballon touche surface": "Ballon touché surface",
-    "recuperation du ballon": "Recuperation du ballon",
-}
-df_match = rename_like(df_match, mapping)
-
-if not df_well.empty and "DATE" in df_well.columns:
-    df_well["DATE"] = pd.to_datetime(df_well["DATE"], errors="coerce")
+FILE_SIG = federation_sig(partition_sigs)
+# Une seule partition : pas de seconde copie en cache
+federated = partitions[0] if len(partitions) == 1 else _federate(partitions, FILE_SIG)
+use_store = st.sidebar.toggle("🗄️ Store SQLite", value=False, key="use_store",
+                              help="Lignes par joueur et période lues par requêtes indexées dans un fichier SQLite ; "
+                                   "index de lecture en plus des feuilles en mémoire, pas un remplacement")
+@st.cache_resource(show_spinner=False)
+def _tracking_spatial_index(_df_tracking: pd.DataFrame, sig: str) -> EventSpatialIndex:
+    # Index partagé entre sessions, construit une fois par classeur (positions iloc de df_tracking préparé)
+    return EventSpatialIndex(_df_tracking)
+@st.cache_data(show_spinner=False)
+def _xt_model(_df_tracking: pd.DataFrame, sig: str, bins: tuple) -> tuple[dict, pd.DataFrame]:
+    # Grille xT + xT de toutes les passes agrégé par joueur × journée, une fois par classeur et par grille
+    model = fit_xt(_df_tracking, bins)
+    pass_xt = score_passes(_df_tracking, model["grid"])
+    return model, player_xt_totals(_df_tracking, pass_xt, by=("PlayerID_norm", "Journée")).reset_index()
+@st.cache_data(show_spinner=False)
+def _xg_model(_df_tracking: pd.DataFrame, sig: str) -> tuple[dict, pd.DataFrame]:
+    # Ajustement + scoring de tous les tirs, une fois par classeur (pas à chaque rerun)
+    model = fit_xg(_df_tracking)
+    return model, score_shots(_df_tracking, model["coefs"])
+@st.cache_data(show_spinner=False)
+def _pass_networks(_df_tracking: pd.DataFrame, sig: str) -> dict:
+    # Adjacences et positions moyennes de toutes les journées, une fois par classeur
+    return build_pass_networks(_df_tracking)
+@st.cache_resource(show_spinner=False)
+def _timelines(_df_match: pd.DataFrame, _df_well: pd.DataFrame, _df_tracking: pd.DataFrame, sig: str) -> dict:
+    # Index (joueur, date) des trois feuilles, partagés entre sessions, une fois par classeur
+    return build_timelines(_df_match, _df_well, _df_tracking)
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cache_warmer(_frames: dict, _timelines: dict, player_ids: tuple, sig: str) -> CacheWarmer:
+    # Un pool par classeur, lancé au premier chargement ; les sessions suivantes lisent ses artefacts
+    return CacheWarmer(player_builders(_frames, _timelines), player_ids).start()
+@st.cache_data(show_spinner=False, max_entries=32)
+def _radar_tables(_df_match: pd.DataFrame, sig: str, scale: str) -> dict:
+    # Vecteurs radar de tous les joueurs et de tous les joueur × match, une fois par classeur et par échelle
+    return build_radar_tables(_df_match, scale)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _vis_rows(_df: pd.DataFrame, sig: str, events: tuple, zones: tuple, journee) -> np.ndarray:
+    # Positions des événements retenus par un jeu de filtres Visualisation appliqué
+    mask = _df['Event'].isin(events) & _df['Zone'].isin(zones)
+    if journee != "Toutes" and 'Journée' in _df.columns:
+        mask &= _df['Journée'] == journee
+    return np.flatnonzero(mask.to_numpy())
+@st.cache_data(show_spinner=False, max_entries=32)
+def _facet_counts(_df: pd.DataFrame, sig: str, event: str, facet_col: str, bins: tuple) -> tuple[np.ndarray, np.ndarray]:
+    # Comptages de toutes les facettes en un seul histogramme groupé, par période, événement et grille
+    ev = _df[_df['Event'] == event]
+    return facet_counts(ev['X'], ev['Y'], ev[facet_col], bins)
+@st.cache_data(show_spinner=False, max_entries=128)
+def _heat_grids(_x: np.ndarray, _y: np.ndarray, sig: str, sigma: float) -> dict:
+    # Grille fine lissée + agrégat 6×5, par période, jeu de filtres appliqué, événement et lissage
+    return density_grids(_x, _y, sigma)
+@st.cache_data(show_spinner=False, max_entries=32)
+def _score_components(_df_match: pd.DataFrame, sig: str) -> pd.DataFrame:
+    # Sous-scores du score global pour tout l'effectif, une fois par classeur
+    return build_score_components(_df_match)
+@st.cache_data(show_spinner=False, max_entries=4)
+def _match_cube(_df_match: pd.DataFrame, sig: str) -> dict:
+    # Cube joueur × adversaire × journée de tous les compteurs, une fois par classeur
+    return build_cube(_df_match)
+@st.cache_data(show_spinner=False, max_entries=32)
+def _similarity_model(_df_match: pd.DataFrame, _radar_tables: dict, sig: str, min_minutes: float) -> dict:
+    # Matrice centrée-réduite de tous les profils, une fois par classeur et par seuil de minutes
+    return build_similarity_model(build_profiles(_df_match, _radar_tables, min_minutes))
+@st.cache_data(show_spinner=False, max_entries=64)
+def _role_clusters(_sim_model: dict, sig: str, min_minutes: float, k: int, method: str) -> dict:
+    # Clustering des profils par 90 min, une fois par classeur et par réglage (k, méthode)
+    return cluster_roles(_sim_model, k, method)
+@st.cache_data(show_spinner=False, max_entries=32)
+def _explorer_domains(_df: pd.DataFrame, sheet: str, sig: str) -> dict:
+    return column_domains(_df)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _explorer_rows(_df: pd.DataFrame, sheet: str, sig: str, filters: tuple, search: str, sort_col, ascending: bool) -> np.ndarray:
+    # Positions filtrées + triées ; changer de page ou de taille de page ne recalcule rien
+    return sort_rows(_df, filter_rows(_df, filters, search), sort_col, ascending)
+# === Feuilles fédérées (Tracking déjà préparé par partition : repère canonique 120×80, zones) ===
+df_players, df_match, df_well, df_tracking = (federated[name] for name in ("players", "match", "wellness", "tracking"))
+tracking_ready = federated["tracking_ready"]
+coord_info = federated["coords"]
+timelines = _timelines(df_match, df_well, df_tracking, FILE_SIG)
 
 # -------------------- SIDEBAR --------------------
 st.sidebar.markdown("### 🎯 Paramètres d'analyse")
 player_map = {}
 if not df_players.empty and {"PlayerID_norm", "Prénom", "Nom"}.issubset(df_players.columns):
+    # Plusieurs sources : la source distingue deux joueurs de même PlayerID (identifiants préfixés par hub.sources)
+    multi_source = "Source" in df_players.columns and df_players["Source"].nunique() > 1
     for _, r in df_players.iterrows():
-        display = f"{r.get('Prénom','')} {r.get('Nom','')} (#{str(r.get('PlayerID'))})"
-        player_map[display] = str(r.get("PlayerID"))
+        display = f"{r.get('Prénom','')} {r.get('Nom','')} (#{str(r.get('PlayerID'))}{f' · ' + str(r.get('Source')) if multi_source else ''})"
+        player_map[display] = str(r.get("PlayerID_norm"))
 elif not df_match.empty and "PlayerID_norm" in df_match.columns:
     for pid in sorted(df_match["PlayerID_norm"].dropna().unique()):
         player_map[str(pid)] = str(pid)
 
+player_names = {pid: display.split(" (#")[0] for display, pid in player_map.items()}
+# Préchauffage des artefacts de tout l'effectif, en arrière-plan, une fois par classeur
+cache_warmer = _cache_warmer(federated, timelines, tuple(player_map.values()), FILE_SIG)
+@st.fragment(run_every=1 if cache_warmer.progress()["running"] else None)
+def warmup_status():
+    progress = cache_warmer.progress()
+    if progress["running"]:
+        st.progress(progress["coverage"], text=f"🔥 Préchauffage : {progress['players_done']}/{progress['players_total']} joueurs")
+    else:
+        st.caption(f"🔥 Préchauffage : {progress['coverage']:.0%} des artefacts prêts ({progress['players_total']} joueurs, {progress['elapsed_s']:.1f}s)"
+                   + (f" • {progress['errors']} erreur(s)" if progress["errors"] else ""),
+                   help=" • ".join(f"{name} {share:.0%}" for name, share in cache_warmer.coverage_by_artefact().items()))
+with st.sidebar:
+    warmup_status()
+
 sel_display = st.sidebar.selectbox("🏃 Sélection joueur", list(player_map.keys()) if player_map else [])
 player_id = player_map.get(sel_display) if player_map else None
 
+# --- Période globale : appliquée aux feuilles Match, Wellness et Tracking dans tous les onglets
+date_bounds = [b for b in (timelines["match"].bounds(), timelines["wellness"].bounds()) if b is not None]
+date_start = date_end = None
+if date_bounds:
+    first_day = min(b[0] for b in date_bounds).date()
+    last_day = max(b[1] for b in date_bounds).date()
+    picked_window = st.sidebar.date_input("📅 Période d'analyse", (first_day, last_day), min_value=first_day, max_value=last_day, key="date_window")
+    if isinstance(picked_window, (tuple, list)) and len(picked_window) == 2 and tuple(picked_window) != (first_day, last_day):
+        date_start, date_end = pd.Timestamp(picked_window[0]), pd.Timestamp(picked_window[1])
+# Signature classeur + période : clé des caches calculés sur les feuilles fenêtrées (bornés en entrées,
+# une période par combinaison de dates choisie)
+WINDOW_SIG = FILE_SIG if date_start is None else f"{FILE_SIG}|{date_start.date()}|{date_end.date()}"
+window_range = None if date_start is None else (date_start, date_end)
+def window_frame(df, sheet):
+    """Feuille restreinte à la période (positions issues des index par joueur)."""
+    return df if date_start is None else df.iloc[timelines[sheet].rows_all(date_start, date_end)]
+df_match_window = window_frame(df_match, "match")
+# Store SQLite optionnel : mêmes accesseurs, servis par des requêtes indexées
+hub_store = _hub_store(federated, FILE_SIG) if use_store else None
+def player_matches(pid):
+    """Matchs du joueur sur la période, dans l'ordre chronologique."""
+    if hub_store is not None:
+        return hub_store.player_rows("match", pid, date_start, date_end)
+    return df_match.iloc[timelines["match"].rows(pid, date_start, date_end)]
+def player_wellness(pid, start=None, end=None):
+    """Wellness du joueur triée par date, sur la période (ou sur [start, end] si fournis)."""
+    start = start if start is not None else date_start
+    end = end if end is not None else date_end
+    if hub_store is not None:
+        return hub_store.player_rows("wellness", pid, start, end)
+    return df_well.iloc[timelines["wellness"].rows(pid, start, end)]
+def player_tracking(pid):
+    if hub_store is not None:
+        return hub_store.player_rows("tracking", pid, date_start, date_end)
+    return df_tracking.iloc[timelines["tracking"].rows(pid, date_start, date_end)]
+def warm(pid, name):
+    """Artefact préchauffé du joueur ; None si une période est choisie ou si le store SQLite sert les lignes."""
+    if date_start is not None or hub_store is not None:
+        return None
+    return cache_warmer.get(pid, name)
+
 st.sidebar.markdown("### ⚙️ Options d'analyse")
 show_predictions = st.sidebar.checkbox("📈 Afficher les prédictions", value=True)
 compare_mode = st.sidebar.checkbox("🔄 Mode comparaison", value=False)
 advanced_metrics = st.sidebar.checkbox("📊 Métriques avancées", value=True)
+radar_scale = st.sidebar.radio("📐 Échelle des radars", list(RADAR_SCALES), format_func=RADAR_SCALES.get, key="radar_scale")
+radar_tables = _radar_tables(df_match_window, WINDOW_SIG, radar_scale)
+# Cube construit une fois par classeur : la période est un masque de journées (date_range) sur ses cases
+match_cube = _match_cube(df_match, FILE_SIG)
+with st.sidebar.expander("⚖️ Pondération du score", expanded=False):
+    score_weights = {
+        name: st.slider(label, 0.0, 1.0, PERFORMANCE_WEIGHTS[name], 0.05, key=f"score_w_{name}")
+        for name, label in SCORE_COMPONENTS.items()
+    }
+    if sum(score_weights.values()) == 0:
+        st.caption("Tous les poids sont nuls : pondération par défaut.")
+        score_weights = PERFORMANCE_WEIGHTS
+# Score de tout l'effectif : un produit matrice-vecteur sur les sous-scores en cache
+score_components = _score_components(df_match_window, WINDOW_SIG)
+performance_scores = weighted_scores(score_components, score_weights)
+with st.sidebar.expander("🧩 Rôles joués", expanded=False):
+    role_method = st.radio("Méthode", list(ROLE_METHODS), format_func=ROLE_METHODS.get, horizontal=True, key="role_method")
+    role_k = st.slider("Nombre de rôles", 2, 8, ROLE_DEFAULT_K, key="role_k")
+role_profiles = _similarity_model(df_match_window, radar_tables, WINDOW_SIG, SIM_MIN_MINUTES)
+role_model = _role_clusters(role_profiles, WINDOW_SIG, SIM_MIN_MINUTES, role_k, role_method)
+def player_role(pid):
+    """Libellé du rôle appris pour un joueur ; None sans profil (minutes insuffisantes)."""
+    label = role_model["labels"].get(str(pid))
+    return None if label is None else role_model["names"][int(label)]
+with st.sidebar.expander("🧮 Grille xT", expanded=False):
+    xt_bins = (
+        st.slider("Cases en longueur", 6, 24, XT_DEFAULT_BINS[0], key="xt_bins_x"),
+        st.slider("Cases en largeur", 4, 16, XT_DEFAULT_BINS[1], key="xt_bins_y"),
+    )
+xt_model, xt_by_match = _xt_model(df_tracking, FILE_SIG, xt_bins) if tracking_ready else (None, None)
+xg_model, xg_by_match = _xg_model(df_tracking, FILE_SIG) if tracking_ready else (None, None)
+def player_tracking_total(by_match, col, pid, journees=None):
+    """Somme d'un agrégat Tracking joueur × journée sur les journées données (toutes si None) ; None sans Tracking."""
+    if by_match is None:
+        return None
+    rows = by_match[by_match["PlayerID_norm"] == str(pid)]
+    if journees is not None and "Journée" in rows.columns:
+        wanted = pd.to_numeric(pd.Series(list(journees)), errors="coerce").dropna().unique()
+        rows = rows[pd.to_numeric(rows["Journée"], errors="coerce").isin(wanted)]
+    return float(rows[col].sum())
 
 if compare_mode and len(player_map) > 1:
     available_players = [k for k in player_map.keys() if k != sel_display]
-    compare_player = st.sidebar.selectbox("👥 Comparer avec", available_players)
-    compare_player_id = player_map.get(compare_player)
+    if st.sidebar.checkbox("👥 Tout l'effectif", value=False, key="compare_all"):
+        compare_players = available_players
+    else:
+        compare_players = st.sidebar.multiselect("👥 Comparer avec", available_players, default=available_players[:1], key="compare_players")
+    compare_player_ids = [player_map[k] for k in compare_players]
 else:
-    compare_player_id = None
+    compare_player_ids = []
+
+def render_cards(key, cards=None, columns=None, groups=None):
+    """Grille de cartes KPI en un seul élément, dans un conteneur à clé stable (même nœud d'un rerun à l'autre)."""
+    html = card_stack_html(groups) if groups is not None else card_grid_html(cards, columns)
+    with st.container(key=key):
+        st.markdown(html, unsafe_allow_html=True)
+def benchmark_color(kpis: dict, key: str, tolerance: float) -> str:
+    """Vert au-dessus du benchmark du poste, orange au-dessus de ``tolerance`` × benchmark, rouge sinon."""
+    value, bench = kpis[key], kpis['benchmarks'][key]
+    return "#10b981" if value > bench else "#f59e0b" if value > bench * tolerance else "#ef4444"
 
 # -------------------- PAGES --------------------
 # AJOUT DE L'ONGLET "👁️ Visualisation" ici
@@ -502,6 +502,42 @@ tabs = st.tabs(["🏠 Dashboard", "📊 Performance", "📈 Projections", "🩺
 
 # ======================= DASHBOARD =======================
 # ... (tout le contenu existant de tabs[0] reste inchangé)
+@st.fragment
+def position_map_view(x_pos, y_pos, poste_detail):
+    # Fragment : changer de rendu ne relance que cette vue, pas le script entier
+    position_renderer = st.radio("Rendu terrain", PITCH_RENDERERS, horizontal=True, key="dash_pitch_renderer", label_visibility="collapsed")
+    if position_renderer == PITCH_RENDERER_PLOTLY:
+        st.plotly_chart(plotly_position_map(x_pos, y_pos, poste_detail), use_container_width=True, key="dash_position_map")
+    else:
+        pitch = mplsoccer.Pitch(
+            pitch_type='opta',
+            pitch_color='#0b1220',
+            line_color='#e2e8f0',
+            linewidth=1.5,
+            goal_type='box'
+        )
+        fig, ax = pitch.draw(figsize=(10, 6))  # Taille équilibrée
+        pitch.scatter(
+            x_pos, y_pos,
+            ax=ax,
+            s=600,
+            color='#3b82f6',
+            edgecolors='white',
+            linewidth=2,
+            alpha=0.9,
+            zorder=5
+        )
+        ax.text(
+            x_pos, y_pos + 4,
+            poste_detail,
+            color='white',
+            fontsize=11,
+            ha='center',
+            va='bottom',
+            weight='bold',
+            zorder=6
+        )
+        show_figure(fig)
 with tabs[0]:
     st.markdown('<div class="hero"><span class="pill">🎯 Dashboard de Performance Joueur</span></div>', unsafe_allow_html=True)
     st.write("")
@@ -513,12 +549,12 @@ with tabs[0]:
                 p = p_row.iloc[0]
                 initials = (str(p.get("Prénom","")[:1]) + str(p.get("Nom","")[:1])).upper()
                 poste_detail = p.get('Poste Détail', p.get('Poste', 'Défaut'))
-                dm = df_match[df_match["PlayerID_norm"] == player_id].copy() if not df_match.empty else pd.DataFrame()
+                dm = player_matches(player_id).copy() if not df_match.empty else pd.DataFrame()
                 total_minutes = to_num(dm.get("Minutes Jouées", 0)).sum() if not dm.empty else 0
                 total_matches = len(dm) if not dm.empty else 0
-                perf_score = calculate_performance_score(dm) if not dm.empty else 0
+                perf_score = float(performance_scores.get(player_id, 0)) if not dm.empty else 0
                 perf_badge = get_performance_badge(perf_score)
-                kpis_season = calculate_kpis(dm, total_minutes, total_matches, player_id, df_players) if not dm.empty else {}
+                kpis_season = warm(player_id, "kpis") or (calculate_kpis(dm, total_minutes, total_matches, player_id, df_players) if not dm.empty else {})
                 # --- SECTION 1 : INFOS JOUEUR (AVANT TOUT) ---
                 st.markdown("##### 👤 Informations du Joueur")
                 col_avatar, col_info = st.columns([0.8, 3.2], gap="medium")
@@ -527,28 +563,19 @@ with tabs[0]:
                 with col_info:
                     st.markdown(f"""
                         <div style="font-size: 20px; font-weight: 700; margin-bottom: 4px;">{p.get('Prénom','')} {p.get('Nom','')}</div>
-                        <div style="color: var(--muted); font-size: 15px;">{poste_detail} • {p.get('Club','')}</div>
+                        <div style="color: var(--muted); font-size: 15px;">{poste_detail} • {p.get('Club','')}{f" • 🧩 {player_role(player_id)}" if player_role(player_id) else ""}</div>
                         <div style="margin-top: 8px;">{perf_badge}</div>
                     """, unsafe_allow_html=True)
                 st.write("")
                 # --- SECTION 2 : INFOS PHYSIQUES + KPIs ESSENTIELS (6 cartes uniformes) ---
-                cols = st.columns(6, gap="small")
-                metrics = [
-                    (f"{p.get('Taille','')} cm", "Taille", "", "#e2e8f0"),
-                    (f"{p.get('Poids','')} kg", "Poids", "", "#e2e8f0"),
-                    (p.get('Pied',''), "Pied Fort", "", "#e2e8f0"),
-                    (f"{int(total_minutes)}", "Minutes Jouées", "", "#3b82f6"),
-                    (f"{total_matches}", "Matchs Joués", "", "#8b5cf6"),
-                    (f"{perf_score:.1f}", "Score Global", "", '#10b981' if perf_score >= 70 else '#f59e0b' if perf_score >= 50 else '#ef4444'),
-                ]
-                for i, (val, label, unit, color) in enumerate(metrics):
-                    with cols[i]:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <h3>{label}</h3>
-                            <div class="value" style="color: {color};">{val}{unit}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                render_cards("dashboard_cards", [
+                    {"label": "Taille", "value": f"{p.get('Taille','')} cm"},
+                    {"label": "Poids", "value": f"{p.get('Poids','')} kg"},
+                    {"label": "Pied Fort", "value": p.get('Pied','')},
+                    {"label": "Minutes Jouées", "value": f"{int(total_minutes)}", "color": "#3b82f6"},
+                    {"label": "Matchs Joués", "value": f"{total_matches}", "color": "#8b5cf6"},
+                    {"label": "Score Global", "value": f"{perf_score:.1f}", "color": '#10b981' if perf_score >= 70 else '#f59e0b' if perf_score >= 50 else '#ef4444'},
+                ])
                 st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
         # --- SECTION 3 : TERRAIN CORRIGÉ (attaquants DANS la surface) ---
         st.markdown("##### 📍 Position sur le Terrain")
@@ -573,43 +600,15 @@ with tabs[0]:
                 p = p.iloc[0]
                 poste_detail = p.get('Poste Détail', p.get('Poste', 'Défaut'))
                 x_pos, y_pos = POSTE_COORDONNEES_CORRIGEES.get(poste_detail, POSTE_COORDONNEES_CORRIGEES['Défaut'])
-                pitch = mplsoccer.Pitch(
-                    pitch_type='opta',
-                    pitch_color='#0b1220',
-                    line_color='#e2e8f0',
-                    linewidth=1.5,
-                    goal_type='box'
-                )
-                fig, ax = pitch.draw(figsize=(10, 6))  # Taille équilibrée
-                pitch.scatter(
-                    x_pos, y_pos,
-                    ax=ax,
-                    s=600,
-                    color='#3b82f6',
-                    edgecolors='white',
-                    linewidth=2,
-                    alpha=0.9,
-                    zorder=5
-                )
-                ax.text(
-                    x_pos, y_pos + 4,
-                    poste_detail,
-                    color='white',
-                    fontsize=11,
-                    ha='center',
-                    va='bottom',
-                    weight='bold',
-                    zorder=6
-                )
-                st.pyplot(fig, use_container_width=True)
+                position_map_view(x_pos, y_pos, poste_detail)
         st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
         # --- SECTION 4 : KPIs SAISON + RADAR ---
         if not df_match.empty and "PlayerID_norm" in df_match.columns:
-            dm = df_match[df_match["PlayerID_norm"] == player_id].copy()
+            dm = player_matches(player_id).copy()
             if not dm.empty:
                 total_minutes = to_num(dm.get("Minutes Jouées")).sum()
                 total_matches = len(dm)
-                kpis_season = calculate_kpis(dm, total_minutes, total_matches, player_id, df_players)
+                kpis_season = warm(player_id, "kpis") or calculate_kpis(dm, total_minutes, total_matches, player_id, df_players)
                 st.markdown(f"##### ⏱️ Minutes Jouées: {int(total_minutes)} (Moyenne: {int(total_minutes/total_matches) if total_matches > 0 else 0}/match)")
                 max_minutes_season = 3420
                 progress_pct = min(total_minutes / max_minutes_season * 100, 100) if max_minutes_season > 0 else 0
@@ -624,28 +623,14 @@ with tabs[0]:
                     unsafe_allow_html=True
                 )
                 st.markdown("##### 🕸️ Radar de Performance Tactique")
-                radar_categories = [
-                    'Précision Passes', 'Passes Prog./90', 'Passes Décisives',
-                    'Précision Tirs', 'xG/90', 'Efficacité',
-                    'Duels Gagnés', 'Interceptions/90', 'Récupérations/90'
-                ]
-                radar_values = [
-                    min(kpis_season['pass_accuracy'], 100),
-                    min(kpis_season['prog_passes_per_90'] * 10, 100),
-                    min(kpis_season['key_passes_per_match'] * 50, 100),
-                    min(kpis_season['shot_accuracy'], 100),
-                    min(kpis_season['xg_per_90'] * 150, 100),
-                    min(kpis_season['goals_per_xg'] * 70, 100),
-                    min(kpis_season['duel_win_rate'], 100),
-                    min(kpis_season['interceptions_per_90'] * 30, 100),
-                    min(kpis_season['recoveries_per_90'] * 10, 100)
-                ]
-                radar_fig = create_radar_chart(radar_values, radar_categories, "Performance Tactique Complète")
+                season_categories = radar_categories("season")
+                radar_values = radar_vector(radar_tables, player_id, "season")
+                radar_fig = create_radar_chart(radar_values, season_categories, "Performance Tactique Complète")
                 st.plotly_chart(radar_fig, use_container_width=True)
         # --- SECTION 5 : SYNTHÈSE MATCH (inchangée) ---
         st.markdown("##### 🎯 Synthèse Match Spécifique — Améliorée")
         if not df_match.empty:
-            dm = df_match[df_match["PlayerID_norm"] == player_id].copy()
+            dm = player_matches(player_id).copy()
             if not dm.empty and "Journée" in dm.columns:
                 last_match = dm.iloc[-1]
                 j_day = last_match.get("Journée", "N/A")
@@ -657,11 +642,7 @@ with tabs[0]:
                 if not df_well.empty:
                     match_date = pd.to_datetime(last_match.get("DATE"), errors='coerce')
                     if pd.notna(match_date):
-                        dw_match = df_well[
-                            (df_well["PlayerID_norm"] == player_id) &
-                            (df_well["DATE"] >= match_date - timedelta(days=1)) &
-                            (df_well["DATE"] <= match_date)
-                        ]
+                        dw_match = player_wellness(player_id, match_date - timedelta(days=1), match_date)
                         if not dw_match.empty:
                             for metric in ["Energie générale", "Fraicheur musculaire", "Humeur", "Sommeil", "Intensité douleur"]:
                                 if metric in dw_match.columns:
@@ -672,66 +653,37 @@ with tabs[0]:
                     <h3 style="margin:0 0 16px 0; color: #5eead4;">Match J{j_day} • {opponent}</h3>
                 </div>
                 """, unsafe_allow_html=True)
-                synth_col1, synth_col2, synth_col3 = st.columns(3)
-                with synth_col1:
-                    st.markdown("##### 📤 Distribution")
-                    pass_color = "#10b981" if kpis_match['pass_accuracy'] > 80 else "#f59e0b" if kpis_match['pass_accuracy'] > 70 else "#ef4444"
-                    prog_color = "#10b981" if kpis_match['prog_passes_per_90'] > 8 else "#f59e0b" if kpis_match['prog_passes_per_90'] > 5 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">Précision Passes</div>
-                        <div class="value" style="color: {pass_color};">{kpis_match['pass_accuracy']:.1f}%</div>
-                    </div>
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">Passes Prog./90</div>
-                        <div class="value" style="color: {prog_color};">{kpis_match['prog_passes_per_90']:.1f}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with synth_col2:
-                    st.markdown("##### ⚽ Offense")
-                    shot_color = "#10b981" if kpis_match['shot_accuracy'] > 40 else "#f59e0b" if kpis_match['shot_accuracy'] > 30 else "#ef4444"
-                    xg_color = "#10b981" if kpis_match['xg_per_90'] > 0.5 else "#f59e0b" if kpis_match['xg_per_90'] > 0.3 else "#ef4444"
-                    minutes_color = "#10b981" if total_min_scalar >= 70 else "#f59e0b" if total_min_scalar >= 45 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">Précision Tirs</div>
-                        <div class="value" style="color: {shot_color};">{kpis_match['shot_accuracy']:.1f}%</div>
-                    </div>
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">xG/90</div>
-                        <div class="value" style="color: {xg_color};">{kpis_match['xg_per_90']:.2f}</div>
-                    </div>
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">Minutes Jouées</div>
-                        <div class="value" style="color: {minutes_color};">{int(total_min_scalar)}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with synth_col3:
-                    st.markdown("##### 🛡️ Défense & Wellness")
-                    duel_color = "#10b981" if kpis_match['duel_win_rate'] > 55 else "#f59e0b" if kpis_match['duel_win_rate'] > 50 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="font-size: 14px; color: var(--muted);">Duels Gagnés</div>
-                        <div class="value" style="color: {duel_color};">{kpis_match['duel_win_rate']:.1f}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    if wellness_summary:
-                        energy = wellness_summary.get("Energie générale", 0)
-                        freshness = wellness_summary.get("Fraicheur musculaire", 0)
-                        energy_color = "#10b981" if energy > 7 else "#f59e0b" if energy > 5 else "#ef4444"
-                        fresh_color = "#10b981" if freshness > 7 else "#f59e0b" if freshness > 5 else "#ef4444"
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="font-size: 14px; color: var(--muted);">Énergie</div>
-                            <div class="value" style="color: {energy_color};">{energy:.1f}/10</div>
-                        </div>
-                        <div class="metric-card">
-                            <div style="font-size: 14px; color: var(--muted);">Fraîcheur</div>
-                            <div class="value" style="color: {fresh_color};">{freshness:.1f}/10</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.info("Wellness non disponible")
+                pass_color = "#10b981" if kpis_match['pass_accuracy'] > 80 else "#f59e0b" if kpis_match['pass_accuracy'] > 70 else "#ef4444"
+                prog_color = "#10b981" if kpis_match['prog_passes_per_90'] > 8 else "#f59e0b" if kpis_match['prog_passes_per_90'] > 5 else "#ef4444"
+                shot_color = "#10b981" if kpis_match['shot_accuracy'] > 40 else "#f59e0b" if kpis_match['shot_accuracy'] > 30 else "#ef4444"
+                xg_color = "#10b981" if kpis_match['xg_per_90'] > 0.5 else "#f59e0b" if kpis_match['xg_per_90'] > 0.3 else "#ef4444"
+                minutes_color = "#10b981" if total_min_scalar >= 70 else "#f59e0b" if total_min_scalar >= 45 else "#ef4444"
+                duel_color = "#10b981" if kpis_match['duel_win_rate'] > 55 else "#f59e0b" if kpis_match['duel_win_rate'] > 50 else "#ef4444"
+                defense_cards = [{"label": "Duels Gagnés", "value": f"{kpis_match['duel_win_rate']:.1f}%", "color": duel_color}]
+                if wellness_summary:
+                    energy = wellness_summary.get("Energie générale", 0)
+                    freshness = wellness_summary.get("Fraicheur musculaire", 0)
+                    energy_color = "#10b981" if energy > 7 else "#f59e0b" if energy > 5 else "#ef4444"
+                    fresh_color = "#10b981" if freshness > 7 else "#f59e0b" if freshness > 5 else "#ef4444"
+                    defense_cards += [
+                        {"label": "Énergie", "value": f"{energy:.1f}/10", "color": energy_color},
+                        {"label": "Fraîcheur", "value": f"{freshness:.1f}/10", "color": fresh_color},
+                    ]
+                else:
+                    defense_cards.append({"label": "Wellness", "value": "—", "note": "Wellness non disponible"})
+                # Les trois colonnes de synthèse en un seul élément
+                render_cards("synthesis_cards", groups={
+                    "📤 Distribution": [
+                        {"label": "Précision Passes", "value": f"{kpis_match['pass_accuracy']:.1f}%", "color": pass_color},
+                        {"label": "Passes Prog./90", "value": f"{kpis_match['prog_passes_per_90']:.1f}", "color": prog_color},
+                    ],
+                    "⚽ Offense": [
+                        {"label": "Précision Tirs", "value": f"{kpis_match['shot_accuracy']:.1f}%", "color": shot_color},
+                        {"label": "xG/90", "value": f"{kpis_match['xg_per_90']:.2f}", "color": xg_color},
+                        {"label": "Minutes Jouées", "value": f"{int(total_min_scalar)}", "color": minutes_color},
+                    ],
+                    "🛡️ Défense & Wellness": defense_cards,
+                })
 
 # ======================= PERFORMANCE =======================
 # ... (tabs[1] inchangé)
@@ -739,54 +691,38 @@ with tabs[1]:
     st.markdown('<div class="hero"><span class="pill">📊 Performance Tactique - Distribution, Offense, Défense</span></div>', unsafe_allow_html=True)
     st.write("")
     if player_id is not None and not df_match.empty:
-        dm = df_match[df_match["PlayerID_norm"] == player_id].copy()
-        if not dm.empty:
+        dm = player_matches(player_id).copy()
+        # Matchs du joueur lus dans le cube : (journée, adversaire, ligne Match) par case joueur × journée
+        played = player_journees(match_cube, player_id, date_range=window_range)
+        if not dm.empty and played:
             analysis_mode = st.radio("Mode d'analyse", ["📊 Vue saison complète", "🎯 Match spécifique"], horizontal=True, key="perf_mode")
+            match_data = dm
             if analysis_mode == "🎯 Match spécifique":
-                if "Journée" in dm.columns and "Adversaire" in dm.columns:
-                    pairs = dm[["Journée","Adversaire"]].dropna().drop_duplicates().sort_values(["Journée","Adversaire"])
-                    journees = pairs["Journée"].unique().tolist()
-                    j_sel = st.selectbox("Journée", journees, index=0 if journees else None, key="j_sel_perf")
-                    adv_for_j = pairs.loc[pairs["Journée"] == j_sel, "Adversaire"].unique().tolist()
-                    adv_sel = st.selectbox("Adversaire", adv_for_j, index=0 if adv_for_j else None, key="adv_sel_perf")
-                    match_data = dm[(dm["Journée"] == j_sel) & (dm["Adversaire"] == adv_sel)]
-                else:
-                    match_data = dm.iloc[:1]
+                journees = [j for j, _, _ in played]
+                j_sel = st.selectbox("Journée", journees, index=0, format_func=lambda j: f"{j:g}", key="j_sel_perf")
+                _, adv_sel, match_row = played[journees.index(j_sel)]
+                st.selectbox("Adversaire", [adv_sel], index=0, key="adv_sel_perf")
+                perf_totals = cube_totals(match_cube, player_id, journees=(j_sel, j_sel))
+                match_journees = pd.Series([j_sel])
             else:
-                match_data = dm
-            if not match_data.empty:
-                total_minutes = to_num(match_data.get("Minutes Jouées", 0)).sum()
-                total_matches = len(match_data) if analysis_mode == "📊 Vue saison complète" else 1
-                kpis = calculate_kpis(match_data, total_minutes, total_matches, player_id, df_players)
+                perf_totals = cube_totals(match_cube, player_id, date_range=window_range)
+                match_journees = match_data["Journée"] if "Journée" in match_data.columns else None
+            if perf_totals["matches"] > 0:
+                total_minutes = perf_totals["minutes"]
+                total_matches = int(perf_totals["matches"]) if analysis_mode == "📊 Vue saison complète" else 1
+                xt_total = player_tracking_total(xt_by_match, "xt", player_id, match_journees)
+                xg_model_total = player_tracking_total(xg_by_match, "xg_model", player_id, match_journees)
+                kpis = cube_kpis(perf_totals, player_id, df_players, xt_total=xt_total)
                 # Section Minutes Jouées
                 st.markdown("#### ⏱️ Statistiques de Temps de Jeu")
-                minutes_col1, minutes_col2, minutes_col3 = st.columns(3)
-                with minutes_col1:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Total Minutes</h3>
-                        <div class="value" style="color: #3b82f6;">{int(total_minutes)}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with minutes_col2:
-                    avg_minutes = total_minutes / total_matches if total_matches > 0 else 0
-                    color = "#10b981" if avg_minutes >= 70 else "#f59e0b" if avg_minutes >= 45 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Moyenne par Match</h3>
-                        <div class="value" style="color: {color};">{int(avg_minutes)}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with minutes_col3:
-                    max_possible_minutes = total_matches * 90
-                    pct_played = (total_minutes / max_possible_minutes * 100) if max_possible_minutes > 0 else 0
-                    color = "#10b981" if pct_played >= 80 else "#f59e0b" if pct_played >= 60 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>% du Temps de Jeu</h3>
-                        <div class="value" style="color: {color};">{pct_played:.1f}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                avg_minutes = total_minutes / total_matches if total_matches > 0 else 0
+                max_possible_minutes = total_matches * 90
+                pct_played = (total_minutes / max_possible_minutes * 100) if max_possible_minutes > 0 else 0
+                render_cards("perf_minutes_cards", [
+                    {"label": "Total Minutes", "value": f"{int(total_minutes)}", "color": "#3b82f6"},
+                    {"label": "Moyenne par Match", "value": f"{int(avg_minutes)}", "color": "#10b981" if avg_minutes >= 70 else "#f59e0b" if avg_minutes >= 45 else "#ef4444"},
+                    {"label": "% du Temps de Jeu", "value": f"{pct_played:.1f}%", "color": "#10b981" if pct_played >= 80 else "#f59e0b" if pct_played >= 60 else "#ef4444"},
+                ])
                 st.markdown(f"##### 📈 Progression du Temps de Jeu")
                 progress_color = "#10b981" if pct_played > 70 else "#3b82f6" if pct_played > 40 else "#f59e0b"
                 st.markdown(
@@ -831,34 +767,24 @@ with tabs[1]:
                 st.markdown("#### 🎯 KPIs de Performance - Synthèse Tactique")
                 # ========== DISTRIBUTION ==========
                 st.markdown("##### 📤 Distribution (Contrôle et Création)")
-                dist_cols = st.columns(3)
-                with dist_cols[0]:
-                    color = "#10b981" if kpis['pass_accuracy'] > kpis['benchmarks']['pass_accuracy'] else "#f59e0b" if kpis['pass_accuracy'] > kpis['benchmarks']['pass_accuracy'] * 0.9 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Précision Passes</h3>
-                        <div class="value" style="color: {color};">{kpis['pass_accuracy']:.1f}%</div>
-                        <div style="font-size: 12px; color: var(--muted);">Benchmark: {kpis['benchmarks']['pass_accuracy']}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with dist_cols[1]:
-                    color = "#10b981" if kpis['prog_passes_per_90'] > kpis['benchmarks']['prog_passes_per_90'] else "#f59e0b" if kpis['prog_passes_per_90'] > kpis['benchmarks']['prog_passes_per_90'] * 0.8 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Passes Progressives</h3>
-                        <div class="value" style="color: {color};">{kpis['prog_passes_per_90']:.1f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">/90 min</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with dist_cols[2]:
-                    color = "#10b981" if kpis['key_passes_per_match'] > kpis['benchmarks']['key_passes_per_match'] else "#f59e0b" if kpis['key_passes_per_match'] > kpis['benchmarks']['key_passes_per_match'] * 0.8 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Passes Décisives</h3>
-                        <div class="value" style="color: {color};">{kpis['key_passes_per_match']:.2f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">/match</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                has_xt = 'xt_per_90' in kpis
+                dist_cards = [
+                    {"label": "Précision Passes", "value": f"{kpis['pass_accuracy']:.1f}%", "color": benchmark_color(kpis, 'pass_accuracy', 0.9),
+                     "note": f"Benchmark: {kpis['benchmarks']['pass_accuracy']}%"},
+                    {"label": "Passes Progressives", "value": f"{kpis['prog_passes_per_90']:.1f}", "color": benchmark_color(kpis, 'prog_passes_per_90', 0.8), "note": "/90 min"},
+                ]
+                if has_xt:
+                    dist_cards.append({"label": "xT Créé (Passes)", "value": f"{kpis['xt_per_90']:.2f}",
+                                       "color": "#10b981" if kpis['xt_per_90'] > 0.1 else "#f59e0b" if kpis['xt_per_90'] > 0 else "#ef4444",
+                                       "note": f"/90 min • total {xt_total:+.2f}"})
+                dist_cards.append({"label": "Passes Décisives", "value": f"{kpis['key_passes_per_match']:.2f}", "color": benchmark_color(kpis, 'key_passes_per_match', 0.8), "note": "/match"})
+                render_cards("perf_dist_cards", dist_cards)
+                if has_xt:
+                    with st.expander(f"🧮 Grille xT — {xt_model['bins'][0]}×{xt_model['bins'][1]} cases (modèle Tracking)", expanded=False):
+                        st.plotly_chart(plotly_grid(xt_model["grid"], colorscale='Purples', height=420,
+                                                    texttemplate="%{z:.2f}", hovertemplate="xT %{z:.3f}<extra></extra>"),
+                                        use_container_width=True, key="xt_grid")
+                        st.caption(f"Valeur d'une possession par case, résolue en {xt_model['iterations']} itérations ; attaque vers la droite.")
                 # --- Visualisations Distribution ---
                 st.markdown("##### 📊 Répartition des Passes par Type (Cumul Saison)")
                 if analysis_mode == "📊 Vue saison complète" and len(match_data) > 1:
@@ -908,50 +834,20 @@ with tabs[1]:
                     else:
                         st.info("Données de passes par type non disponibles.")
                     st.markdown("##### 📊 Taux de Réussite par Type de Passe")
-                    pct_cols = st.columns(3)
-                    with pct_cols[0]:
-                        if "Passe tentées" in match_data.columns and "Passe complete" in match_data.columns:
-                            total_tent = to_num(match_data["Passe tentées"]).sum()
-                            total_comp = to_num(match_data["Passe complete"]).sum()
-                            pct_global = (total_comp / total_tent * 100) if total_tent > 0 else 0
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h3>Passes Complètes</h3>
-                                <div class="value" style="color: #3b82f6;">{pct_global:.1f}%</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    with pct_cols[1]:
-                        if "Passe courte tentée" in match_data.columns and "Passe courte complète" in match_data.columns:
-                            ct = to_num(match_data["Passe courte tentée"]).sum()
-                            cc = to_num(match_data["Passe courte complète"]).sum()
-                            pct_courte = (cc / ct * 100) if ct > 0 else 0
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h3>Courtes</h3>
-                                <div class="value" style="color: #10b981;">{pct_courte:.1f}%</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    with pct_cols[2]:
-                        if "Passe moyenne tentée" in match_data.columns and "Passe moyenne complète" in match_data.columns:
-                            mt = to_num(match_data["Passe moyenne tentée"]).sum()
-                            mc = to_num(match_data["Passe moyenne complète"]).sum()
-                            pct_moy = (mc / mt * 100) if mt > 0 else 0
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h3>Moyennes</h3>
-                                <div class="value" style="color: #f59e0b;">{pct_moy:.1f}%</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    if "Passe longue tentée" in match_data.columns and "Passe longue complète" in match_data.columns:
-                        lt = to_num(match_data["Passe longue tentée"]).sum()
-                        lc = to_num(match_data["Passe longue complète"]).sum()
-                        pct_long = (lc / lt * 100) if lt > 0 else 0
-                        st.markdown(f"""
-                        <div class="metric-card" style="margin-top: 12px;">
-                            <h3>Longues</h3>
-                            <div class="value" style="color: #ef4444;">{pct_long:.1f}%</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    pass_rate_cols = [
+                        ("Passes Complètes", "Passe tentées", "Passe complete", "#3b82f6"),
+                        ("Courtes", "Passe courte tentée", "Passe courte complète", "#10b981"),
+                        ("Moyennes", "Passe moyenne tentée", "Passe moyenne complète", "#f59e0b"),
+                        ("Longues", "Passe longue tentée", "Passe longue complète", "#ef4444"),
+                    ]
+                    pass_rate_cards = []
+                    for label, tent_col, comp_col, color in pass_rate_cols:
+                        if tent_col in match_data.columns and comp_col in match_data.columns:
+                            tent = to_num(match_data[tent_col]).sum()
+                            pct = (to_num(match_data[comp_col]).sum() / tent * 100) if tent > 0 else 0
+                            pass_rate_cards.append({"label": label, "value": f"{pct:.1f}%", "color": color})
+                    if pass_rate_cards:
+                        render_cards("perf_pass_rate_cards", pass_rate_cards, columns=3)
                 else:
                     st.info("Données insuffisantes pour afficher l'évolution (nécessite ≥2 matchs en mode saison).")
                 st.markdown("---")
@@ -971,13 +867,7 @@ with tabs[1]:
                         fig_zones.update_layout(title="Synthèse Possession : Zones & Déplacement", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#e2e8f0'), showlegend=False, height=400)
                         st.plotly_chart(fig_zones, use_container_width=True)
                         if "Recuperation du ballon" in match_data.columns:
-                            total_recup = to_num(match_data["Recuperation du ballon"]).sum()
-                            st.markdown(f"""
-                            <div class="metric-card" style="margin-top: 12px;">
-                                <h3>Récupérations Totales</h3>
-                                <div class="value" style="color: #8b5cf6;">{int(total_recup)}</div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                            render_cards("perf_recup_cards", [{"label": "Récupérations Totales", "value": f"{int(perf_totals['recoveries'])}", "color": "#8b5cf6"}])
                     else:
                         st.info("Aucune donnée de possession disponible.")
                 else:
@@ -985,34 +875,23 @@ with tabs[1]:
                 st.markdown("---")
                 # ========== OFFENSE ==========
                 st.markdown("##### ⚽ Offense (Création et Finition)")
-                off_cols = st.columns(3)
-                with off_cols[0]:
-                    color = "#10b981" if kpis['shot_accuracy'] > kpis['benchmarks']['shot_accuracy'] else "#f59e0b" if kpis['shot_accuracy'] > kpis['benchmarks']['shot_accuracy'] * 0.9 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Précision Tirs</h3>
-                        <div class="value" style="color: {color};">{kpis['shot_accuracy']:.1f}%</div>
-                        <div style="font-size: 12px; color: var(--muted);">Benchmark: {kpis['benchmarks']['shot_accuracy']}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with off_cols[1]:
-                    color = "#10b981" if kpis['xg_per_90'] > kpis['benchmarks']['xg_per_90'] else "#f59e0b" if kpis['xg_per_90'] > kpis['benchmarks']['xg_per_90'] * 0.8 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>xG Généré</h3>
-                        <div class="value" style="color: {color};">{kpis['xg_per_90']:.2f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">/90 min</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with off_cols[2]:
-                    color = "#10b981" if kpis['goals_per_xg'] > kpis['benchmarks']['goals_per_xg'] else "#f59e0b" if kpis['goals_per_xg'] > kpis['benchmarks']['goals_per_xg'] * 0.9 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Efficacité Finition</h3>
-                        <div class="value" style="color: {color};">{kpis['goals_per_xg']:.2f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">Buts/xG</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                off_cards = [
+                    {"label": "Précision Tirs", "value": f"{kpis['shot_accuracy']:.1f}%", "color": benchmark_color(kpis, 'shot_accuracy', 0.9),
+                     "note": f"Benchmark: {kpis['benchmarks']['shot_accuracy']}%"},
+                    {"label": "xG Généré", "value": f"{kpis['xg_per_90']:.2f}", "color": benchmark_color(kpis, 'xg_per_90', 0.8), "note": "/90 min"},
+                    {"label": "Efficacité Finition", "value": f"{kpis['goals_per_xg']:.2f}", "color": benchmark_color(kpis, 'goals_per_xg', 0.9), "note": "Buts/xG"},
+                ]
+                if xg_model_total is not None:
+                    xg_model_per_90 = (xg_model_total / total_minutes * 90) if total_minutes > 0 else 0
+                    off_cards.append({"label": "xG Modèle (Tracking)", "value": f"{xg_model_per_90:.2f}", "color": "#8b5cf6",
+                                      "note": f"/90 min • total {xg_model_total:.2f} vs saisi {perf_totals['xg']:.2f}"})
+                render_cards("perf_off_cards", off_cards)
+                if xg_model_total is not None:
+                    st.caption(
+                        "xG modèle : régression logistique distance + angle, "
+                        + (f"ajustée sur {xg_model['shots']} tirs ({xg_model['goals']} buts)." if xg_model['fitted']
+                           else "coefficients par défaut (résultats de tir absents ou insuffisants dans Tracking).")
+                    )
                 # --- Visualisation Offensive ---
                 st.markdown("##### 🎯 Performance Offensive Détaillée")
                 if analysis_mode == "📊 Vue saison complète" and len(match_data) > 1:
@@ -1030,6 +909,12 @@ with tabs[1]:
                     fig_offense.add_trace(go.Scatter(x=match_numbers, y=tirs_cum, mode='lines+markers', name='Tirs', line=dict(color='#f59e0b', width=2)), secondary_y=False)
                     fig_offense.add_trace(go.Scatter(x=match_numbers, y=tirs_cadres_cum, mode='lines+markers', name='Tirs Cadrés', line=dict(color='#10b981', width=2)), secondary_y=False)
                     fig_offense.add_trace(go.Scatter(x=match_numbers, y=xg_cum, mode='lines+markers', name='xG', line=dict(color='#8b5cf6', width=3, dash='dot')), secondary_y=True)
+                    if xg_by_match is not None and "Journée" in match_data.columns and "Journée" in xg_by_match.columns:
+                        # xG modèle par match, aligné sur les journées de la feuille Match
+                        xg_player = xg_by_match[xg_by_match["PlayerID_norm"] == player_id]
+                        xg_per_j = xg_player.groupby(pd.to_numeric(xg_player["Journée"], errors="coerce"))["xg_model"].sum()
+                        xg_model_cum = pd.to_numeric(match_data["Journée"], errors="coerce").map(xg_per_j).fillna(0).cumsum()
+                        fig_offense.add_trace(go.Scatter(x=match_numbers, y=xg_model_cum, mode='lines', name='xG Modèle', line=dict(color='#ec4899', width=2, dash='dash')), secondary_y=True)
                     fig_offense.update_layout(
                         title="Cumul Offensif : Buts, Tirs, Tirs Cadrés & xG",
                         xaxis_title="Numéro de Match",
@@ -1044,25 +929,16 @@ with tabs[1]:
                     total_buts = buts.sum()
                     total_xg = xg.sum()
                     ratio_buts_xg = total_buts / total_xg if total_xg > 0 else 0
-                    eff_col1, eff_col2, eff_col3, eff_col4 = st.columns(4)
-                    with eff_col1:
-                        st.markdown(f"""<div class="metric-card"><h3>Total Buts</h3><div class="value" style="color: #ef4444;">{int(total_buts)}</div></div>""", unsafe_allow_html=True)
-                    with eff_col2:
-                        st.markdown(f"""<div class="metric-card"><h3>Total Tirs</h3><div class="value" style="color: #f59e0b;">{int(tirs.sum())}</div></div>""", unsafe_allow_html=True)
-                    with eff_col3:
-                        st.markdown(f"""<div class="metric-card"><h3>Tirs Cadrés</h3><div class="value" style="color: #10b981;">{int(tirs_cadres.sum())}</div></div>""", unsafe_allow_html=True)
-                    with eff_col4:
-                        color = "#10b981" if ratio_buts_xg > 1.1 else "#f59e0b" if ratio_buts_xg >= 0.9 else "#ef4444"
-                        st.markdown(f"""<div class="metric-card"><h3>Buts / xG</h3><div class="value" style="color: {color};">{ratio_buts_xg:.2f}</div></div>""", unsafe_allow_html=True)
-                elif analysis_mode == "🎯 Match spécifique" and not match_data.empty:
-                    buts = to_num(match_data.iloc[0].get("Buts", 0)).iloc[0]
-                    tirs = to_num(match_data.iloc[0].get("Tir", 0)).iloc[0]
-                    tirs_cadres = to_num(match_data.iloc[0].get("Tir cadre", 0)).iloc[0]
-                    xg_val = to_num(match_data.iloc[0].get("xG", 0)).iloc[0]
-                    categories = ['Buts', 'Tirs', 'Tirs Cadrés', 'xG']
-                    values = [buts, tirs, tirs_cadres, xg_val]
-                    max_vals = [5, 10, 8, 2]
-                    normalized = [min(v / m * 100, 100) for v, m in zip(values, max_vals)]
+                    render_cards("perf_finish_cards", [
+                        {"label": "Total Buts", "value": f"{int(total_buts)}", "color": "#ef4444"},
+                        {"label": "Total Tirs", "value": f"{int(tirs.sum())}", "color": "#f59e0b"},
+                        {"label": "Tirs Cadrés", "value": f"{int(tirs_cadres.sum())}", "color": "#10b981"},
+                        {"label": "Buts / xG", "value": f"{ratio_buts_xg:.2f}", "color": "#10b981" if ratio_buts_xg > 1.1 else "#f59e0b" if ratio_buts_xg >= 0.9 else "#ef4444"},
+                    ])
+                elif analysis_mode == "🎯 Match spécifique":
+                    buts, xg_val = perf_totals["goals"], perf_totals["xg"]
+                    categories = radar_categories("offense")
+                    normalized = radar_vector(radar_tables, match_row, "offense", level="match")
                     fig_radar_off = go.Figure()
                     fig_radar_off.add_trace(go.Scatterpolar(r=normalized, theta=categories, fill='toself', line=dict(color='#ef4444'), fillcolor='rgba(239, 68, 68, 0.2)'))
                     fig_radar_off.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), title="Synthèse Offensive du Match", paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#e2e8f0'))
@@ -1079,34 +955,12 @@ with tabs[1]:
                 st.markdown("---")
                 # ========== DÉFENSE ==========
                 st.markdown("##### 🛡️ Défense (Récupération et Duel)")
-                def_cols = st.columns(3)
-                with def_cols[0]:
-                    color = "#10b981" if kpis['duel_win_rate'] > kpis['benchmarks']['duel_win_rate'] else "#f59e0b" if kpis['duel_win_rate'] > kpis['benchmarks']['duel_win_rate'] * 0.9 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Taux Duel Gagné</h3>
-                        <div class="value" style="color: {color};">{kpis['duel_win_rate']:.1f}%</div>
-                        <div style="font-size: 12px; color: var(--muted);">Benchmark: {kpis['benchmarks']['duel_win_rate']}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with def_cols[1]:
-                    color = "#10b981" if kpis['interceptions_per_90'] > kpis['benchmarks']['interceptions_per_90'] else "#f59e0b" if kpis['interceptions_per_90'] > kpis['benchmarks']['interceptions_per_90'] * 0.8 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Interceptions</h3>
-                        <div class="value" style="color: {color};">{kpis['interceptions_per_90']:.1f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">/90 min</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with def_cols[2]:
-                    color = "#10b981" if kpis['recoveries_per_90'] > kpis['benchmarks']['recoveries_per_90'] else "#f59e0b" if kpis['recoveries_per_90'] > kpis['benchmarks']['recoveries_per_90'] * 0.8 else "#ef4444"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h3>Récupérations</h3>
-                        <div class="value" style="color: {color};">{kpis['recoveries_per_90']:.1f}</div>
-                        <div style="font-size: 12px; color: var(--muted);">/90 min</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_cards("perf_def_cards", [
+                    {"label": "Taux Duel Gagné", "value": f"{kpis['duel_win_rate']:.1f}%", "color": benchmark_color(kpis, 'duel_win_rate', 0.9),
+                     "note": f"Benchmark: {kpis['benchmarks']['duel_win_rate']}%"},
+                    {"label": "Interceptions", "value": f"{kpis['interceptions_per_90']:.1f}", "color": benchmark_color(kpis, 'interceptions_per_90', 0.8), "note": "/90 min"},
+                    {"label": "Récupérations", "value": f"{kpis['recoveries_per_90']:.1f}", "color": benchmark_color(kpis, 'recoveries_per_90', 0.8), "note": "/90 min"},
+                ])
                 # --- Visualisation Défensive ---
                 st.markdown("##### 🛡️ Analyse Détaillée des Duels et Actions Défensives")
                 if analysis_mode == "📊 Vue saison complète" and len(match_data) > 1:
@@ -1147,25 +1001,20 @@ with tabs[1]:
                             height=250
                         )
                         st.plotly_chart(fig_duels, use_container_width=True)
-                elif analysis_mode == "🎯 Match spécifique" and not match_data.empty:
-                    recup = to_num(match_data.iloc[0].get("Recuperation du ballon", 0)).iloc[0]
-                    inter = to_num(match_data.iloc[0].get("Interception", 0)).iloc[0]
-                    duels_tent = to_num(match_data.iloc[0].get("Duel tenté", 0)).iloc[0]
-                    duels_gagnes = to_num(match_data.iloc[0].get("Duel gagne", 0)).iloc[0]
-                    duels_aer_g = to_num(match_data.iloc[0].get("Duel aérien gagné", 0)).iloc[0]
-                    duels_aer_p = to_num(match_data.iloc[0].get("Duel aérien perdu", 0)).iloc[0]
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.markdown(f"""<div class="metric-card"><h3>Récupérations</h3><div class="value" style="color: #8b5cf6;">{int(recup)}</div></div>""", unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(f"""<div class="metric-card"><h3>Interceptions</h3><div class="value" style="color: #ec4899;">{int(inter)}</div></div>""", unsafe_allow_html=True)
-                    with col3:
-                        duel_pct = duels_gagnes / duels_tent * 100 if duels_tent > 0 else 0
-                        color = "#10b981" if duel_pct > 55 else "#f59e0b" if duel_pct > 50 else "#ef4444"
-                        st.markdown(f"""<div class="metric-card"><h3>Duels Gagnés</h3><div class="value" style="color: {color};">{duel_pct:.1f}%</div></div>""", unsafe_allow_html=True)
+                elif analysis_mode == "🎯 Match spécifique":
+                    recup, inter = perf_totals["recoveries"], perf_totals["interceptions"]
+                    duels_tent, duels_gagnes = perf_totals["duels_tent"], perf_totals["duels_won"]
+                    duels_aer_g, duels_aer_p = perf_totals["aerial_won"], perf_totals["aerial_lost"]
+                    duel_pct = duels_gagnes / duels_tent * 100 if duels_tent > 0 else 0
+                    match_def_cards = [
+                        {"label": "Récupérations", "value": f"{int(recup)}", "color": "#8b5cf6"},
+                        {"label": "Interceptions", "value": f"{int(inter)}", "color": "#ec4899"},
+                        {"label": "Duels Gagnés", "value": f"{duel_pct:.1f}%", "color": "#10b981" if duel_pct > 55 else "#f59e0b" if duel_pct > 50 else "#ef4444"},
+                    ]
                     if duels_aer_g + duels_aer_p > 0:
                         aer_pct = duels_aer_g / (duels_aer_g + duels_aer_p) * 100
-                        st.markdown(f"""<div class="metric-card" style="margin-top: 12px;"><h3>Duels Aériens</h3><div class="value" style="color: {'#10b981' if aer_pct > 55 else '#f59e0b' if aer_pct > 50 else '#ef4444'};">{aer_pct:.1f}%</div></div>""", unsafe_allow_html=True)
+                        match_def_cards.append({"label": "Duels Aériens", "value": f"{aer_pct:.1f}%", "color": '#10b981' if aer_pct > 55 else '#f59e0b' if aer_pct > 50 else '#ef4444'})
+                    render_cards("perf_match_def_cards", match_def_cards, columns=3)
                 st.markdown("---")
                 st.markdown("#### 📊 Synthèse Visuelle des KPIs")
                 st.caption("Comparaison par rapport aux benchmarks spécifiques à votre poste")
@@ -1179,6 +1028,48 @@ with tabs[1]:
                     fig_synthesis.add_shape(type="line", line=dict(color="rgba(255,255,255,0.5)", width=2, dash="dot"), y0=i-0.4, y1=i+0.4, x0=benchmark, x1=benchmark)
                 fig_synthesis.update_layout(title="Performance par KPI vs Benchmark (Spécifique au Poste)", xaxis_title="Valeur", yaxis_title="KPI", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#e2e8f0'), showlegend=False, height=600)
                 st.plotly_chart(fig_synthesis, use_container_width=True)
+    # ========== SPLITS (cube agrégé) ==========
+    if player_id is not None and str(player_id) in match_cube["players"]:
+        st.markdown("---")
+        st.markdown("#### 🧮 Splits de Performance")
+        st.caption("Agrégats lus dans le cube joueur × journée (adversaire en étiquette), sans refiltrer la feuille Match")
+        split_options = ["Adversaire", "Journées", "Minutes"] + (["Lieu"] if match_cube["home"] is not None else [])
+        sp_cols = st.columns([1, 2, 2])
+        split_by = sp_cols[0].radio("Découper par", split_options, key="split_by")
+        split_adv = sp_cols[1].multiselect("Adversaires", match_cube["adversaires"], placeholder="Tous", key="split_adv")
+        # Journées et dates proposées : celles de la période d'analyse
+        cube_j = cube_journees(match_cube, date_range=window_range)
+        split_j = None
+        if len(cube_j) > 1:
+            split_j = sp_cols[2].slider("Journées", int(min(cube_j)), int(max(cube_j)), (int(min(cube_j)), int(max(cube_j))), key="split_journees")
+        split_dates = window_range
+        if match_cube["dates"] is not None and cube_j:
+            cube_dates = pd.to_datetime(pd.Series(match_cube["dates"], index=match_cube["journees"])).loc[cube_j].dropna()
+            if not cube_dates.empty:
+                picked = sp_cols[2].date_input("Période", (cube_dates.min().date(), cube_dates.max().date()), key="split_dates")
+                if len(picked) == 2:
+                    # Intersection avec la période d'analyse
+                    lo, hi = pd.Timestamp(picked[0]), pd.Timestamp(picked[1])
+                    split_dates = (lo, hi) if window_range is None else (max(lo, date_start), min(hi, date_end))
+        split_window = st.slider("Journées par fenêtre", 2, 10, 5, key="split_window") if split_by == "Journées" else 5
+        split_filters = dict(adversaires=split_adv or None, journees=split_j, date_range=split_dates)
+        sel_totals = cube_totals(match_cube, player_id, **split_filters)
+        split_df = cube_split(match_cube, player_id, by=split_by, window=split_window, **split_filters)
+        tot_cols = st.columns(4)
+        tot_cols[0].metric("Matchs sélectionnés", f"{int(sel_totals['matches'])}")
+        tot_cols[1].metric("Minutes", f"{int(sel_totals['minutes'])}")
+        tot_cols[2].metric("Buts", f"{int(sel_totals['goals'])}")
+        tot_cols[3].metric("xG/90", f"{sel_totals['xg'] / sel_totals['minutes'] * 90 if sel_totals['minutes'] > 0 else 0:.2f}")
+        if split_df.empty:
+            st.info("ℹ️ Aucun match dans cette sélection.")
+        else:
+            split_view = split_df[list(SPLIT_COLUMNS)].rename(columns=SPLIT_COLUMNS)
+            split_metric = st.selectbox("Indicateur", list(SPLIT_COLUMNS.values())[2:], index=3, key="split_metric")
+            fig_split = px.bar(split_view.reset_index(names="Groupe"), x="Groupe", y=split_metric,
+                               title=f"{split_metric} par {split_by.lower()}", color=split_metric, color_continuous_scale="Blues")
+            fig_split.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#e2e8f0'), coloraxis_showscale=False)
+            st.plotly_chart(fig_split, use_container_width=True, key="split_chart")
+            st.dataframe(split_view.style.format(precision=1), use_container_width=True)
 
 # ======================= PROJECTIONS =======================
 # ... (tabs[2] inchangé)
@@ -1186,7 +1077,7 @@ with tabs[2]:
     st.markdown('<div class="hero"><span class="pill">📈 Projections par Régression Linéaire</span></div>', unsafe_allow_html=True)
     st.write("")
     if player_id is not None and not df_match.empty and show_predictions:
-        dm = df_match[df_match["PlayerID_norm"] == player_id].copy()
+        dm = player_matches(player_id).copy()
         if not dm.empty and len(dm) >= 5:
             st.markdown("#### 🔮 Prédictions de KPIs par Régression Linéaire")
             st.info("💡 Les prédictions sont basées sur un modèle de régression linéaire manuelle (sans sklearn).")
@@ -1204,19 +1095,11 @@ with tabs[2]:
             selected_kpi_name = st.selectbox("KPI à prédire", list(kpi_options.keys()), key="ml_kpi_select")
             selected_kpi_key = kpi_options[selected_kpi_name]
             periods_ahead = st.slider("Nombre de matchs à prédire", 1, 10, 5, key="ml_periods")
-            historical_kpis = []
-            for i in range(len(dm_ml)):
-                match_slice = dm_ml.iloc[:i+1]
-                total_min = to_num(match_slice.get("Minutes Jouées", 0)).sum()
-                total_matches = len(match_slice)
-                if selected_kpi_key == 'minutes_jouees':
-                    # Pour les minutes jouées, on prend simplement les minutes du match
-                    current_match_minutes = to_num(match_slice.iloc[-1].get("Minutes Jouées", 0)).iloc[0]
-                    historical_kpis.append(current_match_minutes)
-                else:
-                    kpi_dict = calculate_kpis(match_slice, total_min, total_matches, player_id, df_players)
-                    historical_kpis.append(kpi_dict[selected_kpi_key])
-            dm_ml['target_kpi'] = historical_kpis
+            # KPIs cumulés après chaque match (préchauffés sur la période complète) ; minutes : celles du match
+            kpi_hist = warm(player_id, "kpi_history")
+            if kpi_hist is None:
+                kpi_hist = kpi_history(dm_ml, player_id, df_players)
+            dm_ml['target_kpi'] = kpi_hist[selected_kpi_key].to_numpy()
             X = dm_ml['match_number'].values
             y = dm_ml['target_kpi'].values
             n = len(X)
@@ -1316,9 +1199,11 @@ with tabs[3]:
     st.markdown('<div class="hero"><span class="pill">🩺 Analyse Wellness & Corrélation Performance</span></div>', unsafe_allow_html=True)
     st.write("")
     if player_id is not None and not df_well.empty:
-        dw = df_well[df_well["PlayerID_norm"] == player_id].copy()
+        # Déjà triée par date et restreinte à la période globale
+        dw = player_wellness(player_id).copy()
+        well_warm = warm(player_id, "wellness")
         if not dw.empty and "DATE" in dw.columns:
-            dw = dw.sort_values("DATE").tail(60)
+            well_days = (dw["DATE"].max() - dw["DATE"].min()).days + 1 if dw["DATE"].notna().any() else 0
             wellness_metrics = [c for c in ["Energie générale", "Fraicheur musculaire", "Humeur", "Sommeil", "Intensité douleur"] if c in dw.columns]
             if wellness_metrics:
                 st.markdown("#### 📈 Courbes de Tendance par Indicateur")
@@ -1338,7 +1223,7 @@ with tabs[3]:
                             line=dict(width=3, color='#3b82f6'),
                             marker=dict(size=6)
                         ))
-                        ma7 = dw[metric].rolling(window=7, min_periods=1).mean()
+                        ma7 = well_warm["ma7"][metric] if well_warm is not None else dw[metric].rolling(window=7, min_periods=1).mean()
                         fig_metric.add_trace(go.Scatter(
                             x=dw["DATE"],
                             y=ma7,
@@ -1347,7 +1232,7 @@ with tabs[3]:
                             line=dict(width=4, color='#10b981', dash='solid')
                         ))
                         fig_metric.update_layout(
-                            title=f"Tendance de '{metric}' sur 60 jours",
+                            title=f"Tendance de '{metric}' sur {well_days} jours",
                             xaxis_title="Date",
                             yaxis_title="Score (0-10)",
                             paper_bgcolor='rgba(0,0,0,0)',
@@ -1385,50 +1270,46 @@ with tabs[3]:
                     st.plotly_chart(fig_combined, use_container_width=True)
                 st.markdown("---")
                 st.markdown("#### 📊 Statistiques des 7 Derniers Jours")
-                recent_data = dw.tail(7)
-                cols = st.columns(len(selected_metrics)) if selected_metrics else []
-                for i, metric in enumerate(selected_metrics):
-                    with cols[i] if cols else st.container():
-                        values = pd.to_numeric(recent_data[metric], errors='coerce').dropna()
-                        if not values.empty:
-                            avg_val = values.mean()
-                            trend = "📈" if len(values) > 1 and values.iloc[-1] > values.iloc[0] else "📉" if len(values) > 1 and values.iloc[-1] < values.iloc[0] else "➡️"
-                            if avg_val >= 8:
-                                color = "#10b981"
-                                status = "Optimal"
-                            elif avg_val >= 6:
-                                color = "#3b82f6"
-                                status = "Bon"
-                            elif avg_val >= 4:
-                                color = "#f59e0b"
-                                status = "Moyen"
-                            else:
-                                color = "#ef4444"
-                                status = "À surveiller"
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h3>{metric}</h3>
-                                <div class="value" style="color: {color};">{avg_val:.1f}/10</div>
-                                <div style="font-size: 12px; color: var(--muted); margin-top: 4px;">
-                                    {status} {trend}
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                last_day = dw["DATE"].max()
+                recent_data = player_wellness(player_id, last_day - timedelta(days=6), last_day) if pd.notna(last_day) else dw.iloc[0:0]
+                recent_cards = []
+                for metric in selected_metrics:
+                    values = pd.to_numeric(recent_data[metric], errors='coerce').dropna()
+                    if not values.empty:
+                        avg_val = values.mean()
+                        trend = "📈" if len(values) > 1 and values.iloc[-1] > values.iloc[0] else "📉" if len(values) > 1 and values.iloc[-1] < values.iloc[0] else "➡️"
+                        if avg_val >= 8:
+                            color = "#10b981"
+                            status = "Optimal"
+                        elif avg_val >= 6:
+                            color = "#3b82f6"
+                            status = "Bon"
+                        elif avg_val >= 4:
+                            color = "#f59e0b"
+                            status = "Moyen"
+                        else:
+                            color = "#ef4444"
+                            status = "À surveiller"
+                        recent_cards.append({"label": metric, "value": f"{avg_val:.1f}/10", "color": color, "note": f"{status} {trend}"})
+                if recent_cards:
+                    render_cards("wellness_recent_cards", recent_cards, columns=len(selected_metrics))
                 st.markdown("#### 🔗 Corrélation Wellness ↔ Performance (Derniers 15 jours)")
                 if not df_match.empty:
-                    dm_player = df_match[df_match["PlayerID_norm"] == player_id].copy()
+                    dm_player = player_matches(player_id).copy()
                     if "DATE" in dm_player.columns:
                         dm_player["DATE"] = pd.to_datetime(dm_player["DATE"], errors='coerce')
+                        corr_days = st.slider("Fenêtre Wellness avant match (jours)", 0, 7, 3, key="wellness_corr_days")
+                        # Moyennes wellness des N jours précédant chaque match : sommes préfixes + searchsorted
+                        window_values = timelines["wellness"].window_means(
+                            player_id, df_well[selected_metrics].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float),
+                            dm_player["DATE"], corr_days
+                        ) if selected_metrics else np.full((len(dm_player), 0), np.nan)
                         correlation_data = []
-                        for _, match_row in dm_player.iterrows():
+                        for (_, match_row), means in zip(dm_player.iterrows(), window_values):
                             match_date = match_row["DATE"]
                             if pd.notna(match_date):
-                                wellness_window = dw[
-                                    (dw["DATE"] >= match_date - timedelta(days=3)) &
-                                    (dw["DATE"] <= match_date)
-                                ]
-                                if not wellness_window.empty:
-                                    avg_wellness = {metric: wellness_window[metric].mean() for metric in selected_metrics}
+                                if np.isfinite(means).any():
+                                    avg_wellness = dict(zip(selected_metrics, means))
                                     match_df = pd.DataFrame([match_row])
                                     total_min_scalar = to_num(match_row.get("Minutes Jouées", 0)).iloc[0]
                                     perf_kpis = calculate_kpis(match_df, total_min_scalar, 1, player_id, df_players)
@@ -1497,74 +1378,45 @@ with tabs[3]:
 with tabs[4]:
     st.markdown('<div class="hero"><span class="pill">🔍 Analyse Comparative Avancée</span></div>', unsafe_allow_html=True)
     st.write("")
-    if compare_mode and player_id is not None and compare_player_id is not None:
-        dm1 = df_match[df_match["PlayerID_norm"] == player_id].copy()
-        dm2 = df_match[df_match["PlayerID_norm"] == compare_player_id].copy()
-        if not dm1.empty and not dm2.empty:
-            player1_name = sel_display.split(" (#")[0]
-            player2_name = compare_player.split(" (#")[0]
-            st.markdown(f"#### ⚖️ Comparaison: **{player1_name}** vs **{player2_name}**")
-            p1_matches = len(dm1)
-            p1_minutes = int(to_num(dm1.get("Minutes Jouées", 0)).sum())
-            p1_buts = int(to_num(dm1.get("Buts", 0)).sum())
-            p1_xg = float(to_num(dm1.get("xG", 0)).sum())
-            p1_passes = int(to_num(dm1.get("Passe complete", 0)).sum())
-            p2_matches = len(dm2)
-            p2_minutes = int(to_num(dm2.get("Minutes Jouées", 0)).sum())
-            p2_buts = int(to_num(dm2.get("Buts", 0)).sum())
-            p2_xg = float(to_num(dm2.get("xG", 0)).sum())
-            p2_passes = int(to_num(dm2.get("Passe complete", 0)).sum())
+    if compare_mode and player_id is not None and compare_player_ids:
+        compare_ids = [player_id] + [pid for pid in compare_player_ids if pid != player_id]
+        # Totaux de tous les joueurs lus en une fois dans les sommes de la table radar
+        totals = comparison_totals(radar_tables, compare_ids)
+        present = [pid for pid in compare_ids if totals.loc[pid, "Matchs Joués"] > 0]
+        if player_id in present and len(present) > 1:
+            names = {pid: player_names.get(pid, pid) for pid in present}
+            player1_name = names[player_id]
+            others = [pid for pid in present if pid != player_id]
+            if len(others) == 1:
+                st.markdown(f"#### ⚖️ Comparaison: **{player1_name}** vs **{names[others[0]]}**")
+                ref_label = names[others[0]][:10]
+            else:
+                st.markdown(f"#### ⚖️ Comparaison: **{player1_name}** vs {len(others)} joueurs")
+                ref_label = "moyenne"
+            p1 = totals.loc[player_id]
+            ref = totals.loc[others].mean()
             kpi_cols = st.columns(5)
-            kpi_cols[0].metric("Matchs Joués", f"{p1_matches}", f"{p1_matches - p2_matches:+d} vs {player2_name[:10]}")
-            kpi_cols[1].metric("Minutes", f"{p1_minutes}", f"{p1_minutes - p2_minutes:+d}")
-            kpi_cols[2].metric("Buts", f"{p1_buts}", f"{p1_buts - p2_buts:+d}")
-            kpi_cols[3].metric("xG", f"{p1_xg:.1f}", f"{p1_xg - p2_xg:+.1f}")
-            kpi_cols[4].metric("Passes", f"{p1_passes}", f"{p1_passes - p2_passes:+d}")
+            kpi_cols[0].metric("Matchs Joués", f"{int(p1['Matchs Joués'])}", f"{p1['Matchs Joués'] - ref['Matchs Joués']:+.0f} vs {ref_label}")
+            kpi_cols[1].metric("Minutes", f"{int(p1['Minutes'])}", f"{p1['Minutes'] - ref['Minutes']:+.0f}")
+            kpi_cols[2].metric("Buts", f"{int(p1['Buts'])}", f"{p1['Buts'] - ref['Buts']:+.0f}")
+            kpi_cols[3].metric("xG", f"{p1['xG']:.1f}", f"{p1['xG'] - ref['xG']:+.1f}")
+            kpi_cols[4].metric("Passes", f"{int(p1['Passes'])}", f"{p1['Passes'] - ref['Passes']:+.0f}")
+            if len(others) > 1:
+                totals_view = totals.loc[present].rename(index=names)
+                st.dataframe(totals_view.style.format({"xG": "{:.1f}"}, precision=0), use_container_width=True)
             st.markdown("##### 🕸️ Comparaison Radar")
-            col1, col2 = st.columns(2)
-            def calc_radar_metrics(dm):
-                matches = len(dm) if len(dm) > 0 else 1
-                passes_tent = to_num(dm.get("Passe tentées", 0)).sum()
-                passes_comp = to_num(dm.get("Passe complete", 0)).sum()
-                pass_eff = (passes_comp / passes_tent * 100) if passes_tent > 0 else 0
-                duel_tot_col = "Duel tenté" if "Duel tenté" in dm.columns else "Duel tente"
-                duels_tent = to_num(dm.get(duel_tot_col, 0)).sum()
-                duels_gagnes = to_num(dm.get("Duel gagne", 0)).sum()
-                duel_eff = (duels_gagnes / duels_tent * 100) if duels_tent > 0 else 0
-                tirs = to_num(dm.get("Tir", 0)).sum()
-                tirs_cadres = to_num(dm.get("Tir cadre", 0)).sum()
-                tir_eff = (tirs_cadres / tirs * 100) if tirs > 0 else 0
-                xg_per_match = to_num(dm.get("xG", 0)).sum() / matches
-                buts_per_match = to_num(dm.get("Buts", 0)).sum() / matches
-                minutes_per_match = to_num(dm.get("Minutes Jouées", 0)).sum() / matches
-                playtime_pct = min(minutes_per_match / 90 * 100, 100)
-                return [
-                    min(pass_eff, 100),
-                    min(duel_eff, 100),
-                    min(tir_eff, 100),
-                    min(xg_per_match * 20, 100),
-                    min(buts_per_match * 50, 100),
-                    playtime_pct
-                ]
-            radar_categories = ['Passes', 'Duels', 'Tirs', 'xG/Match', 'Buts/Match', 'Temps de Jeu']
-            with col1:
-                p1_radar = calc_radar_metrics(dm1)
-                fig1 = create_radar_chart(p1_radar, radar_categories, f"Performance - {player1_name}")
-                st.plotly_chart(fig1, use_container_width=True)
-            with col2:
-                p2_radar = calc_radar_metrics(dm2)
-                fig2 = create_radar_chart(p2_radar, radar_categories, f"Performance - {player2_name}")
-                st.plotly_chart(fig2, use_container_width=True)
+            compare_categories = radar_categories("compare")
+            # Radars de tous les joueurs sélectionnés : une lecture de la table, une figure superposée
+            compare_radars = radar_matrix(radar_tables, present, "compare")
+            compare_radars.index = [names[pid] for pid in present]
+            fig_radars = create_multi_radar_chart(
+                {name: row.tolist() for name, row in compare_radars.iterrows()},
+                compare_categories, "Performance Comparée"
+            )
+            st.plotly_chart(fig_radars, use_container_width=True)
             st.markdown("##### ⚡ Comparaison Directe")
-            comparison_data = []
-            for i, category in enumerate(radar_categories):
-                comparison_data.append({
-                    'Catégorie': category,
-                    player1_name: p1_radar[i],
-                    player2_name: p2_radar[i]
-                })
-            comp_df = pd.DataFrame(comparison_data)
-            fig_comp = px.bar(comp_df, x='Catégorie', y=[player1_name, player2_name],
+            comp_df = compare_radars.T.rename_axis("Catégorie").reset_index()
+            fig_comp = px.bar(comp_df, x='Catégorie', y=list(compare_radars.index),
                              title="Comparaison des Performances", barmode='group')
             fig_comp.update_layout(
                 paper_bgcolor='rgba(0,0,0,0)',
@@ -1578,24 +1430,18 @@ with tabs[4]:
                 ["Buts", "xG", "Passe complete", "Tir", "Duel gagne", "Minutes Jouées"],
                 key="compare_metric"
             )
-            if metric_to_compare in dm1.columns and metric_to_compare in dm2.columns:
+            if metric_to_compare in df_match_window.columns:
+                # Courbes cumulées de tous les joueurs en un seul groupby, sur la même période que les totaux
+                curves = cumulative_curves(df_match_window, present, metric_to_compare)
                 fig_evolution = go.Figure()
-                p1_values = to_num(dm1[metric_to_compare]).cumsum()
-                fig_evolution.add_trace(go.Scatter(
-                    x=list(range(1, len(p1_values) + 1)),
-                    y=p1_values,
-                    mode='lines+markers',
-                    name=player1_name,
-                    line=dict(width=3)
-                ))
-                p2_values = to_num(dm2[metric_to_compare]).cumsum()
-                fig_evolution.add_trace(go.Scatter(
-                    x=list(range(1, len(p2_values) + 1)),
-                    y=p2_values,
-                    mode='lines+markers',
-                    name=player2_name,
-                    line=dict(width=3)
-                ))
+                for pid, curve in curves.groupby("PlayerID_norm", sort=False):
+                    fig_evolution.add_trace(go.Scatter(
+                        x=curve["Match"],
+                        y=curve["Cumul"],
+                        mode='lines+markers',
+                        name=names.get(pid, pid),
+                        line=dict(width=3 if pid == player_id else 2)
+                    ))
                 fig_evolution.update_layout(
                     title=f"Évolution Cumulative - {metric_to_compare}",
                     xaxis_title="Numéro de Match",
@@ -1605,6 +1451,75 @@ with tabs[4]:
                     font=dict(color='#e2e8f0')
                 )
                 st.plotly_chart(fig_evolution, use_container_width=True)
+    # --- Profils similaires (indépendant du mode comparaison) ---
+    if player_id is not None and not df_match.empty:
+        st.markdown("---")
+        st.markdown("##### 🧬 Profils Similaires")
+        sim_cols = st.columns([1, 2])
+        with sim_cols[0]:
+            sim_metric = st.radio("Distance", list(SIMILARITY_METRICS), horizontal=True,
+                                  format_func={"cosine": "Cosinus", "euclidean": "Euclidienne"}.get, key="sim_metric")
+            sim_min_minutes = st.number_input("Minutes minimum", min_value=0, max_value=10000, value=SIM_MIN_MINUTES, step=45, key="sim_min_minutes")
+            sim_model = _similarity_model(df_match_window, radar_tables, WINDOW_SIG, sim_min_minutes)
+            n_candidates = len(sim_model["players"]) - 1
+            sim_k = st.slider("Nombre de profils", 1, n_candidates, min(5, n_candidates), key="sim_k") if n_candidates > 1 else 1
+            st.caption(f"{len(sim_model['players'])} profils • {len(sim_model['features'])} indicateurs par 90 min centrés-réduits")
+        with sim_cols[1]:
+            neighbours = nearest_players(sim_model, player_id, k=sim_k, metric=sim_metric)
+            if neighbours.empty:
+                st.info("ℹ️ Profil indisponible : minutes insuffisantes ou aucun autre joueur comparable.")
+            else:
+                neighbours["Joueur"] = neighbours["PlayerID_norm"].map(lambda pid: player_names.get(pid, pid))
+                fig_sim = px.bar(neighbours[::-1], x="Similarité", y="Joueur", orientation='h',
+                                 title=f"Joueurs les plus proches de {player_names.get(player_id, player_id)}",
+                                 color="Similarité", color_continuous_scale="Teal")
+                fig_sim.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                                      font=dict(color='#e2e8f0'), coloraxis_showscale=False, height=120 + 40 * len(neighbours))
+                st.plotly_chart(fig_sim, use_container_width=True, key="sim_chart")
+                profile_view = sim_model["profiles"].reindex([player_id] + neighbours["PlayerID_norm"].tolist())
+                profile_view.index = [player_names.get(pid, pid) for pid in profile_view.index]
+                st.dataframe(profile_view.T.style.format(precision=2), use_container_width=True)
+        # --- Rôles appris (clustering des profils) ---
+        st.markdown("##### 🧩 Rôles Joués")
+        if role_model["k"] == 0:
+            st.info("ℹ️ Aucun profil avec assez de minutes pour le clustering.")
+        else:
+            own_role = player_role(player_id)
+            st.caption(f"{ROLE_METHODS[role_method]} sur {len(role_model['labels'])} profils • "
+                       f"rôle de {player_names.get(player_id, player_id)} : {own_role or 'non classé (minutes insuffisantes)'}")
+            role_cols = st.columns([3, 2])
+            with role_cols[0]:
+                centroid_pct = role_model["centroid_pct"]
+                shown_roles = [own_role] if own_role else list(centroid_pct.index)
+                if own_role and st.checkbox("Afficher tous les rôles", value=False, key="role_show_all"):
+                    shown_roles = list(centroid_pct.index)
+                fig_roles = create_multi_radar_chart(
+                    {name: centroid_pct.loc[name].tolist() for name in shown_roles},
+                    list(centroid_pct.columns), "Profil type (centre du rôle, percentile effectif)"
+                )
+                st.plotly_chart(fig_roles, use_container_width=True, key="role_radar")
+            with role_cols[1]:
+                members = role_model["labels"].rename("code").to_frame()
+                members["Rôle"] = members["code"].map(role_model["names"])
+                members["Joueur"] = [player_names.get(pid, pid) for pid in members.index]
+                st.dataframe(members.sort_values(["code", "Joueur"])[["Rôle", "Joueur"]], hide_index=True, use_container_width=True)
+        # --- Classement de l'effectif selon la pondération du score (barre latérale) ---
+        st.markdown("##### 🏅 Classement Score Global")
+        if score_components.empty:
+            st.info("ℹ️ Aucun match pour calculer le score.")
+        else:
+            ranking = score_ranking(score_components, score_weights)
+            default_rank = score_ranking(score_components).loc[ranking.index, "Rang"]
+            ranking.insert(0, "Joueur", [player_names.get(pid, pid) for pid in ranking.index])
+            ranking["Δ Rang"] = default_rank - ranking["Rang"]
+            if player_id in ranking.index:
+                st.caption(f"{player_names.get(player_id, player_id)} : rang {ranking.loc[player_id, 'Rang']} / {len(ranking)} "
+                           f"(score {ranking.loc[player_id, 'Score']:.1f}) • Δ Rang par rapport à la pondération par défaut")
+            st.dataframe(
+                ranking.style.format(precision=1, subset=list(SCORE_COMPONENTS.values()) + ["Score"])
+                       .format("{:+d}", subset=["Δ Rang"]),
+                hide_index=True, use_container_width=True,
+            )
 # ======================= VISUALISATION TRACKING =======================
 with tabs[5]:  # 👁️ Visualisation
     st.markdown('<div class="hero"><span class="pill">👁️ Visualisation des Événements sur le Terrain</span></div>', unsafe_allow_html=True)
@@ -1613,104 +1528,112 @@ with tabs[5]:  # 👁️ Visualisation
     if 'df_tracking' not in locals() or df_tracking.empty:
         st.warning("L'onglet 'Tracking' est vide ou manquant dans le fichier Google Sheets.")
     else:
-        required_cols = ['PlayerID_norm', 'Event', 'X', 'Y']
-        missing = [c for c in required_cols if c not in df_tracking.columns]
+        missing = [c for c in TRACKING_REQUIRED_COLS if c not in df_tracking.columns]
         if missing:
             st.error(f"Colonnes manquantes dans 'Tracking' : {missing}")
         else:
-            # Conversion numérique
-            for col in ['X', 'Y', 'X2', 'Y2']:
-                if col in df_tracking.columns:
-                    df_tracking[col] = pd.to_numeric(df_tracking[col], errors='coerce')
-
-            # Conversion coordonnées 0-100 → 0-120/80
-            max_coord = df_tracking[['X', 'Y']].max().max()
-            if pd.notna(max_coord) and 50 < max_coord <= 105:
-                st.info("Conversion des coordonnées de 0-100 → 0-120/0-80")
-                df_tracking['X'] = df_tracking['X'] * 1.2
-                df_tracking['Y'] = df_tracking['Y'] * 0.8
-                if 'X2' in df_tracking.columns:
-                    df_tracking['X2'] = df_tracking['X2'] * 1.2
-                if 'Y2' in df_tracking.columns:
-                    df_tracking['Y2'] = df_tracking['Y2'] * 0.8
-
-            # Nettoyage texte
-            df_tracking['Event'] = (
-                df_tracking['Event']
-                .fillna('')
-                .astype(str)
-                .str.strip()
-                .str.lower()
-                .str.title()
-            )
-
-            # Classification des zones (logique inversée)
-            def classify_zone(x, y):
-                if 102 < x <= 120 and 18 < y < 62:
-                    return 'Surface Rép.'
-                elif 0 <= x < 36:
-                    return 'Haute'
-                elif 36 <= x <= 90:
-                    return 'Médiane'
-                elif 90 < x <= 102:
-                    return 'Basse'
-                else:
-                    return 'Médiane'
-
-            df_tracking['Zone'] = df_tracking.apply(lambda row: classify_zone(row['X'], row['Y']), axis=1)
+            coord_notes = [
+                f"{info['partition']} : {info['system']}" + (f", sens de jeu retourné sur {info['flipped']} événement(s)" if info["flipped"] else "")
+                for info in coord_info if info["converted"] or info["flipped"]
+            ]
+            if coord_notes:
+                st.info("Coordonnées ramenées au repère 120×80 — " + " • ".join(coord_notes))
+            unoriented_notes = [f"{info['partition']} : {', '.join(map(str, info['unoriented']))}" for info in coord_info if info.get("unoriented")]
+            if unoriented_notes:
+                st.warning("Sens de jeu inconnu (aucun tir ni colonne Sens), coordonnées laissées telles quelles — " + " • ".join(unoriented_notes))
 
             # Filtres dans la sidebar
             st.sidebar.header("👁️ Filtres Visualisation")
-            if player_id:
-                tracking_filtered = df_tracking[df_tracking['PlayerID_norm'] == player_id].copy()
+            tracking_warm = warm(player_id, "tracking") if player_id else None
+            if tracking_warm is not None:
+                tracking_filtered = df_tracking.iloc[tracking_warm["rows"]].copy()
+            elif player_id:
+                tracking_filtered = player_tracking(player_id).copy()
             else:
-                tracking_filtered = df_tracking.copy()
+                tracking_filtered = window_frame(df_tracking, "tracking").copy()
 
             if tracking_filtered.empty:
                 st.warning("Aucun événement pour ce joueur.")
             else:
-                event_options = sorted(tracking_filtered['Event'].dropna().unique())
-                zone_options = sorted(tracking_filtered['Zone'].dropna().unique())
-
-                selected_events_vis = st.sidebar.multiselect(
-                    "Événements", 
-                    event_options, 
-                    default=event_options[:min(3, len(event_options))] if event_options else []
-                )
-                selected_zones_vis = st.sidebar.multiselect(
-                    "Zones", 
-                    zone_options, 
-                    default=zone_options
-                )
-
-                # Filtre par journée si colonne existe
-                if 'Journée' in tracking_filtered.columns:
-                    match_options = sorted(tracking_filtered['Journée'].dropna().unique())
-                    selected_match = st.sidebar.selectbox("Journée", ["Toutes"] + list(match_options))
-                    if selected_match != "Toutes":
-                        tracking_filtered = tracking_filtered[tracking_filtered['Journée'] == selected_match]
+                if tracking_warm is not None:
+                    event_options, zone_options, match_options = (tracking_warm["options"][col] for col in ("Event", "Zone", "Journée"))
+                else:
+                    event_options = sorted(tracking_filtered['Event'].dropna().unique())
+                    zone_options = sorted(tracking_filtered['Zone'].dropna().unique())
+                    match_options = sorted(tracking_filtered['Journée'].dropna().unique()) if 'Journée' in tracking_filtered.columns else []
+                # Palette de couleurs
+                PALETTE_OPTIONS = {
+                    'Par défaut (Couleurs spécifiques + Tab20)': 'Par défaut',
+                    'Tab20': 'tab20',
+                    'Set1': 'Set1',
+                    'Viridis': 'viridis',
+                    'Plasma': 'plasma',
+                    'Coolwarm': 'coolwarm',
+                    'Pastel1': 'Pastel1',
+                    'Dark2': 'Dark2'
+                }
+                # Filtres regroupés dans un formulaire : une seule exécution au clic sur « Appliquer ».
+                # Le dernier jeu appliqué est mémorisé par joueur (et restreint aux options de la période).
+                vis_key = player_id or "__all__"
+                vis_applied = st.session_state.setdefault("vis_applied", {})
+                applied = vis_applied.get(vis_key, {})
+                applied = {
+                    "events": [e for e in applied.get("events", event_options[:min(3, len(event_options))]) if e in event_options],
+                    "zones": [z for z in applied.get("zones", zone_options) if z in zone_options],
+                    "journee": applied.get("journee", "Toutes") if applied.get("journee", "Toutes") in match_options else "Toutes",
+                    "palette": applied.get("palette", next(iter(PALETTE_OPTIONS))),
+                }
+                with st.sidebar.form(f"vis_filters_{vis_key}"):
+                    form_events = st.multiselect("Événements", event_options, default=applied["events"])
+                    form_zones = st.multiselect("Zones", zone_options, default=applied["zones"])
+                    journee_choices = ["Toutes"] + list(match_options)
+                    form_journee = st.selectbox("Journée", journee_choices, index=journee_choices.index(applied["journee"])) if match_options else "Toutes"
+                    form_palette = st.selectbox("Palette", list(PALETTE_OPTIONS.keys()), index=list(PALETTE_OPTIONS).index(applied["palette"]))
+                    if st.form_submit_button("✅ Appliquer", use_container_width=True):
+                        applied = vis_applied[vis_key] = {"events": form_events, "zones": form_zones, "journee": form_journee, "palette": form_palette}
+                selected_events_vis = applied["events"]
+                selected_palette = applied["palette"]
 
-                # Appliquer les filtres
-                tracking_filtered = tracking_filtered[
-                    tracking_filtered['Event'].isin(selected_events_vis) &
-                    tracking_filtered['Zone'].isin(selected_zones_vis)
-                ]
+                # Appliquer les filtres (positions mises en cache par joueur, période et jeu de filtres)
+                vis_rows = _vis_rows(tracking_filtered, f"{WINDOW_SIG}|{vis_key}",
+                                     tuple(selected_events_vis), tuple(applied["zones"]), applied["journee"])
+                tracking_filtered = tracking_filtered.iloc[vis_rows]
 
                 if tracking_filtered.empty:
                     st.warning("Aucun événement ne correspond aux filtres.")
                 else:
-                    # Palette de couleurs
-                    PALETTE_OPTIONS = {
-                        'Par défaut (Couleurs spécifiques + Tab20)': 'Par défaut',
-                        'Tab20': 'tab20',
-                        'Set1': 'Set1',
-                        'Viridis': 'viridis',
-                        'Plasma': 'plasma',
-                        'Coolwarm': 'coolwarm',
-                        'Pastel1': 'Pastel1',
-                        'Dark2': 'Dark2'
-                    }
-                    selected_palette = st.sidebar.selectbox("Palette", list(PALETTE_OPTIONS.keys()), index=0)
+                    # Réglages dans la sidebar, qu'un fragment ne peut pas porter : les changer relance le script
+                    # entier. Les clés des graphiques gardent l'identité des éléments, chaque figure est renvoyée en entier.
+                    vis_renderer = st.sidebar.radio("Rendu terrain", PITCH_RENDERERS, index=0, key="vis_pitch_renderer")
+                    use_plotly = vis_renderer == PITCH_RENDERER_PLOTLY
+                    heat_mode = st.sidebar.radio("Heatmaps", HEAT_MODES, index=0, key="vis_heat_mode")
+                    heat_fine = heat_mode == HEAT_FINE
+                    heat_sigma = st.sidebar.slider("Lissage (m)", 1.0, 8.0, HEAT_DEFAULT_SIGMA, 0.5, key="vis_heat_sigma") if heat_fine else 0.0
+                    heat_sig = f"{WINDOW_SIG}|{vis_key}|{tuple(selected_events_vis)}|{tuple(applied['zones'])}|{applied['journee']}"
+
+                    def show_heatmap(ev: pd.DataFrame, event_label: str, cmap: str, title: str | None, height: int, figsize: tuple, key: str):
+                        # Les deux modes lisent la même grille fine en cache : 6×5 en est l'agrégat exact
+                        grids = _heat_grids(ev['X'].to_numpy(float), ev['Y'].to_numpy(float), f"{heat_sig}|{event_label}", heat_sigma)
+                        grid = grids["density"] if heat_fine else grids["coarse"]
+                        if use_plotly:
+                            fig = plotly_density(grid, cmap, title, height) if heat_fine else plotly_grid(grid, cmap, title, height)
+                            st.plotly_chart(fig, use_container_width=True, key=key)
+                            return
+                        pitch = Pitch(pitch_type=PITCH_TYPE, pitch_color='#0b1220', line_color='#e2e8f0')
+                        fig, ax = pitch.draw(figsize=figsize)
+                        bin_stat = pitch.bin_statistic(np.array([]), np.array([]), statistic='count', bins=FINE_BINS if heat_fine else COARSE_BINS)
+                        bin_stat['statistic'] = grid
+                        if heat_fine:
+                            pitch.heatmap(bin_stat, ax=ax, cmap=cmap, alpha=0.85)
+                        else:
+                            pitch.heatmap(bin_stat, ax=ax, cmap=cmap, edgecolor='white', alpha=0.8)
+                            pitch.label_heatmap(
+                                bin_stat, ax=ax, str_format='{:.0%}',
+                                fontsize=12, color='white', ha='center', va='center'
+                            )
+                        if title:
+                            ax.set_title(title, color='white')
+                        show_figure(fig)
                     color_palette_name = PALETTE_OPTIONS[selected_palette]
 
                     base_colors = {
@@ -1721,7 +1644,7 @@ with tabs[5]:  # 👁️ Visualisation
 
                     def get_event_colors(event_list, palette_name, base_colors_dict):
                         if palette_name == 'Par défaut':
-                            cmap_for_others = cm.get_cmap('tab20', max(1, len(event_list)))
+                            cmap_for_others = colormaps['tab20'].resampled(max(1, len(event_list)))
                             generated_colors = {
                                 event: mcolors.to_hex(cmap_for_others(i)) 
                                 for i, event in enumerate([e for e in event_list if e not in base_colors_dict])
@@ -1729,10 +1652,10 @@ with tabs[5]:  # 👁️ Visualisation
                             return {**base_colors_dict, **generated_colors}
                         else:
                             try:
-                                cmap_selected = cm.get_cmap(palette_name, max(1, len(event_list)))
+                                cmap_selected = colormaps[palette_name].resampled(max(1, len(event_list)))
                                 return {event: mcolors.to_hex(cmap_selected(i)) for i, event in enumerate(event_list)}
-                            except ValueError:
-                                cmap_fallback = cm.get_cmap('tab20', max(1, len(event_list)))
+                            except (ValueError, KeyError):
+                                cmap_fallback = colormaps['tab20'].resampled(max(1, len(event_list)))
                                 return {event: mcolors.to_hex(cmap_fallback(i)) for i, event in enumerate(event_list)}
 
                     event_colors = get_event_colors(event_options, color_palette_name, base_colors)
@@ -1758,37 +1681,32 @@ with tabs[5]:  # 👁️ Visualisation
                     # Carte générale (sans légende)
                     with col_gen1:
                         st.markdown("##### Carte des Événements")
-                        pitch = Pitch(pitch_color='#0b1220', line_color='#e2e8f0', linewidth=1)
-                        fig, ax = pitch.draw(figsize=(10, 6))
-                        for event_type in selected_events_vis:
-                            ev_data = tracking_filtered[tracking_filtered['Event'] == event_type]
-                            color = event_colors.get(event_type, '#ffffff')
-                            has_xy2 = ev_data[['X2', 'Y2']].notna().all(axis=1)
-                            if has_xy2.any():
-                                pitch.arrows(
-                                    ev_data[has_xy2]['X'], ev_data[has_xy2]['Y'],
-                                    ev_data[has_xy2]['X2'], ev_data[has_xy2]['Y2'],
-                                    color=color, width=2.0, alpha=0.8, ax=ax
-                                )
-                            if (~has_xy2).any():
-                                pitch.scatter(
-                                    ev_data[~has_xy2]['X'], ev_data[~has_xy2]['Y'],
-                                    ax=ax, fc=color, ec='white', lw=0.5, s=80, alpha=0.8
-                                )
-                        st.pyplot(fig, use_container_width=True)
+                        if use_plotly:
+                            st.plotly_chart(plotly_event_map(tracking_filtered, selected_events_vis, event_colors), use_container_width=True, key="vis_map_all")
+                        else:
+                            pitch = Pitch(pitch_type=PITCH_TYPE, pitch_color='#0b1220', line_color='#e2e8f0', linewidth=1)
+                            fig, ax = pitch.draw(figsize=(10, 6))
+                            for event_type in selected_events_vis:
+                                ev_data = tracking_filtered[tracking_filtered['Event'] == event_type]
+                                color = event_colors.get(event_type, '#ffffff')
+                                has_xy2 = ev_data[['X2', 'Y2']].notna().all(axis=1)
+                                if has_xy2.any():
+                                    pitch.arrows(
+                                        ev_data[has_xy2]['X'], ev_data[has_xy2]['Y'],
+                                        ev_data[has_xy2]['X2'], ev_data[has_xy2]['Y2'],
+                                        color=color, width=2.0, alpha=0.8, ax=ax
+                                    )
+                                if (~has_xy2).any():
+                                    pitch.scatter(
+                                        ev_data[~has_xy2]['X'], ev_data[~has_xy2]['Y'],
+                                        ax=ax, fc=color, ec='white', lw=0.5, s=80, alpha=0.8
+                                    )
+                            show_figure(fig)
 
                     # Heatmap générale en POURCENTAGE
                     with col_gen2:
-                        st.markdown("##### Heatmap Générale (%)")
-                        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0b1220', line_color='#e2e8f0')
-                        fig, ax = pitch.draw(figsize=(10, 6))
-                        bin_stat = pitch.bin_statistic(tracking_filtered['X'], tracking_filtered['Y'], statistic='count', bins=(6, 5), normalize=True)
-                        pitch.heatmap(bin_stat, ax=ax, cmap='Reds', edgecolor='white', alpha=0.8)
-                        pitch.label_heatmap(
-                            bin_stat, ax=ax, str_format='{:.0%}',
-                            fontsize=12, color='white', ha='center', va='center'
-                        )
-                        st.pyplot(fig, use_container_width=True)
+                        st.markdown("##### Heatmap Générale (densité)" if heat_fine else "##### Heatmap Générale (%)")
+                        show_heatmap(tracking_filtered, "Tous", 'Reds', None, 500, (10, 6), "vis_heat_all")
 
                     # ==================== VUES DÉTAILLÉES PAR TYPE D'ÉVÉNEMENT ====================
                     st.markdown("### 🔍 Détail par Type d'Événement")
@@ -1807,39 +1725,249 @@ with tabs[5]:  # 👁️ Visualisation
                         # Carte spécifique (sans légende)
                         with col_ev1:
                             st.markdown("##### Carte des Événements")
-                            pitch = Pitch(pitch_color='#0b1220', line_color='#e2e8f0', linewidth=1)
-                            fig, ax = pitch.draw(figsize=(8, 5))
-                            has_xy2 = ev_data[['X2', 'Y2']].notna().all(axis=1)
-                            if has_xy2.any():
-                                pitch.arrows(
-                                    ev_data[has_xy2]['X'], ev_data[has_xy2]['Y'],
-                                    ev_data[has_xy2]['X2'], ev_data[has_xy2]['Y2'],
-                                    color=color, width=2.5, alpha=0.9, ax=ax
-                                )
-                            if (~has_xy2).any():
-                                pitch.scatter(
-                                    ev_data[~has_xy2]['X'], ev_data[~has_xy2]['Y'],
-                                    ax=ax, fc=color, ec='white', lw=0.5, s=100, alpha=0.9
-                                )
-                            ax.set_title(f"{event_type} - Positions", color='white')
-                            st.pyplot(fig, use_container_width=True)
+                            if use_plotly:
+                                st.plotly_chart(plotly_event_map(ev_data, [event_type], {event_type: color}, title=f"{event_type} - Positions", height=420, width=2.5), use_container_width=True, key=f"vis_map_{event_type}")
+                            else:
+                                pitch = Pitch(pitch_type=PITCH_TYPE, pitch_color='#0b1220', line_color='#e2e8f0', linewidth=1)
+                                fig, ax = pitch.draw(figsize=(8, 5))
+                                has_xy2 = ev_data[['X2', 'Y2']].notna().all(axis=1)
+                                if has_xy2.any():
+                                    pitch.arrows(
+                                        ev_data[has_xy2]['X'], ev_data[has_xy2]['Y'],
+                                        ev_data[has_xy2]['X2'], ev_data[has_xy2]['Y2'],
+                                        color=color, width=2.5, alpha=0.9, ax=ax
+                                    )
+                                if (~has_xy2).any():
+                                    pitch.scatter(
+                                        ev_data[~has_xy2]['X'], ev_data[~has_xy2]['Y'],
+                                        ax=ax, fc=color, ec='white', lw=0.5, s=100, alpha=0.9
+                                    )
+                                ax.set_title(f"{event_type} - Positions", color='white')
+                                show_figure(fig)
 
                         # Heatmap spécifique en POURCENTAGE
                         with col_ev2:
-                            st.markdown("##### Heatmap (%)")
-                            pitch = Pitch(pitch_type='statsbomb', pitch_color='#0b1220', line_color='#e2e8f0')
-                            fig, ax = pitch.draw(figsize=(8, 5))
-                            bin_stat = pitch.bin_statistic(ev_data['X'], ev_data['Y'], statistic='count', bins=(6, 5), normalize=True)
-                            pitch.heatmap(bin_stat, ax=ax, cmap=cmap_name, edgecolor='white', alpha=0.8)
-                            pitch.label_heatmap(
-                                bin_stat, ax=ax, str_format='{:.0%}',
-                                fontsize=12, color='white', ha='center', va='center'
-                            )
-                            ax.set_title(f"{event_type} - Densité", color='white')
-                            st.pyplot(fig, use_container_width=True)
+                            st.markdown("##### Heatmap (densité)" if heat_fine else "##### Heatmap (%)")
+                            show_heatmap(ev_data, event_type, cmap_name, f"{event_type} - Densité", 420, (8, 5), f"vis_heat_{event_type}")
 
                         st.markdown("---")
 
+            # ==================== PETITS MULTIPLES ====================
+            st.markdown("### 🧩 Petits Multiples — Profils Spatiaux")
+            sm_col1, sm_col2, sm_col3 = st.columns(3)
+            with sm_col1:
+                sm_facet = st.radio("Une heatmap par", ["Joueur", "Journée"], horizontal=True, key="sm_facet")
+            with sm_col2:
+                sm_event = st.selectbox("Événement", sorted(df_tracking['Event'].dropna().unique()), key="sm_event")
+            with sm_col3:
+                sm_grids = {"6×5": (6, 5), "12×8": (12, 8), "24×16": (24, 16)}
+                sm_bins = sm_grids[st.select_slider("Grille", list(sm_grids), key="sm_bins")]
+            # Par joueur : tout l'effectif ; par journée : le joueur sélectionné
+            if sm_facet == "Joueur":
+                sm_col, sm_scope, sm_source = "PlayerID_norm", "__all__", window_frame(df_tracking, "tracking")
+            else:
+                sm_col, sm_scope = "Journée", player_id or "__all__"
+                sm_source = player_tracking(player_id) if player_id else window_frame(df_tracking, "tracking")
+            if sm_col not in sm_source.columns or sm_source.empty:
+                st.info(f"Aucune donnée par {sm_facet.lower()} sur la période.")
+            else:
+                sm_keys, sm_counts = _facet_counts(sm_source, f"{WINDOW_SIG}|{sm_scope}", sm_event, sm_col, sm_bins)
+                sm_totals = sm_counts.reshape(len(sm_keys), -1).sum(axis=1)
+                shown = np.flatnonzero(sm_totals > 0)
+                if len(shown) > SMALL_MULTIPLES_MAX:
+                    shown = np.sort(shown[np.argsort(-sm_totals[shown], kind="stable")[:SMALL_MULTIPLES_MAX]])
+                    st.caption(f"{SMALL_MULTIPLES_MAX} {sm_facet.lower()}s les plus fournis affichés.")
+                if not len(shown):
+                    st.info(f"Aucun événement « {sm_event} » sur la période.")
+                else:
+                    def facet_title(key, total):
+                        name = player_names.get(str(key), str(key)) if sm_facet == "Joueur" else f"J{key:g}" if isinstance(key, (int, float, np.number)) else f"J{key}"
+                        return f"{name} ({int(total)})"
+                    sm_titles = [facet_title(sm_keys[i], sm_totals[i]) for i in shown]
+                    st.plotly_chart(plotly_small_multiples(sm_counts[shown], sm_titles, cols=4),
+                                    use_container_width=True, key="small_multiples")
+                    st.caption("Chaque panneau en % de ses propres événements, échelle de couleur commune ; attaque vers la droite.")
+
+            # ==================== RÉSEAU DE PASSES ====================
+            st.markdown("### 🕸️ Réseau de Passes")
+            networks = _pass_networks(df_tracking, FILE_SIG)
+            net_col1, net_col2, net_col3 = st.columns(3)
+            with net_col1:
+                net_journee = st.selectbox("Journée", ["Saison"] + networks["journees"], key="network_journee")
+            with net_col2:
+                net_kind = st.radio("Nœuds", ["Joueurs", "Zones"], horizontal=True, key="network_kind")
+            with net_col3:
+                net_min = st.slider("Passes minimum par lien", 1, 20, 3, key="network_min")
+            net_kind_key = "zones" if net_kind == "Zones" else "players"
+            net_adj, net_nodes, net_volume = network_slice(networks, None if net_journee == "Saison" else net_journee, net_kind_key)
+            if net_kind_key == "players":
+                net_labels = [player_names.get(pid, pid) for pid in networks["players"]]
+                st.caption(f"Receveur : {networks['receiver_source']}. Nœuds à la position moyenne du joueur, taille ∝ volume d'événements.")
+            else:
+                net_labels = [f"Z{i + 1}" for i in range(len(net_nodes))]
+            st.plotly_chart(plotly_pass_network(net_adj, net_nodes, net_volume, net_labels, min_passes=net_min),
+                            use_container_width=True, key="pass_network")
+
+            # ==================== SÉLECTION SPATIALE (TOUS JOUEURS) ====================
+            st.markdown("### 🎯 Sélection Spatiale — Tous Joueurs & Journées")
+            st.caption("Dessinez un rectangle ou un lasso sur le terrain, ou choisissez une zone prédéfinie.")
+            spatial_index = _tracking_spatial_index(df_tracking, FILE_SIG)
+            sp_col1, sp_col2, sp_col3 = st.columns(3)
+            with sp_col1:
+                anchor_label = st.radio("Point de référence", ["Départ (X, Y)", "Arrivée (X2, Y2)"], horizontal=True, key="spatial_anchor")
+                anchor = "start" if anchor_label.startswith("Départ") else "end"
+            with sp_col2:
+                region_choice = st.selectbox("Zone", ["Sélection sur le terrain"] + list(REGIONS.keys()) + ["Rectangle personnalisé"], key="spatial_region")
+            with sp_col3:
+                spatial_events = st.multiselect("Événements", sorted(df_tracking['Event'].dropna().unique()), key="spatial_events", placeholder="Tous")
+            if region_choice == "Rectangle personnalisé":
+                rx_col, ry_col = st.columns(2)
+                rect_x = rx_col.slider("X", 0.0, 120.0, (102.0, 120.0), key="spatial_rect_x")
+                rect_y = ry_col.slider("Y", 0.0, 80.0, (18.0, 62.0), key="spatial_rect_y")
+            # Fond de sélection : échantillon des points de référence
+            ref_x, ref_y = ('X', 'Y') if anchor == "start" else ('X2', 'Y2')
+            if ref_x in df_tracking.columns and ref_y in df_tracking.columns:
+                ref_points = df_tracking[[ref_x, ref_y]].dropna()
+                if len(ref_points) > WEBGL_THRESHOLD * 5:
+                    ref_points = ref_points.sample(WEBGL_THRESHOLD * 5, random_state=0)
+            else:
+                ref_points = pd.DataFrame(columns=[ref_x, ref_y])
+            fig_select = plotly_pitch(height=480)
+            fig_select.add_trace(go.Scattergl(x=ref_points[ref_x], y=ref_points[ref_y], mode='markers', hoverinfo='skip',
+                                              marker=dict(size=4, color='rgba(148, 163, 184, 0.45)')))
+            fig_select.update_layout(dragmode='select')
+            pitch_selection = st.plotly_chart(fig_select, use_container_width=True, key="spatial_pitch",
+                                              on_select="rerun", selection_mode=("box", "lasso"))
+            selection = pitch_selection.selection if pitch_selection else None
+            t_query = time.perf_counter()
+            rows = None
+            if region_choice in REGIONS:
+                rows = spatial_index.query_region(region_choice, on=anchor)
+            elif region_choice == "Rectangle personnalisé":
+                rows = spatial_index.query_rect(rect_x[0], rect_y[0], rect_x[1], rect_y[1], on=anchor)
+            elif selection and selection.get("box"):
+                box = selection["box"][0]
+                rows = spatial_index.query_rect(box["x"][0], box["y"][0], box["x"][1], box["y"][1], on=anchor)
+            elif selection and selection.get("lasso"):
+                lasso = selection["lasso"][0]
+                rows = spatial_index.query_polygon(list(zip(lasso["x"], lasso["y"])), on=anchor)
+            if rows is None:
+                st.info("Aucune zone sélectionnée.")
+            else:
+                if date_start is not None:
+                    rows = np.intersect1d(rows, timelines["tracking"].rows_all(date_start, date_end), assume_unique=True)
+                spatial_hits = df_tracking.iloc[rows]
+                if spatial_events:
+                    spatial_hits = spatial_hits[spatial_hits['Event'].isin(spatial_events)]
+                query_ms = (time.perf_counter() - t_query) * 1000
+                hit_cols = st.columns(3)
+                hit_cols[0].metric("Événements trouvés", f"{len(spatial_hits)}")
+                hit_cols[1].metric("Joueurs", f"{spatial_hits['PlayerID_norm'].nunique()}")
+                hit_cols[2].metric("Temps de requête", f"{query_ms:.1f} ms")
+                if not spatial_hits.empty:
+                    by_player = spatial_hits.groupby(['PlayerID_norm', 'Event']).size().unstack(fill_value=0)
+                    by_player.index = [player_names.get(pid, pid) for pid in by_player.index]
+                    st.dataframe(by_player, use_container_width=True)
+                    hit_events = sorted(spatial_hits['Event'].unique())
+                    hit_colors = dict(zip(hit_events, px.colors.qualitative.Plotly * (len(hit_events) // 10 + 1)))
+                    st.plotly_chart(plotly_event_map(spatial_hits, hit_events, hit_colors, title="Événements sélectionnés", height=480),
+                                    use_container_width=True, key="spatial_hits_map")
+
+# ======================= DONNÉES =======================
+with tabs[6]:  # 📄 Données
+    st.markdown('<div class="hero"><span class="pill">📄 Explorateur de Données</span></div>', unsafe_allow_html=True)
+    st.write("")
+    explorer_tables = {"Joueur": df_players, "Match": df_match_window,
+                       "Wellness": window_frame(df_well, "wellness"), "Tracking": window_frame(df_tracking, "tracking")}
+    explorer_tables = {name: frame for name, frame in explorer_tables.items() if not frame.empty}
+    if not explorer_tables:
+        st.info("ℹ️ Aucune feuille chargée.")
+    else:
+        sel_cols = st.columns([1, 2])
+        sheet = sel_cols[0].selectbox("📑 Feuille", list(explorer_tables), key="explorer_sheet")
+        df_sheet = explorer_tables[sheet]
+        domains = _explorer_domains(df_sheet, sheet, WINDOW_SIG)
+        search = sel_cols[1].text_input("🔎 Recherche (colonnes texte)", key=f"explorer_search_{sheet}").strip()
+        filter_cols = st.multiselect("🧰 Filtrer sur", list(domains), key=f"explorer_filter_cols_{sheet}")
+        # Spécification hashable des filtres : clé du cache des positions filtrées
+        filters = []
+        if filter_cols:
+            f_cols = st.columns(min(len(filter_cols), 3))
+            for i, col in enumerate(filter_cols):
+                kind, domain = domains[col]
+                wkey = f"explorer_f_{sheet}_{col}"
+                with f_cols[i % len(f_cols)]:
+                    if kind == "numeric":
+                        lo, hi = domain
+                        if lo == hi:
+                            st.caption(f"{col} : valeur unique {lo:g}")
+                            continue
+                        value = st.slider(str(col), lo, hi, (lo, hi), key=wkey)
+                    elif kind == "datetime":
+                        value = st.date_input(str(col), domain, min_value=domain[0], max_value=domain[1], key=wkey)
+                        if len(value) != 2:
+                            continue
+                    elif kind == "category":
+                        value = st.multiselect(str(col), list(domain), key=wkey, placeholder="Toutes les valeurs")
+                        if not value:
+                            continue
+                    else:
+                        value = st.text_input(f"{col} contient", key=wkey).strip()
+                        if not value:
+                            continue
+                filters.append((col, kind, value if kind == "text" else tuple(value)))
+
+        sort_cols = st.columns([2, 1, 1])
+        sort_col = sort_cols[0].selectbox("↕️ Trier par", [None] + list(df_sheet.columns),
+                                          format_func=lambda c: "Ordre du classeur" if c is None else str(c), key=f"explorer_sort_{sheet}")
+        ascending = sort_cols[1].radio("Ordre", ["Croissant", "Décroissant"], horizontal=True, key=f"explorer_order_{sheet}") == "Croissant"
+        page_size = sort_cols[2].selectbox("Lignes par page", PAGE_SIZES, index=1, key="explorer_page_size")
+
+        t_query = time.perf_counter()
+        rows = _explorer_rows(df_sheet, sheet, WINDOW_SIG, tuple(filters), search, sort_col, ascending)
+        query_ms = (time.perf_counter() - t_query) * 1000
+        n_pages = page_count(len(rows), page_size)
+        page_key = f"explorer_page_{sheet}"
+        if st.session_state.get(page_key, 1) > n_pages:
+            st.session_state[page_key] = n_pages
+        page = st.number_input(f"Page (sur {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+        visible = page_rows(rows, int(page), page_size)
+        # Seule la page visible est sérialisée vers le navigateur
+        st.dataframe(df_sheet.iloc[visible], use_container_width=True, hide_index=True)
+        first = (int(page) - 1) * page_size + 1 if len(rows) else 0
+        st.caption(f"Lignes {first}–{first + len(visible) - 1 if len(rows) else 0} sur {len(rows):,} "
+                   f"(filtrées parmi {len(df_sheet):,}) • requête {query_ms:.1f} ms".replace(",", " "))
+
+        # Export du résultat filtré complet, généré par blocs au clic seulement
+        stem = f"{sheet.lower()}_{len(rows)}_lignes"
+        exp_cols = st.columns(2)
+        exp_cols[0].download_button("⬇️ Export CSV", data=lambda df=df_sheet, r=rows: export_csv(df, r),
+                                    file_name=f"{stem}.csv", mime="text/csv", on_click="ignore",
+                                    use_container_width=True, key=f"explorer_csv_{sheet}")
+        exp_cols[1].download_button("⬇️ Export Parquet", data=lambda df=df_sheet, r=rows: export_parquet(df, r),
+                                    file_name=f"{stem}.parquet", mime="application/octet-stream", on_click="ignore",
+                                    use_container_width=True, key=f"explorer_parquet_{sheet}")
+
+    # --- Diagnostics mémoire (process courant) : mesuré seulement quand le panneau est activé ---
+    st.markdown("---")
+    if st.toggle("🧠 Diagnostics mémoire", value=False, key="memory_diagnostics"):
+        mem_sheets = frame_memory({"Joueur": df_players, "Match": df_match, "Wellness": df_well, "Tracking": df_tracking})
+        mem_caches = cache_memory()
+        mem_trend = rss_trend.frame()
+        mem_figures = figure_ledger.stats()
+        mem_cols = st.columns(4)
+        mem_cols[0].metric("RSS process", f"{mem_trend['RSS (Mo)'].iloc[-1]:.0f} Mo" if not mem_trend.empty else "—")
+        mem_cols[1].metric("Feuilles", f"{mem_sheets['Mo'].sum():.1f} Mo")
+        mem_cols[2].metric("cache_data", f"{mem_caches['Mo'].sum():.1f} Mo")
+        mem_cols[3].metric("Figures ouvertes", f"{mem_figures['ouvertes']}", f"{mem_figures['fermées']} fermées", delta_color="off")
+        st.dataframe(mem_sheets.style.format({"Mo": "{:.2f}"}), use_container_width=True)
+        st.dataframe(mem_caches.sort_values("Mo", ascending=False).style.format({"Mo": "{:.2f}"}, na_rep="—"), use_container_width=True)
+        if len(mem_trend) > 1:
+            st.line_chart(mem_trend.set_index("Heure"), height=200)
+        st.download_button("⬇️ Rapport mémoire (JSON)",
+                           data=lambda: json.dumps(memory_report(mem_sheets, mem_caches, mem_trend, mem_figures), indent=2, default=str),
+                           file_name="memory_report.json", mime="application/json", on_click="ignore", key="memory_report")
+
 # -------------------- FOOTER --------------------
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,105 @@
+"""Export headless des rapports joueurs (cartes KPI, radar, heatmaps) en PNG / PDF / HTML.
+
+Le rendu matplotlib/mplsoccer est CPU-bound et mono-thread : les joueurs sont répartis
+sur un ProcessPoolExecutor.
+
+Exemples :
+    python export_reports.py --xlsx Football-Hub-all-in-one.xlsx --out reports --workers 4
+    python export_reports.py --formats png,html --benchmark     # temps pour 1, 4 et N workers
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hub.data import FILE_ID, MAX_DOWNLOAD_BYTES, download_gsheets_as_xlsx, parse_excel, unpack_workbook, TRACKING_REQUIRED_COLS, prepare_tracking
+from hub.coords import COORD_SYSTEMS, FLIP_MODES
+from hub.report import REPORT_FORMATS, init_worker, export_player_report
+from hub.scoring import SCORE_COMPONENTS
+
+def load_frames(xlsx: str | None, file_id: str, max_bytes: int = MAX_DOWNLOAD_BYTES, coords=None):
+    if not xlsx:
+        xlsx, _, _ = download_gsheets_as_xlsx(file_id, max_bytes=max_bytes)
+    df_players, df_match, _, df_tracking = unpack_workbook(parse_excel(xlsx))
+    if not df_tracking.empty and all(c in df_tracking.columns for c in TRACKING_REQUIRED_COLS):
+        df_tracking, info = prepare_tracking(df_tracking, coords)
+        if info["unoriented"]:
+            print(f"Sens de jeu inconnu (aucun tir ni Sens), non retourné : {', '.join(info['unoriented'])}", file=sys.stderr)
+        df_tracking = df_tracking[[c for c in ['PlayerID_norm', 'Event', 'X', 'Y'] if c in df_tracking.columns]]
+    else:
+        df_tracking = df_tracking.iloc[0:0].reindex(columns=['PlayerID_norm', 'Event', 'X', 'Y'])
+    return df_players, df_match, df_tracking
+def player_ids(df_players, df_match) -> list:
+    if not df_players.empty and "PlayerID_norm" in df_players.columns:
+        return df_players["PlayerID_norm"].dropna().unique().tolist()
+    if not df_match.empty and "PlayerID_norm" in df_match.columns:
+        return sorted(df_match["PlayerID_norm"].dropna().unique().tolist())
+    return []
+
+def parse_weights(spec: str | None) -> dict | None:
+    """``passing_efficiency=0.3,duel_success=0.2,...`` → pondération du score global (composantes absentes à 0)."""
+    if not spec:
+        return None
+    weights = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() not in SCORE_COMPONENTS:
+            raise ValueError(f"Composante inconnue : {name.strip()} (attendu : {', '.join(SCORE_COMPONENTS)})")
+        weights[name.strip()] = float(value)
+    return weights
+def run_export(frames, ids: list, out_dir: str, formats: tuple, workers: int, weights: dict | None = None) -> float:
+    """Exporte tous les joueurs avec `workers` process ; retourne le temps mur en secondes."""
+    t0 = time.perf_counter()
+    if workers <= 1:
+        init_worker(*frames, weights)
+        for pid in ids:
+            _, written, secs = export_player_report(pid, out_dir, formats)
+            print(f"  #{pid}: {len(written)} fichier(s) en {secs:.2f}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(*frames, weights)) as pool:
+            futures = [pool.submit(export_player_report, pid, out_dir, formats) for pid in ids]
+            for fut in as_completed(futures):
+                pid, written, secs = fut.result()
+                print(f"  #{pid}: {len(written)} fichier(s) en {secs:.2f}s")
+    return time.perf_counter() - t0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export en masse des rapports joueurs")
+    parser.add_argument("--xlsx", help="Classeur local (sinon export Google Sheets de --file-id)")
+    parser.add_argument("--file-id", default=FILE_ID, help="ID du Google Sheets public")
+    parser.add_argument("--max-mb", type=float, default=MAX_DOWNLOAD_BYTES / 1024 / 1024, help="Taille maximale du téléchargement (Mo)")
+    parser.add_argument("--coords", default="auto", choices=["auto", *COORD_SYSTEMS], help="Repère des coordonnées Tracking")
+    parser.add_argument("--flip", default="none", choices=FLIP_MODES, help="Retournement du sens de jeu (par match ou mi-temps)")
+    parser.add_argument("--weights", help="Pondération du score global, ex. passing_efficiency=0.3,duel_success=0.2 (défaut : celle du Dashboard)")
+    parser.add_argument("--out", default="reports", help="Dossier de sortie")
+    parser.add_argument("--formats", default=",".join(REPORT_FORMATS), help="Formats séparés par des virgules : png,pdf,html")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de process (défaut : nombre de CPU)")
+    parser.add_argument("--benchmark", action="store_true", help="Mesure le temps mur pour 1, 4 et N workers")
+    args = parser.parse_args(argv)
+    formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if unknown:
+        parser.error(f"Formats inconnus : {unknown}")
+    try:
+        weights = parse_weights(args.weights)
+    except ValueError as e:
+        parser.error(str(e))
+    frames = load_frames(args.xlsx, args.file_id, int(args.max_mb * 1024 * 1024), {"system": args.coords, "flip": args.flip})
+    ids = player_ids(frames[0], frames[1])
+    if not ids:
+        print("Aucun joueur trouvé dans le classeur.", file=sys.stderr)
+        return 1
+    n_cpu = os.cpu_count() or 1
+    worker_counts = sorted({1, 4, n_cpu}) if args.benchmark else [args.workers]
+    timings = {}
+    for workers in worker_counts:
+        print(f"▶ {len(ids)} joueur(s), {workers} worker(s)")
+        timings[workers] = run_export(frames, ids, args.out, formats, workers, weights)
+    print("\nWorkers | Temps mur (s) | Speed-up")
+    base = timings[worker_counts[0]]
+    for workers, secs in timings.items():
+        print(f"{workers:>7} | {secs:>13.2f} | {base / secs if secs > 0 else 0:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
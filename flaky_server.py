@@ -0,0 +1,135 @@
+"""Serveur HTTP capricieux : vérifie les tentatives, l'échec immédiat et le repli du téléchargement.
+
+Un classeur synthétique (``load_test.build_workbook``) est servi en local ; le chemin demandé
+choisit le comportement du serveur :
+
+    /ok      réponse normale
+    /fail2   503 aux deux premières requêtes, puis réponse normale
+    /trunc   corps coupé à la première requête (Content-Length complet), puis réponse normale
+    /404     introuvable
+    /gzip    corps compressé (Content-Encoding: gzip, Content-Length compressé)
+    /down    503 à toutes les requêtes
+    /switch  normal ou 503 selon l'état du serveur (repli de l'app sur le dernier classeur)
+
+Chaque scénario vérifie le résultat, la signature et le nombre de requêtes reçues ; le repli est
+vérifié sur l'app (``AppTest``) : premier chargement puis rerun serveur en panne.
+
+Exemple :
+    python flaky_server.py
+"""
+import gzip
+import hashlib
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from load_test import APP_PATH, build_workbook
+
+CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def serve_flaky(path: str) -> tuple[http.server.ThreadingHTTPServer, str, dict]:
+    """Serveur local (thread démon) ; retourne (serveur, URL de base, état : requêtes par chemin et panne)."""
+    payload = Path(path).read_bytes()
+    compressed = gzip.compress(payload)
+    state = {"hits": {}, "down": False}
+    lock = threading.Lock()
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *args):
+            pass
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionResetError:
+                # Client qui abandonne la connexion (taille maximale dépassée) : attendu
+                pass
+        def _status(self, code: int):
+            self.send_response(code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        def _body(self, body: bytes, length: int, encoding: str | None = None):
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            self.wfile.write(body)
+        def do_GET(self):
+            mode = self.path.strip("/").split("?")[0]
+            with lock:
+                state["hits"][mode] = hit = state["hits"].get(mode, 0) + 1
+            if mode == "404":
+                self._status(404)
+            elif mode == "down" or (mode == "fail2" and hit <= 2) or (mode == "switch" and state["down"]):
+                self._status(503)
+            elif mode == "trunc" and hit == 1:
+                self._body(payload[: len(payload) // 3], len(payload))
+                self.close_connection = True
+            elif mode == "gzip":
+                self._body(compressed, len(compressed), "gzip")
+            else:
+                self._body(payload, len(payload))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", state
+
+def check_downloads(base: str, payload: bytes, state: dict) -> list[str]:
+    """Scénarios de ``download_to_tempfile`` ; retourne les échecs."""
+    from hub.data import DownloadError, download_to_tempfile
+    md5, failures = hashlib.md5(payload).hexdigest(), []
+    def run(mode: str, expect: str, requests: int, **kwargs):
+        try:
+            out, sig, size = download_to_tempfile(f"{base}/{mode}", backoff=0.01, **kwargs)
+            with out:
+                got = "ok" if sig == md5 and size == len(payload) and out.read() == payload else "corrompu"
+        except DownloadError as e:
+            got = "passagère" if e.transient else "définitive"
+        hits = state["hits"].get(mode, 0)
+        ok = got == expect and hits == requests
+        print(f"{'✓' if ok else '✗'} /{mode:<6} {got:<10} {hits} requête(s) (attendu : {expect}, {requests})")
+        if not ok:
+            failures.append(mode)
+    run("ok", "ok", 1)
+    run("fail2", "ok", 3)
+    run("trunc", "ok", 2)
+    run("gzip", "ok", 1)
+    run("404", "définitive", 1)
+    run("big", "définitive", 1, max_bytes=len(payload) // 2)
+    run("down", "passagère", 3, retries=2)
+    return failures
+def check_fallback(state: dict, timeout: float = 300) -> list[str]:
+    """Premier chargement de l'app, puis rerun serveur en panne : dernier classeur affiché avec un avertissement."""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.run(timeout=timeout)
+    loaded = not at.exception and not at.error
+    state["down"] = True
+    at.run(timeout=timeout)
+    state["down"] = False
+    fallback = not at.exception and not at.error and any("dernière version" in w.value for w in at.warning)
+    ok = loaded and fallback
+    print(f"{'✓' if ok else '✗'} repli  chargement {'ok' if loaded else 'en échec'}, "
+          f"panne {'avertissement + dernier classeur' if fallback else 'sans repli'}")
+    return [] if ok else ["repli"]
+
+def main() -> int:
+    workdir = tempfile.mkdtemp(prefix="hub-flaky-")
+    xlsx = os.path.join(workdir, "workbook.xlsx")
+    build_workbook(xlsx, n_players=6, n_journees=6, n_events=2000)
+    server, base, state = serve_flaky(xlsx)
+    registry = os.path.join(workdir, "sources.json")
+    Path(registry).write_text(json.dumps([{"source": "Synthétique", "season": "2025-2026", "url": f"{base}/switch"}]), encoding="utf-8")
+    # Lu à l'import de hub.sources, avant la première exécution du script
+    os.environ["HUB_SOURCES"] = registry
+    failures = check_downloads(base, Path(xlsx).read_bytes(), state) + check_fallback(state)
+    server.shutdown()
+    print(f"\n{'Échecs : ' + ', '.join(failures) if failures else 'Tous les scénarios passent.'}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Football Hub — briques de calcul et d'export réutilisables hors Streamlit."""
@@ -0,0 +1,33 @@
+"""Grilles de cartes KPI (classe CSS ``metric-card``) assemblées en un seul bloc HTML.
+
+Une grille entière devient un seul élément Streamlit au lieu d'un ``st.markdown`` par carte :
+moins de messages par rerun et un seul nœud à remettre en page côté navigateur.
+Une carte est un dict ``{"label", "value", "color", "note"}`` (``color`` et ``note`` optionnels).
+"""
+from html import escape
+
+DEFAULT_COLOR = "#e2e8f0"
+
+def card_html(card: dict) -> str:
+    """Une carte : libellé, valeur colorée et note facultative sous la valeur."""
+    note = card.get("note")
+    note_html = f'<div style="font-size: 12px; color: var(--muted); margin-top: 4px;">{escape(str(note))}</div>' if note else ""
+    return (
+        f'<div class="metric-card"><h3>{escape(str(card["label"]))}</h3>'
+        f'<div class="value" style="color: {card.get("color") or DEFAULT_COLOR};">{escape(str(card["value"]))}</div>'
+        f'{note_html}</div>'
+    )
+def card_grid_html(cards: list, columns: int | None = None) -> str:
+    """Cartes réparties sur ``columns`` colonnes de même largeur (toutes sur une ligne par défaut)."""
+    columns = columns or max(len(cards), 1)
+    return (
+        f'<div class="card-grid" style="grid-template-columns: repeat({columns}, minmax(0, 1fr));">'
+        + "".join(card_html(c) for c in cards) + '</div>'
+    )
+def card_stack_html(groups: dict) -> str:
+    """Colonnes de cartes empilées, une par groupe (titre -> cartes), côte à côte."""
+    stacks = "".join(
+        f'<div class="card-stack"><h5>{escape(str(title))}</h5>' + "".join(card_html(c) for c in cards) + '</div>'
+        for title, cards in groups.items()
+    )
+    return f'<div class="card-grid" style="grid-template-columns: repeat({max(len(groups), 1)}, minmax(0, 1fr));">{stacks}</div>'
@@ -0,0 +1,35 @@
+"""Comparaison de N joueurs : totaux et courbes cumulées calculés en une passe groupée.
+
+Les totaux sont lus dans les sommes par joueur de la table radar (déjà en cache) ; les
+courbes cumulées sortent d'un seul ``groupby().cumsum()`` sur les lignes des joueurs
+sélectionnés, sans filtrer la feuille Match joueur par joueur.
+"""
+import pandas as pd
+from .core import to_num
+
+# Totaux affichés : libellé -> compteur de la table radar
+COMPARISON_TOTALS = {
+    "Matchs Joués": "matches",
+    "Minutes": "minutes",
+    "Buts": "goals",
+    "xG": "xg",
+    "Passes": "passes_comp",
+}
+
+def comparison_totals(tables: dict, player_ids) -> pd.DataFrame:
+    """Totaux saison des joueurs demandés (lignes dans l'ordre de ``player_ids``, 0 si absent)."""
+    sums = tables["player"]["sums"].reindex([str(pid) for pid in player_ids]).fillna(0.0)
+    out = sums[list(COMPARISON_TOTALS.values())]
+    out.columns = list(COMPARISON_TOTALS)
+    return out
+def cumulative_curves(df_match: pd.DataFrame, player_ids, column: str) -> pd.DataFrame:
+    """Valeur cumulée d'une colonne par joueur : colonnes PlayerID_norm, Match (1..n) et Cumul."""
+    pids = [str(pid) for pid in player_ids]
+    rows = df_match[df_match["PlayerID_norm"].astype(str).isin(pids)]
+    key = rows["PlayerID_norm"].astype(str)
+    values = to_num(rows[column]) if column in rows.columns else pd.Series(0.0, index=rows.index)
+    return pd.DataFrame({
+        "PlayerID_norm": key,
+        "Match": key.groupby(key).cumcount() + 1,
+        "Cumul": values.groupby(key).cumsum(),
+    })
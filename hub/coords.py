@@ -0,0 +1,132 @@
+"""Normalisation des coordonnées Tracking vers un repère canonique unique, faite une fois à l'ingestion.
+
+Repère canonique (celui de ``mplsoccer`` ``statsbomb`` et de ``hub.pitch_plotly``) : X de 0 à 120
+dans le sens de l'attaque (but adverse en X = 120), Y de 0 à 80 vers le bas. Chaque source déclare
+son système dans ``sources.json`` (clé ``coords``) ::
+
+    {"system": "opta", "flip": "half"}
+    {"system": "custom", "length": 105, "width": 68, "y_up": true}
+
+Sans déclaration (``auto``), la détection historique est gardée : un maximum entre 50 et 105
+désigne un repère 0-100 Y vers le bas (``wyscout``), sinon les coordonnées sont déjà en 120×80.
+``flip`` retourne le sens de jeu par match (``Journée``) ou par mi-temps : une colonne ``Sens``
+(gauche / droite) fait foi, sinon le sens est déduit de la position moyenne des tirs du groupe.
+Un groupe sans tir ni ``Sens`` n'est pas retourné (la position moyenne de ses autres événements
+dépend du poste) : il est signalé dans le résumé de la conversion (``unoriented``).
+"""
+import numpy as np
+import pandas as pd
+
+CANONICAL_LENGTH = 120.0
+CANONICAL_WIDTH = 80.0
+PITCH_TYPE = "statsbomb"
+COORD_SYSTEMS = {
+    "statsbomb": {"length": 120.0, "width": 80.0, "y_up": False},
+    "opta": {"length": 100.0, "width": 100.0, "y_up": True},
+    "wyscout": {"length": 100.0, "width": 100.0, "y_up": False},
+}
+FLIP_MODES = ("none", "match", "half")
+POINT_COLUMNS = (("X", "Y"), ("X2", "Y2"))
+MATCH_COLUMN = "Journée"
+HALF_COLUMNS = ("Mi-temps", "Période", "Half", "Period")
+DIRECTION_COLUMN = "Sens"
+# Valeurs de ``Sens`` : attaque vers X = 0 (à retourner) ou vers X = max
+LEFT_VALUES = {"gauche", "g", "left", "l", "←", "-1"}
+RIGHT_VALUES = {"droite", "d", "right", "r", "→", "1"}
+SHOT_EVENTS = {"shot", "tir"}
+
+def resolve_system(spec) -> tuple[str, dict]:
+    """(nom, dimensions) d'un système déclaré : nom connu ou dict ``custom`` (length, width, y_up)."""
+    if isinstance(spec, dict):
+        name = spec.get("system", "auto")
+        if name == "custom":
+            if not {"length", "width"}.issubset(spec):
+                raise ValueError(f"Repère custom sans length/width : {spec}")
+            return name, {"length": float(spec["length"]), "width": float(spec["width"]), "y_up": bool(spec.get("y_up", False))}
+        spec = name
+    if spec not in COORD_SYSTEMS:
+        raise ValueError(f"Système de coordonnées inconnu : {spec} (attendu : {', '.join(COORD_SYSTEMS)}, custom ou auto)")
+    return spec, COORD_SYSTEMS[spec]
+def validate_coords(coords) -> dict:
+    """Déclaration ``coords`` sous forme de dict complet (system, flip, ...) ; ValueError si elle est invalide."""
+    coords = dict(coords) if isinstance(coords, dict) else {"system": coords or "auto"}
+    coords.setdefault("system", "auto")
+    coords.setdefault("flip", "none")
+    if coords["flip"] not in FLIP_MODES:
+        raise ValueError(f"Mode de retournement inconnu : {coords['flip']} (attendu : {', '.join(FLIP_MODES)})")
+    if coords["system"] != "auto":
+        resolve_system(coords)
+    return coords
+def detect_system(x, y) -> str:
+    """Détection historique : maximum des coordonnées entre 50 et 105 → repère 0-100, sinon 120×80."""
+    max_coord = np.nanmax(np.concatenate([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]), initial=np.nan)
+    return "wyscout" if np.isfinite(max_coord) and 50 < max_coord <= 105 else "statsbomb"
+def to_canonical(x, y, dims: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Coordonnées d'un repère (length, width, y_up) → repère canonique 120×80, Y vers le bas."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if dims["y_up"]:
+        y = dims["width"] - y
+    return x * (CANONICAL_LENGTH / dims["length"]), y * (CANONICAL_WIDTH / dims["width"])
+def _group_codes(df: pd.DataFrame, flip: str) -> tuple[np.ndarray, list]:
+    """Numéro de groupe de sens de jeu de chaque ligne (match, ou match × mi-temps) et colonnes du groupe."""
+    keys = [MATCH_COLUMN] if MATCH_COLUMN in df.columns else []
+    if flip == "half":
+        keys += [c for c in HALF_COLUMNS if c in df.columns][:1]
+    if not keys:
+        return np.zeros(len(df), dtype=np.int64), keys
+    return df.groupby(keys, dropna=False, sort=False).ngroup().to_numpy(), keys
+def attack_left(df: pd.DataFrame, x: np.ndarray, flip: str) -> tuple[np.ndarray, list]:
+    """Lignes dont l'attaque va vers X = 0 (colonne ``Sens``, sinon X moyen des tirs du groupe < milieu).
+
+    Retourne aussi les groupes sans tir ni ``Sens`` renseigné, laissés tels quels (libellés ``Journée[ / mi-temps]``).
+    """
+    n = len(df)
+    if flip == "none" or n == 0:
+        return np.zeros(n, dtype=bool), []
+    codes, keys = _group_codes(df, flip)
+    valid = np.isfinite(x)
+    shots = valid & df["Event"].astype(str).str.strip().str.lower().isin(SHOT_EVENTS).to_numpy() if "Event" in df.columns else np.zeros(n, dtype=bool)
+    # X moyen des tirs par groupe en un passage (bincount)
+    n_groups = int(codes.max()) + 1
+    shot_n = np.bincount(codes, weights=shots.astype(float), minlength=n_groups)
+    shot_mean = np.bincount(codes, weights=np.where(shots, x, 0.0), minlength=n_groups) / np.maximum(shot_n, 1)
+    left = ((shot_n > 0) & (shot_mean < CANONICAL_LENGTH / 2))[codes]
+    declared = np.zeros(n, dtype=bool)
+    if DIRECTION_COLUMN in df.columns:
+        sens = df[DIRECTION_COLUMN].astype(str).str.strip().str.lower()
+        is_left, is_right = sens.isin(LEFT_VALUES).to_numpy(), sens.isin(RIGHT_VALUES).to_numpy()
+        left = np.where(is_left, True, np.where(is_right, False, left))
+        declared = is_left | is_right
+    # Groupes sans tir dont au moins une ligne n'a pas de sens déclaré : non retournés, signalés
+    undecided = np.bincount(codes, weights=(~declared).astype(float), minlength=n_groups) > 0
+    unoriented = np.flatnonzero((shot_n == 0) & undecided)
+    if not len(unoriented):
+        return left, []
+    first_row = np.unique(codes, return_index=True)[1]
+    labels = [" / ".join(str(df[k].iloc[first_row[g]]) for k in keys) or "tous les événements" for g in unoriented]
+    return left, labels
+def normalize_coords(df_tracking: pd.DataFrame, coords=None) -> tuple[pd.DataFrame, dict]:
+    """Copie de la feuille en repère canonique (X/Y, X2/Y2) ; retourne aussi un résumé de la conversion.
+
+    ``coords`` : None / ``"auto"``, nom de système, ou dict ``{"system", "flip", ...}`` (voir le module).
+    """
+    coords = validate_coords(coords)
+    flip = coords["flip"]
+    df = df_tracking.copy()
+    for col in ('X', 'Y', 'X2', 'Y2'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    system = coords["system"]
+    if system == "auto":
+        system = detect_system(df['X'], df['Y'])
+    name, dims = resolve_system({**coords, "system": system})
+    converted = dims != COORD_SYSTEMS["statsbomb"]
+    points = [(cx, cy) for cx, cy in POINT_COLUMNS if cx in df.columns and cy in df.columns]
+    canonical = {cols: to_canonical(df[cols[0]], df[cols[1]], dims) for cols in points}
+    left, unoriented = attack_left(df, canonical[("X", "Y")][0], flip)
+    for (cx, cy), (x, y) in canonical.items():
+        # Retournement : rotation de 180° (l'attaque va toujours vers X = 120)
+        df[cx] = np.where(left, CANONICAL_LENGTH - x, x)
+        df[cy] = np.where(left, CANONICAL_WIDTH - y, y)
+    return df, {"system": name, "converted": converted, "flip": flip, "flipped": int(left.sum()), "unoriented": unoriented}
@@ -0,0 +1,279 @@
+"""Helpers de calcul partagés entre l'app Streamlit et les outils en ligne de commande.
+
+Aucune dépendance à Streamlit ici : le module doit pouvoir être importé
+depuis un process worker ou un script headless.
+"""
+from pathlib import Path
+import unicodedata
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+# -------------------- HELPERS AVANCÉS --------------------
+def get_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+def to_num(x) -> pd.Series:
+    """Série numérique robuste — retourne TOUJOURS une pd.Series"""
+    if isinstance(x, pd.Series):
+        s = x.astype(str).str.replace(",", ".", regex=False)
+        return pd.to_numeric(s, errors="coerce").fillna(0)
+    elif isinstance(x, (list, tuple, np.ndarray)):
+        s = pd.Series(x).astype(str).str.replace(",", ".", regex=False)
+        return pd.to_numeric(s, errors="coerce").fillna(0)
+    else:
+        s = pd.Series([str(x)]).str.replace(",", ".", regex=False)
+        return pd.to_numeric(s, errors="coerce").fillna(0)
+def df_has_cols(df: pd.DataFrame, cols: list) -> bool:
+    return all(c in df.columns for c in cols)
+def norm_col(c: str) -> str:
+    c = unicodedata.normalize("NFKD", str(c)).encode("ascii", "ignore").decode("ascii")
+    return c.strip().lower().replace("  ", " ")
+def rename_like(df: pd.DataFrame, mapping: dict):
+    if df.empty: return df
+    norm_map = {col: norm_col(col) for col in df.columns}
+    inv = {norm_col(k): v for k, v in mapping.items()}
+    new_names = {}
+    for col, ncol in norm_map.items():
+        if ncol in inv:
+            new_names[col] = inv[ncol]
+    return df.rename(columns=new_names)
+# Pondération par défaut du score global et points par action des sous-scores offensif / défensif
+PERFORMANCE_WEIGHTS = {
+    'passing_efficiency': 0.25,
+    'duel_success': 0.20,
+    'attacking_contribution': 0.25,
+    'defensive_contribution': 0.20,
+    'ball_retention': 0.10
+}
+ATTACK_POINTS = {'goals': 10, 'shots': 2, 'xg': 5}
+DEFENSE_POINTS = {'interceptions': 3, 'recoveries': 2}
+def get_performance_badge(score):
+    if score >= 80:
+        return '<span class="performance-badge badge-excellent">Excellent</span>'
+    elif score >= 65:
+        return '<span class="performance-badge badge-good">Bon</span>'
+    elif score >= 50:
+        return '<span class="performance-badge badge-average">Moyen</span>'
+    else:
+        return '<span class="performance-badge badge-poor">À améliorer</span>'
+def create_radar_chart(data, categories, title="Performance Radar"):
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=data,
+        theta=categories,
+        fill='toself',
+        name='Performance',
+        line=dict(color='#3b82f6', width=2),
+        fillcolor='rgba(59, 130, 246, 0.2)',
+        marker=dict(size=8, color='#3b82f6')
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                gridcolor='rgba(255, 255, 255, 0.2)',
+                linecolor='rgba(255, 255, 255, 0.3)'
+            ),
+            angularaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.2)',
+                linecolor='rgba(255, 255, 255, 0.3)'
+            ),
+            bgcolor='rgba(0, 0, 0, 0)'
+        ),
+        showlegend=False,
+        title=dict(text=title, x=0.5, font=dict(color='#e2e8f0')),
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='#e2e8f0')
+    )
+    return fig
+def create_multi_radar_chart(series: dict, categories, title="Comparaison Radar", colors=None):
+    """Radars superposés dans une même figure : ``series`` = {nom: valeurs 0-100}."""
+    colors = colors or px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (name, values) in enumerate(series.items()):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatterpolar(
+            r=list(values) + [list(values)[0]],
+            theta=list(categories) + [list(categories)[0]],
+            fill='toself',
+            name=name,
+            line=dict(color=color, width=2),
+            opacity=0.55 if len(series) <= 4 else 0.35,
+        ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100], gridcolor='rgba(255, 255, 255, 0.2)', linecolor='rgba(255, 255, 255, 0.3)'),
+            angularaxis=dict(gridcolor='rgba(255, 255, 255, 0.2)', linecolor='rgba(255, 255, 255, 0.3)'),
+            bgcolor='rgba(0, 0, 0, 0)'
+        ),
+        showlegend=True,
+        title=dict(text=title, x=0.5, font=dict(color='#e2e8f0')),
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='#e2e8f0')
+    )
+    return fig
+def predict_performance_trend_manual(x, y, periods_ahead=5):
+    if len(x) < 2:
+        return None
+    n = len(x)
+    sum_x = np.sum(x)
+    sum_y = np.sum(y)
+    sum_xy = np.sum(x * y)
+    sum_x2 = np.sum(x ** 2)
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+    intercept = (sum_y - slope * sum_x) / n
+    future_x = np.arange(len(x) + 1, len(x) + periods_ahead + 1)
+    predictions = slope * future_x + intercept
+    y_mean = np.mean(y)
+    ss_tot = np.sum((y - y_mean) ** 2)
+    ss_res = np.sum((y - (slope * x + intercept)) ** 2)
+    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'predictions': predictions,
+        'future_matches': future_x,
+        'r_squared': r_squared
+    }
+# -------------------- BENCHMARKS PAR POSTE DÉTAIL --------------------
+BENCHMARKS_PAR_POSTE = {
+    "Attaquant central": {
+        'pass_accuracy': 75,
+        'prog_passes_per_90': 3,
+        'key_passes_per_match': 0.8,
+        'shot_accuracy': 35,
+        'xg_per_90': 0.4,
+        'goals_per_xg': 0.9,
+        'duel_win_rate': 45,
+        'interceptions_per_90': 0.8,
+        'recoveries_per_90': 4,
+    },
+    "Milieu relayeur": {
+        'pass_accuracy': 88,
+        'prog_passes_per_90': 6,
+        'key_passes_per_match': 0.5,
+        'shot_accuracy': 20,
+        'xg_per_90': 0.1,
+        'goals_per_xg': 1.5,
+        'duel_win_rate': 55,
+        'interceptions_per_90': 2.5,
+        'recoveries_per_90': 8,
+    },
+    "Milieu offensif": {
+        'pass_accuracy': 82,
+        'prog_passes_per_90': 8,
+        'key_passes_per_match': 1.5,
+        'shot_accuracy': 30,
+        'xg_per_90': 0.3,
+        'goals_per_xg': 1.1,
+        'duel_win_rate': 50,
+        'interceptions_per_90': 1.5,
+        'recoveries_per_90': 6,
+    },
+    "Défenseur axial": {
+        'pass_accuracy': 85,
+        'prog_passes_per_90': 4,
+        'key_passes_per_match': 0.2,
+        'shot_accuracy': 15,
+        'xg_per_90': 0.05,
+        'goals_per_xg': 2.0,
+        'duel_win_rate': 60,
+        'interceptions_per_90': 3.0,
+        'recoveries_per_90': 7,
+    },
+    # Ajoutez d'autres postes selon vos besoins
+    "Défaut": {  # Pour les postes non définis
+        'pass_accuracy': 80,
+        'prog_passes_per_90': 5,
+        'key_passes_per_match': 1.0,
+        'shot_accuracy': 30,
+        'xg_per_90': 0.2,
+        'goals_per_xg': 1.0,
+        'duel_win_rate': 50,
+        'interceptions_per_90': 2.0,
+        'recoveries_per_90': 6,
+    }
+}
+# -------------------- MAPPING POSTE → COORDONNÉES TERRAIN (CORRIGÉ) --------------------
+# -------------------- MAPPING POSTE → COORDONNÉES TERRAIN (AJUSTÉ POUR LA SURFACE) --------------------
+POSTE_COORDONNEES = {
+    "Gardien de but": (2, 50),           # Tout en bas, au centre
+    "Défenseur axial": (20, 50),         # Dans la défense centrale
+    "Défenseur latéral droit": (20, 80), # Sur le côté droit défensif
+    "Défenseur latéral gauche": (20, 20),# Sur le côté gauche défensif
+    "Milieu relayeur": (50, 50),         # Au centre du terrain
+    "Milieu offensif": (70, 50),         # Dans l'entrejeu, proche de l'attaque
+    "Milieu droit": (65, 75),            # A droite, dans le milieu offensif
+    "Milieu gauche": (65, 25),           # A gauche, dans le milieu offensif
+    "Attaquant central": (100, 50),       # DANS la surface de réparation adverse (93 au lieu de 90)
+    "Attaquant de côté droit": (88, 70), # A droite, DANS la surface
+    "Attaquant de côté gauche": (88, 30),# A gauche, DANS la surface
+    # Valeurs par défaut si le poste n'est pas trouvé
+    "Défaut": (50, 50),
+}
+def calculate_kpis(data, total_min, total_matches, player_id=None, df_players=None, xt_total=None):
+    kpis = {}
+    passes_tent_col = data.get("Passe tentées", pd.Series([0]))
+    passes_comp_col = data.get("Passe complete", pd.Series([0]))
+    passes_tent = to_num(passes_tent_col).sum()
+    passes_comp = to_num(passes_comp_col).sum()
+    kpis['pass_accuracy'] = (passes_comp / passes_tent * 100) if passes_tent > 0 else 0
+    prog_passes_col = data.get("Passe progressive", pd.Series([0])) if "Passe progressive" in data.columns else pd.Series([0])
+    prog_passes = to_num(prog_passes_col).sum()
+    kpis['prog_passes_per_90'] = (prog_passes / total_min * 90) if total_min > 0 else 0
+    # xT créé par les passes (modèle Tracking), seulement si fourni par l'appelant
+    if xt_total is not None:
+        kpis['xt_per_90'] = (xt_total / total_min * 90) if total_min > 0 else 0
+    key_passes_col = data.get("Passe decisive", pd.Series([0])) if "Passe decisive" in data.columns else pd.Series([0])
+    key_passes = to_num(key_passes_col).sum()
+    kpis['key_passes_per_match'] = key_passes / total_matches if total_matches > 0 else 0
+    tirs_col = data.get("Tir", pd.Series([0]))
+    tirs_cadres_col = data.get("Tir cadre", pd.Series([0]))
+    tirs = to_num(tirs_col).sum()
+    tirs_cadres = to_num(tirs_cadres_col).sum()
+    kpis['shot_accuracy'] = (tirs_cadres / tirs * 100) if tirs > 0 else 0
+    xg_col = data.get("xG", pd.Series([0]))
+    xg = to_num(xg_col).sum()
+    kpis['xg_per_90'] = (xg / total_min * 90) if total_min > 0 else 0
+    buts_col = data.get("Buts", pd.Series([0]))
+    buts = to_num(buts_col).sum()
+    kpis['goals_per_xg'] = buts / xg if xg > 0 else 0
+    duel_tot_col_name = "Duel tenté" if "Duel tenté" in data.columns else "Duel tente"
+    duels_tent_col = data.get(duel_tot_col_name, pd.Series([0]))
+    duels_gagnes_col = data.get("Duel gagne", pd.Series([0]))
+    duels_tent = to_num(duels_tent_col).sum()
+    duels_gagnes = to_num(duels_gagnes_col).sum()
+    kpis['duel_win_rate'] = (duels_gagnes / duels_tent * 100) if duels_tent > 0 else 0
+    interceptions_col = data.get("Interception", pd.Series([0]))
+    interceptions = to_num(interceptions_col).sum()
+    kpis['interceptions_per_90'] = (interceptions / total_min * 90) if total_min > 0 else 0
+    recoveries_col = data.get("Recuperation du ballon", pd.Series([0]))
+    recoveries = to_num(recoveries_col).sum()
+    kpis['recoveries_per_90'] = (recoveries / total_min * 90) if total_min > 0 else 0
+    # Ajouter les benchmarks du poste au dictionnaire retourné
+    kpis['benchmarks'] = player_benchmarks(player_id, df_players)
+    return kpis
+def player_benchmarks(player_id=None, df_players=None) -> dict:
+    """Benchmarks du poste détaillé du joueur (``Défaut`` si inconnu)."""
+    if player_id is not None and df_players is not None and not df_players.empty:
+        player_row = df_players[df_players["PlayerID_norm"] == str(player_id)]
+        if not player_row.empty:
+            poste_detail = player_row.iloc[0].get('Poste Détail', 'Défaut')
+            return BENCHMARKS_PAR_POSTE.get(poste_detail, BENCHMARKS_PAR_POSTE['Défaut'])
+    return BENCHMARKS_PAR_POSTE['Défaut']
+def kpi_history(data: pd.DataFrame, player_id=None, df_players=None) -> pd.DataFrame:
+    """KPIs cumulés après chaque match (une ligne par match, ordre de ``data``) + minutes du match (``minutes_jouees``)."""
+    rows = []
+    for i in range(len(data)):
+        match_slice = data.iloc[:i + 1]
+        kpis = calculate_kpis(match_slice, to_num(match_slice.get("Minutes Jouées", 0)).sum(), i + 1, player_id, df_players)
+        kpis.pop('benchmarks')
+        kpis['minutes_jouees'] = to_num(match_slice.iloc[-1].get("Minutes Jouées", 0)).iloc[0]
+        rows.append(kpis)
+    return pd.DataFrame(rows)
@@ -0,0 +1,165 @@
+"""Cube agrégé joueur × Journée de tous les compteurs bruts de la feuille Match.
+
+Construit une fois par classeur (``np.add.at`` sur un tableau (P, J, C)). Un joueur ne joue
+qu'un adversaire par journée : l'``Adversaire`` est une étiquette de chaque case joueur × journée
+(tableau (P, J) d'indices), pas un axe du cube, et la mémoire reste en P·J·C. Un split
+(adversaires, fenêtre de journées ou de dates, tranche de minutes, domicile/extérieur) est
+un masque sur les cases suivi d'une somme et des ratios de ``derive_metrics`` : la feuille
+Match n'est plus refiltrée.
+"""
+import numpy as np
+import pandas as pd
+from .core import to_num, player_benchmarks
+from .radar import raw_counters, derive_metrics
+
+# Colonnes possibles pour le lieu du match et valeurs comptées comme « domicile »
+VENUE_COLS = ("Domicile/Extérieur", "Lieu", "Domicile", "Venue")
+HOME_VALUES = {"domicile", "dom", "d", "home", "h", "1", "true", "oui"}
+MINUTE_BANDS = ((0, 30, "0-30'"), (30, 60, "30-60'"), (60, 89, "60-89'"), (89, 1e9, "90'+"))
+# Compteurs du cube en plus de ceux des radars (détail des duels de la vue Performance)
+EXTRA_COUNTERS = {"aerial_won": "Duel aérien gagné", "aerial_lost": "Duel aérien perdu"}
+# KPIs de la vue Performance (mêmes clés que ``calculate_kpis``)
+KPI_KEYS = (
+    "pass_accuracy", "prog_passes_per_90", "key_passes_per_match", "shot_accuracy", "xg_per_90",
+    "goals_per_xg", "duel_win_rate", "interceptions_per_90", "recoveries_per_90",
+)
+# Colonnes affichées pour un split : nom interne -> libellé
+SPLIT_COLUMNS = {
+    "matches": "Matchs", "minutes": "Minutes", "goals": "Buts", "xg": "xG",
+    "pass_accuracy": "Précision Passes %", "key_passes_per_match": "Passes Déc./Match",
+    "xg_per_90": "xG/90", "shot_accuracy": "Précision Tirs %", "duel_win_rate": "Duels Gagnés %",
+    "interceptions_per_90": "Interceptions/90", "recoveries_per_90": "Récupérations/90",
+}
+
+def build_cube(df_match: pd.DataFrame) -> dict:
+    """Cube (P, J, C) des compteurs (+ ``matches``), adversaire et ligne Match de chaque case ; dates et lieu par journée."""
+    counters = raw_counters(df_match)
+    for name, col in EXTRA_COUNTERS.items():
+        counters[name] = to_num(df_match[col]).to_numpy(dtype=float) if col in df_match.columns else 0.0
+    counters["matches"] = 1.0
+    pids = df_match["PlayerID_norm"].astype(str) if "PlayerID_norm" in df_match.columns else pd.Series("", index=df_match.index)
+    opps = df_match["Adversaire"].fillna("?").astype(str).str.strip() if "Adversaire" in df_match.columns else pd.Series("?", index=df_match.index)
+    journee = pd.to_numeric(df_match["Journée"], errors="coerce") if "Journée" in df_match.columns else pd.Series(1.0, index=df_match.index)
+    ok = journee.notna().to_numpy()
+    players = sorted(pids[ok].unique())
+    adversaires = sorted(opps[ok].unique())
+    journees = sorted(journee[ok].unique().tolist())
+    p_idx = pd.Categorical(pids[ok], categories=players).codes
+    a_idx = pd.Categorical(opps[ok], categories=adversaires).codes
+    j_idx = pd.Categorical(journee[ok], categories=journees).codes
+    values = np.zeros((len(players), len(journees), counters.shape[1]))
+    np.add.at(values, (p_idx, j_idx), counters.to_numpy(dtype=float)[ok])
+    # Adversaire et première ligne Match de chaque case (-1 : pas de match) ; lignes lues à l'envers
+    # pour que la première occurrence l'emporte
+    opponent = np.full((len(players), len(journees)), -1, dtype=np.int64)
+    rows = np.full((len(players), len(journees)), -1, dtype=np.int64)
+    opponent[p_idx[::-1], j_idx[::-1]] = a_idx[::-1]
+    rows[p_idx[::-1], j_idx[::-1]] = np.asarray(df_match.index[ok], dtype=np.int64)[::-1]
+
+    dates = None
+    if "DATE" in df_match.columns:
+        d = pd.to_datetime(df_match["DATE"], errors="coerce")[ok]
+        if d.notna().any():
+            dates = d.groupby(journee[ok].to_numpy()).min().reindex(journees).to_numpy()
+    venue = None
+    venue_col = next((c for c in VENUE_COLS if c in df_match.columns), None)
+    if venue_col is not None:
+        home = df_match[venue_col].fillna("").astype(str).str.strip().str.lower().isin(HOME_VALUES)[ok]
+        venue = home.groupby(journee[ok].to_numpy()).mean().reindex(journees).to_numpy() >= 0.5
+    return {
+        "values": values,
+        "opponent": opponent,
+        "rows": rows,
+        "counters": list(counters.columns),
+        "players": players,
+        "adversaires": adversaires,
+        "journees": journees,
+        "dates": dates,
+        "home": venue,
+    }
+
+def _journee_mask(cube: dict, journees=None, date_range=None, venue=None) -> np.ndarray:
+    mask = np.ones(len(cube["journees"]), dtype=bool)
+    if journees is not None:
+        lo, hi = journees
+        j = np.asarray(cube["journees"], dtype=float)
+        mask &= (j >= lo) & (j <= hi)
+    if date_range is not None and cube["dates"] is not None:
+        d = pd.to_datetime(cube["dates"])
+        mask &= np.asarray((d >= pd.Timestamp(date_range[0])) & (d < pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)))
+    if venue is not None and cube["home"] is not None:
+        mask &= cube["home"] if venue == "home" else ~cube["home"]
+    return mask
+def _player_index(cube: dict, player_id) -> int:
+    pid = str(player_id)
+    return cube["players"].index(pid) if pid in cube["players"] else -1
+def cube_cells(cube: dict, player_id, adversaires=None, journees=None, date_range=None, venue=None, minutes=None) -> np.ndarray:
+    """Cases (J, C) d'un joueur après masques ; les cases exclues sont mises à zéro."""
+    p = _player_index(cube, player_id)
+    if p < 0:
+        return np.zeros((len(cube["journees"]), len(cube["counters"])))
+    cells = cube["values"][p]
+    keep = _journee_mask(cube, journees, date_range, venue)
+    if adversaires is not None:
+        wanted = np.flatnonzero(np.isin(cube["adversaires"], list(adversaires)))
+        keep &= np.isin(cube["opponent"][p], wanted)
+    if minutes is not None:
+        m = cells[..., cube["counters"].index("minutes")]
+        keep &= (m >= minutes[0]) & (m < minutes[1])
+    keep &= cells[..., cube["counters"].index("matches")] > 0
+    return np.where(keep[..., None], cells, 0.0)
+def cube_totals(cube: dict, player_id, **filters) -> pd.Series:
+    """Compteurs sommés d'un joueur sur la sélection."""
+    cells = cube_cells(cube, player_id, **filters)
+    return pd.Series(cells.sum(axis=0), index=cube["counters"])
+def cube_journees(cube: dict, journees=None, date_range=None, venue=None) -> list:
+    """Journées du cube retenues par les masques (fenêtre de journées, de dates, lieu)."""
+    return [j for j, keep in zip(cube["journees"], _journee_mask(cube, journees, date_range, venue)) if keep]
+def player_journees(cube: dict, player_id, journees=None, date_range=None) -> list[tuple]:
+    """(journée, adversaire, ligne Match) de chaque match joué par le joueur, dans l'ordre des journées."""
+    p = _player_index(cube, player_id)
+    if p < 0:
+        return []
+    keep = _journee_mask(cube, journees, date_range) & (cube["values"][p, :, cube["counters"].index("matches")] > 0)
+    played = np.flatnonzero(keep)
+    return [(cube["journees"][j], cube["adversaires"][cube["opponent"][p, j]], int(cube["rows"][p, j])) for j in played]
+def cube_kpis(totals: pd.Series, player_id=None, df_players=None, xt_total=None) -> dict:
+    """KPIs de ``calculate_kpis`` (mêmes clés, benchmarks du poste) à partir de compteurs sommés du cube."""
+    metrics = derive_metrics(totals.to_frame().T).iloc[0]
+    kpis = {key: float(metrics[key]) for key in KPI_KEYS}
+    if xt_total is not None:
+        kpis['xt_per_90'] = (xt_total / totals["minutes"] * 90) if totals["minutes"] > 0 else 0
+    kpis['benchmarks'] = player_benchmarks(player_id, df_players)
+    return kpis
+def cube_split(cube: dict, player_id, by: str = "Adversaire", window: int = 5, **filters) -> pd.DataFrame:
+    """Métriques par groupe (``Adversaire``, ``Journées`` par fenêtre, ``Minutes`` par tranche, ``Lieu``).
+
+    Retourne compteurs + métriques dérivées, une ligne par groupe non vide.
+    """
+    cells = cube_cells(cube, player_id, **filters)
+    counters = cube["counters"]
+    if by == "Adversaire":
+        p = _player_index(cube, player_id)
+        opponent = cube["opponent"][p] if p >= 0 else np.full(len(cube["journees"]), -1)
+        sums = np.zeros((len(cube["adversaires"]), len(counters)))
+        np.add.at(sums, opponent[opponent >= 0], cells[opponent >= 0])
+        index = cube["adversaires"]
+    elif by == "Journées":
+        j = np.asarray(cube["journees"], dtype=float)
+        groups = ((j - j.min()) // window).astype(int) if len(j) else np.zeros(0, dtype=int)
+        sums = np.zeros((groups.max() + 1 if len(groups) else 0, len(counters)))
+        np.add.at(sums, groups, cells)
+        index = [f"J{int(j[groups == g].min())}-J{int(j[groups == g].max())}" for g in range(len(sums))]
+    elif by == "Minutes":
+        m = cells[:, counters.index("minutes")]
+        played = cells[:, counters.index("matches")] > 0
+        sums = np.stack([cells[played & (m >= lo) & (m < hi)].sum(axis=0) for lo, hi, _ in MINUTE_BANDS])
+        index = [label for _, _, label in MINUTE_BANDS]
+    elif by == "Lieu" and cube["home"] is not None:
+        sums = np.stack([cells[cube["home"]].sum(axis=0), cells[~cube["home"]].sum(axis=0)])
+        index = ["Domicile", "Extérieur"]
+    else:
+        raise ValueError(f"Split inconnu : {by}")
+    frame = pd.DataFrame(sums, index=index, columns=counters)
+    frame = frame[frame["matches"] > 0]
+    return pd.concat([frame, derive_metrics(frame)], axis=1).loc[:, lambda f: ~f.columns.duplicated()]
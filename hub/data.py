@@ -0,0 +1,199 @@
+"""Chargement du classeur (Google Sheets → XLSX) et normalisation des feuilles."""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from .core import rename_like
+from .coords import normalize_coords
+
+# ==================== GOOGLE SHEETS → XLSX (public) ====================
+FILE_ID = "1giSdEgXz3VytLq9Acn9rlQGbUhNAo2bI"
+# Téléchargement : (connexion, lecture) en secondes, tentatives, backoff exponentiel et taille maximale
+DOWNLOAD_TIMEOUT = (10, 60)
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 0.5
+DOWNLOAD_BACKOFF_MAX = 8.0
+DOWNLOAD_CHUNK = 1 << 20
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+# Réponses HTTP considérées comme passagères (nouvelle tentative)
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+# Classeurs téléchargés, nommés par signature : relus par chemin et gardés comme repli hors ligne
+WORKBOOK_DIR = Path(tempfile.gettempdir()) / "clever-hub-workbooks"
+WORKBOOK_KEEP = 8
+
+class DownloadError(RuntimeError):
+    """Échec de téléchargement ; ``transient`` indique une erreur réseau/serveur passagère."""
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+_SESSION = None
+def get_session() -> requests.Session:
+    """Session HTTP partagée par le process (pool de connexions keep-alive)."""
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _SESSION = session
+    return _SESSION
+def _stream_once(session: requests.Session, url: str, max_bytes: int, chunk_size: int, timeout) -> tuple:
+    """Une tentative : flux écrit dans un fichier temporaire, hash calculé au fil des blocs."""
+    try:
+        with session.get(url, allow_redirects=True, timeout=timeout, stream=True) as r:
+            if r.status_code in TRANSIENT_STATUS:
+                raise DownloadError(f"HTTP {r.status_code}", transient=True)
+            if r.status_code != 200 or r.headers.get("Content-Type", "").startswith("text/html"):
+                raise DownloadError(
+                    f"Échec export Google Sheets (HTTP {r.status_code}). "
+                    "Vérifie que le fichier est public en lecture."
+                )
+            # Content-Length compte les octets transmis (compressés si Content-Encoding) ; iter_content
+            # rend les octets décodés : la troncature se mesure sur le flux brut (r.raw.tell()), la
+            # taille maximale sur les octets décodés, et au plus tôt sur l'annonce si elle est non compressée.
+            announced = int(r.headers.get("Content-Length") or 0)
+            encoded = r.headers.get("Content-Encoding", "identity").lower() not in ("", "identity")
+            if announced > max_bytes and not encoded:
+                raise DownloadError(f"Fichier trop volumineux ({announced / 1e6:.1f} Mo > {max_bytes / 1e6:.1f} Mo).")
+            out = tempfile.TemporaryFile()
+            digest = hashlib.md5()
+            size = 0
+            try:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise DownloadError(f"Fichier trop volumineux (> {max_bytes / 1e6:.1f} Mo).")
+                    digest.update(chunk)
+                    out.write(chunk)
+                received = r.raw.tell()
+                if announced and received != announced:
+                    raise DownloadError(f"Réponse tronquée ({received}/{announced} octets).", transient=True)
+            except BaseException:
+                out.close()
+                raise
+    except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+        raise DownloadError(f"Erreur réseau : {e}", transient=True) from e
+    out.seek(0)
+    return out, digest.hexdigest(), size
+def download_to_tempfile(url: str, max_bytes: int = MAX_DOWNLOAD_BYTES, retries: int = DOWNLOAD_RETRIES,
+                         backoff: float = DOWNLOAD_BACKOFF, chunk_size: int = DOWNLOAD_CHUNK,
+                         timeout=DOWNLOAD_TIMEOUT, session: requests.Session | None = None) -> tuple:
+    """Télécharge ``url`` dans un fichier temporaire (positionné au début) ; retourne (fichier, md5, taille).
+
+    Les erreurs passagères sont retentées ``retries`` fois avec un délai ``backoff · 2^i`` plafonné ;
+    les autres (HTTP 4xx, page HTML, taille maximale dépassée) sont levées immédiatement.
+    """
+    session = session or get_session()
+    for attempt in range(retries + 1):
+        try:
+            return _stream_once(session, url, max_bytes, chunk_size, timeout)
+        except DownloadError as e:
+            if not e.transient or attempt == retries:
+                raise
+            time.sleep(min(backoff * 2 ** attempt, DOWNLOAD_BACKOFF_MAX))
+def file_md5(path) -> str:
+    """md5 d'un fichier lu par blocs (signature d'un classeur local)."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+def store_workbook(fileobj, sig: str, directory: Path = WORKBOOK_DIR, keep: int = WORKBOOK_KEEP) -> Path:
+    """Copie (par blocs) un classeur téléchargé vers ``directory/<sig>.xlsx`` ; garde les ``keep`` plus récents."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{sig}.xlsx"
+    if path.exists():
+        path.touch()
+    else:
+        part = path.with_suffix(f".{os.getpid()}.part")
+        with open(part, "wb") as out:
+            shutil.copyfileobj(fileobj, out, DOWNLOAD_CHUNK)
+        os.replace(part, path)
+    for old in sorted(directory.glob("*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)[keep:]:
+        old.unlink(missing_ok=True)
+    return path
+def download_workbook(url: str, max_bytes: int = MAX_DOWNLOAD_BYTES) -> tuple[Path, str, int]:
+    """Télécharge un classeur vers un fichier nommé par sa signature ; retourne (chemin, md5, taille)."""
+    out, sig, size = download_to_tempfile(url, max_bytes=max_bytes)
+    with out:
+        return store_workbook(out, sig), sig, size
+def gsheets_export_url(file_id: str) -> str:
+    return f"https://docs.google.com/spreadsheets/d/{file_id}/export?format=xlsx"
+def download_gsheets_as_xlsx(file_id: str, max_bytes: int = MAX_DOWNLOAD_BYTES) -> tuple[Path, str, int]:
+    return download_workbook(gsheets_export_url(file_id), max_bytes=max_bytes)
+def parse_excel(source) -> dict:
+    """Feuilles d'un classeur lu depuis un chemin ou un fichier ouvert (jamais copié en mémoire d'un bloc)."""
+    with pd.ExcelFile(source, engine="openpyxl") as xl:
+        return {name: xl.parse(name).copy(deep=True) for name in xl.sheet_names}
+
+# === Déballage des feuilles ===
+MATCH_COLUMNS_MAPPING = {
+    "minute jouee": "Minutes Jouées",
+    "tir cadre": "Tir cadre",
+    "passe courte tentee": "Passe courte tentée",
+    "passe courte complete": "Passe courte complète",
+    "passe moyenne tentee": "Passe moyenne tentée",
+    "passe moyenne complete": "Passe moyenne complète",
+    "passe longue tentee": "Passe longue tentée",
+    "passe longue complete": "Passe longue complète",
+    "duel tente": "Duel tenté",
+    "duel gagne": "Duel gagné",
+    "duel aérien gagné": "Duel aérien gagné",
+    "duel aérien perdu": "Duel aérien perdu",
+    "distance parcourue avec ballon": "Distance parcouru avec ballon (m)",
+    "distance parcourue progression": "Distance parcouru progression(m)",
+    "ballon touche haute": "Ballon touché haute",
+    "ballon touche médian": "Ballon touché médian",
+    "ballon touche basse": "Ballon touché basse",
+    "ballon touche surface": "Ballon touché surface",
+    "recuperation du ballon": "Recuperation du ballon",
+}
+def unpack_workbook(data: dict) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Retourne (joueurs, match, wellness, tracking) normalisés à partir des feuilles brutes."""
+    df_players = data.get("Joueur", pd.DataFrame())
+    df_match   = data.get("Match", pd.DataFrame())
+    df_well    = data.get("Wellness", pd.DataFrame())
+    df_tracking = data.get("Tracking", pd.DataFrame())
+    for df in (df_players, df_match, df_well, df_tracking):
+        if not df.empty and "PlayerID" in df.columns:
+            df["PlayerID_norm"] = df["PlayerID"].astype(str).str.strip()
+    df_match = rename_like(df_match, MATCH_COLUMNS_MAPPING)
+    if not df_well.empty and "DATE" in df_well.columns:
+        df_well["DATE"] = pd.to_datetime(df_well["DATE"], errors="coerce")
+    return df_players, df_match, df_well, df_tracking
+
+# ==================== TRACKING ====================
+TRACKING_REQUIRED_COLS = ['PlayerID_norm', 'Event', 'X', 'Y']
+def classify_zones(x, y) -> np.ndarray:
+    """Classification des zones (logique inversée), vectorisée sur des tableaux X/Y 0-120/0-80."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    conditions = [
+        (102 < x) & (x <= 120) & (18 < y) & (y < 62),
+        (0 <= x) & (x < 36),
+        (36 <= x) & (x <= 90),
+        (90 < x) & (x <= 102),
+    ]
+    return np.select(conditions, ['Surface Rép.', 'Haute', 'Médiane', 'Basse'], default='Médiane')
+def prepare_tracking(df_tracking: pd.DataFrame, coords=None) -> tuple[pd.DataFrame, dict]:
+    """Repère canonique 120×80 (``hub.coords``), nettoyage des événements et zones.
+
+    Retourne une copie préparée et le résumé de la normalisation (système, conversion, retournements).
+    """
+    df, coord_info = normalize_coords(df_tracking, coords)
+    df['Event'] = (
+        df['Event']
+        .fillna('')
+        .astype(str)
+        .str.strip()
+        .str.lower()
+        .str.title()
+    )
+    df['Zone'] = classify_zones(df['X'].to_numpy(), df['Y'].to_numpy())
+    return df, coord_info
@@ -0,0 +1,111 @@
+"""Explorateur de tables côté serveur : filtres, tri, pagination et export par blocs.
+
+Les filtres et le tri produisent un tableau de positions de lignes ; seule la page visible
+est matérialisée en DataFrame. L'export écrit le résultat filtré par blocs dans un fichier
+temporaire, sans construire le CSV/Parquet complet en mémoire.
+"""
+import tempfile
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 50, 100, 250)
+EXPORT_CHUNK_ROWS = 50_000
+# Au-delà, une colonne texte est filtrée par recherche plutôt que par liste de valeurs
+MAX_CATEGORY_VALUES = 60
+
+def column_kind(series: pd.Series) -> str:
+    """'numeric', 'datetime', 'category' ou 'text' — détermine le widget de filtre."""
+    if pd.api.types.is_bool_dtype(series):
+        return "category"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "category" if series.nunique(dropna=True) <= MAX_CATEGORY_VALUES else "text"
+def column_domains(df: pd.DataFrame) -> dict:
+    """{colonne: (type, domaine)} — (min, max) pour numeric/datetime, valeurs triées pour category."""
+    domains = {}
+    for col in df.columns:
+        s = df[col]
+        kind = column_kind(s)
+        if kind == "numeric":
+            v = pd.to_numeric(s, errors="coerce")
+            domain = (float(v.min()), float(v.max())) if v.notna().any() else None
+        elif kind == "datetime":
+            domain = (s.min().date(), s.max().date()) if s.notna().any() else None
+        elif kind == "category":
+            domain = tuple(sorted(s.dropna().unique().tolist(), key=str))
+        else:
+            domain = None
+        if kind in ("numeric", "datetime") and domain is None:
+            continue
+        domains[col] = (kind, domain)
+    return domains
+def filter_rows(df: pd.DataFrame, filters: tuple = (), search: str = "") -> np.ndarray:
+    """Positions des lignes retenues.
+
+    ``filters`` : tuple de (colonne, type, valeur) — valeur = (min, max) pour numeric/datetime,
+    tuple de valeurs pour category, sous-chaîne pour text. ``search`` cherche dans toutes les colonnes texte.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, kind, value in filters:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if kind == "numeric":
+            v = pd.to_numeric(s, errors="coerce")
+            mask &= ((v >= value[0]) & (v <= value[1])).to_numpy()
+        elif kind == "datetime":
+            v = pd.to_datetime(s, errors="coerce")
+            mask &= ((v >= pd.Timestamp(value[0])) & (v < pd.Timestamp(value[1]) + pd.Timedelta(days=1))).to_numpy()
+        elif kind == "category":
+            mask &= s.isin(list(value)).to_numpy()
+        elif kind == "text" and value:
+            mask &= s.astype(str).str.contains(value, case=False, regex=False, na=False).to_numpy()
+    if search:
+        hit = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+                hit |= df[col].astype(str).str.contains(search, case=False, regex=False, na=False).to_numpy()
+        mask &= hit
+    return np.flatnonzero(mask)
+def sort_rows(df: pd.DataFrame, rows: np.ndarray, by: str | None, ascending: bool = True) -> np.ndarray:
+    """Réordonne les positions selon une colonne (tri stable, valeurs manquantes en dernier)."""
+    if not by or by not in df.columns or len(rows) == 0:
+        return rows
+    values = df[by].iloc[rows]
+    if pd.api.types.is_object_dtype(values):
+        # Colonne Excel mixte (nombres, textes, vides) : tri numérique si elle est surtout numérique, sinon textuel
+        numeric = pd.to_numeric(values, errors="coerce")
+        present = values.notna().sum()
+        values = numeric if numeric.notna().sum() * 2 >= present else values.astype(str).where(values.notna())
+    order = values.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+    return rows[order]
+def page_rows(rows: np.ndarray, page: int, page_size: int) -> np.ndarray:
+    start = max(page - 1, 0) * page_size
+    return rows[start:start + page_size]
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
+
+def export_csv(df: pd.DataFrame, rows: np.ndarray, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """CSV du résultat filtré, écrit par blocs dans un fichier temporaire (retourné rembobiné)."""
+    out = tempfile.TemporaryFile(mode="w+b")
+    for i, start in enumerate(range(0, max(len(rows), 1), chunk_rows)):
+        chunk = df.iloc[rows[start:start + chunk_rows]]
+        out.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+    out.seek(0)
+    return out
+def export_parquet(df: pd.DataFrame, rows: np.ndarray, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Parquet du résultat filtré, un row group par bloc (nécessite pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    out = tempfile.TemporaryFile(mode="w+b")
+    # Colonnes objet (types mixtes Excel) converties en texte pour un schéma stable entre blocs
+    as_text = {c: "string" for c in df.columns if df[c].dtype == object}
+    schema = pa.Schema.from_pandas(df.iloc[0:0].astype(as_text), preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for start in range(0, len(rows), chunk_rows):
+            chunk = df.iloc[rows[start:start + chunk_rows]].astype(as_text)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    out.seek(0)
+    return out
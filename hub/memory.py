@@ -0,0 +1,78 @@
+"""Comptabilité mémoire : feuilles chargées, entrées de cache, figures matplotlib et RSS du process.
+
+Les mesures sont faites à la demande (``memory_usage(deep=True)``, lecture de ``/proc``) ; seul
+l'historique RSS est échantillonné à chaque exécution du script, dans un tampon borné.
+"""
+import resource
+import threading
+import time
+from collections import deque
+import pandas as pd
+import matplotlib.pyplot as plt
+
+MB = 1024 * 1024
+# Échantillons RSS gardés (un par exécution du script)
+RSS_HISTORY = 720
+
+def frame_memory(frames: dict) -> pd.DataFrame:
+    """Lignes, colonnes et mémoire profonde (Mo) de chaque DataFrame, index = nom de la feuille."""
+    rows = []
+    for name, df in frames.items():
+        rows.append({
+            "Feuille": name, "Lignes": len(df), "Colonnes": df.shape[1],
+            "Mo": float(df.memory_usage(deep=True).sum()) / MB,
+        })
+    return pd.DataFrame(rows, columns=["Feuille", "Lignes", "Colonnes", "Mo"]).set_index("Feuille")
+def rss_bytes() -> int:
+    """RSS courant du process (``/proc/self/status``) ; pic RSS (getrusage) si /proc est indisponible."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RssTrend:
+    """Historique borné (horodatage, RSS) partagé entre sessions."""
+    def __init__(self, maxlen: int = RSS_HISTORY):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+    def sample(self) -> int:
+        rss = rss_bytes()
+        with self._lock:
+            self._samples.append((pd.Timestamp.now(), rss))
+        return rss
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            samples = list(self._samples)
+        return pd.DataFrame([(t, r / MB) for t, r in samples], columns=["Heure", "RSS (Mo)"])
+class FigureLedger:
+    """Compteurs des figures matplotlib affichées et fermées ; les figures encore ouvertes sont des fuites."""
+    def __init__(self):
+        self.shown = 0
+        self.closed = 0
+        self._lock = threading.Lock()
+    def shown_one(self) -> None:
+        """Compte une figure remise à ``st.pyplot``."""
+        with self._lock:
+            self.shown += 1
+    def close(self, fig) -> None:
+        """Ferme une figure et la compte ; affichées - fermées = figures perdues en cours de rendu."""
+        plt.close(fig)
+        with self._lock:
+            self.closed += 1
+    def stats(self) -> dict:
+        return {"affichées": self.shown, "fermées": self.closed, "ouvertes": len(plt.get_fignums())}
+
+def memory_report(sheets: pd.DataFrame, caches: pd.DataFrame, trend: pd.DataFrame, figures: dict) -> dict:
+    """Rapport exportable (JSON) : feuilles, caches, figures et historique RSS."""
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rss_mb": rss_bytes() / MB,
+        "sheets": sheets.reset_index().to_dict(orient="records"),
+        "caches": caches.reset_index().to_dict(orient="records"),
+        "figures": figures,
+        "rss_trend": [{"time": t.isoformat(), "rss_mb": v} for t, v in trend.itertuples(index=False)],
+    }
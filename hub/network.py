@@ -0,0 +1,115 @@
+"""Réseaux de passes précalculés à partir de l'onglet Tracking.
+
+Tout est calculé en une fois pour toutes les journées : positions moyennes (J, P, 2),
+matrices d'adjacence joueur → joueur (J, P, P) et zone → zone (J, Z, Z). L'affichage d'une
+journée n'est plus qu'une lecture d'index dans ces tableaux.
+
+Le receveur vient d'une colonne dédiée si le classeur en a une ; sinon la fin de passe
+(X2, Y2) est attribuée au coéquipier dont la position moyenne sur la journée est la plus proche.
+"""
+import numpy as np
+import pandas as pd
+from .xt import cell_index
+
+RECEIVER_COLS = ("Receiver", "Receveur", "ReceiverID", "Receveur ID", "PlayerID2")
+DEFAULT_ZONE_BINS = (6, 5)
+
+def _receiver_column(df: pd.DataFrame) -> str | None:
+    return next((c for c in RECEIVER_COLS if c in df.columns), None)
+def _id_strings(values: pd.Series) -> pd.Series:
+    """Identifiants au format de ``PlayerID_norm`` : une colonne numérique lue en float (cases vides) donne "7", pas "7.0"."""
+    if pd.api.types.is_numeric_dtype(values):
+        numeric = pd.to_numeric(values, errors="coerce")
+        if (numeric.dropna() % 1 == 0).all():
+            return numeric.astype("Int64").astype(str)
+    return values.astype(str).str.strip()
+def build_pass_networks(df_tracking: pd.DataFrame, zone_bins=DEFAULT_ZONE_BINS) -> dict:
+    """Précalcule positions moyennes et adjacences par journée (indice 0 à J-1) et sur la saison."""
+    players = sorted(df_tracking['PlayerID_norm'].dropna().astype(str).unique())
+    p_index = {pid: i for i, pid in enumerate(players)}
+    has_journee = 'Journée' in df_tracking.columns
+    journees = sorted(df_tracking['Journée'].dropna().unique().tolist()) if has_journee else []
+    n_j = max(len(journees), 1)
+    n_p = len(players)
+    n_z = zone_bins[0] * zone_bins[1]
+
+    ev_player = df_tracking['PlayerID_norm'].astype(str).map(p_index).to_numpy()
+    if has_journee:
+        ev_journee = pd.Categorical(df_tracking['Journée'], categories=journees).codes
+    else:
+        ev_journee = np.zeros(len(df_tracking), dtype=np.int64)
+    xy = df_tracking[['X', 'Y']].to_numpy(dtype=float)
+    ok = (ev_journee >= 0) & ~np.isnan(ev_player.astype(float)) & np.isfinite(xy).all(axis=1)
+    flat = ev_journee[ok].astype(np.int64) * n_p + ev_player[ok].astype(np.int64)
+
+    # Positions moyennes et volume d'événements par (journée, joueur)
+    touches = np.bincount(flat, minlength=n_j * n_p).reshape(n_j, n_p).astype(float)
+    sums = np.stack([np.bincount(flat, weights=xy[ok, k], minlength=n_j * n_p) for k in (0, 1)], axis=-1).reshape(n_j, n_p, 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        positions = sums / touches[..., None]
+        season_positions = sums.sum(axis=0) / touches.sum(axis=0)[:, None]
+
+    # Passes
+    is_pass = (df_tracking['Event'] == 'Pass').to_numpy() & ok
+    if {'X2', 'Y2'}.issubset(df_tracking.columns):
+        end = df_tracking[['X2', 'Y2']].to_numpy(dtype=float)
+        is_pass &= np.isfinite(end).all(axis=1)
+    else:
+        end = np.full((len(df_tracking), 2), np.nan)
+        is_pass &= False
+    passer = ev_player[is_pass].astype(np.int64)
+    pass_j = ev_journee[is_pass].astype(np.int64)
+    pass_end = end[is_pass]
+
+    receiver_col = _receiver_column(df_tracking)
+    if receiver_col is not None:
+        receiver = _id_strings(df_tracking.loc[is_pass, receiver_col]).map(p_index).fillna(-1).to_numpy().astype(np.int64)
+        receiver_source = receiver_col
+    elif n_p > 1 and len(passer):
+        # Coéquipier le plus proche de la fin de passe (positions moyennes de la journée)
+        cand = positions[pass_j]                                  # (n_pass, P, 2)
+        dist = ((cand - pass_end[:, None, :]) ** 2).sum(axis=-1)
+        dist[np.isnan(dist)] = np.inf
+        dist[np.arange(len(passer)), passer] = np.inf
+        receiver = np.argmin(dist, axis=1)
+        receiver[~np.isfinite(dist.min(axis=1))] = -1
+        receiver_source = "position moyenne la plus proche"
+    else:
+        receiver = np.full(len(passer), -1, dtype=np.int64)
+        receiver_source = "aucun"
+    linked = (receiver >= 0) & (receiver != passer)
+    adjacency = np.zeros((n_j, n_p, n_p))
+    np.add.at(adjacency, (pass_j[linked], passer[linked], receiver[linked]), 1.0)
+
+    # Réseau par zones (départ → arrivée)
+    z_start = cell_index(xy[is_pass, 0], xy[is_pass, 1], zone_bins)
+    z_end = cell_index(pass_end[:, 0], pass_end[:, 1], zone_bins)
+    zone_ok = (z_start >= 0) & (z_end >= 0)
+    zone_adjacency = np.zeros((n_j, n_z, n_z))
+    np.add.at(zone_adjacency, (pass_j[zone_ok], z_start[zone_ok], z_end[zone_ok]), 1.0)
+
+    return {
+        "players": players,
+        "journees": journees,
+        "positions": positions,
+        "season_positions": season_positions,
+        "touches": touches,
+        "adjacency": adjacency,
+        "zone_adjacency": zone_adjacency,
+        "zone_bins": tuple(zone_bins),
+        "receiver_source": receiver_source,
+    }
+
+def network_slice(networks: dict, journee=None, kind: str = "players") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(adjacence, positions des nœuds, volume des nœuds) pour une journée ou la saison (journee=None)."""
+    if kind == "zones":
+        adjacency = networks["zone_adjacency"]
+        bx, by = networks["zone_bins"]
+        cx, cy = np.meshgrid((np.arange(bx) + 0.5) * 120 / bx, (np.arange(by) + 0.5) * 80 / by)
+        nodes = np.column_stack([cx.ravel(), cy.ravel()])
+        adj = adjacency.sum(axis=0) if journee is None else adjacency[networks["journees"].index(journee)]
+        return adj, nodes, adj.sum(axis=1)
+    if journee is None:
+        return networks["adjacency"].sum(axis=0), networks["season_positions"], networks["touches"].sum(axis=0)
+    j = networks["journees"].index(journee)
+    return networks["adjacency"][j], networks["positions"][j], networks["touches"][j]
@@ -0,0 +1,246 @@
+"""Terrain vectoriel Plotly (repère StatsBomb 120×80, Y vers le bas) — alternative à mplsoccer.
+
+Le dessin se fait côté navigateur : un changement de filtre ne renvoie que les traces JSON,
+pas une image rastérisée.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import sequential
+from .coords import COORD_SYSTEMS, to_canonical
+
+PITCH_LENGTH = 120
+PITCH_WIDTH = 80
+# Au-delà de ce nombre de points, les traces passent en WebGL (Scattergl)
+WEBGL_THRESHOLD = 2000
+# Petits multiples : nombre maximal de facettes dessinées (les plus fournies)
+SMALL_MULTIPLES_MAX = 36
+BG = '#0b1220'
+LINE = '#e2e8f0'
+
+def _pitch_shapes(line_color: str = LINE, linewidth: float = 1.5) -> list:
+    line = dict(color=line_color, width=linewidth)
+    rect = lambda x0, y0, x1, y1: dict(type="rect", x0=x0, y0=y0, x1=x1, y1=y1, line=line, layer="below")
+    shapes = [
+        rect(0, 0, PITCH_LENGTH, PITCH_WIDTH),
+        dict(type="line", x0=60, y0=0, x1=60, y1=PITCH_WIDTH, line=line, layer="below"),
+        dict(type="circle", x0=50, y0=30, x1=70, y1=50, line=line, layer="below"),
+        # Surfaces de réparation, 6 mètres et buts
+        rect(0, 18, 18, 62), rect(102, 18, 120, 62),
+        rect(0, 30, 6, 50), rect(114, 30, 120, 50),
+        rect(-2, 36, 0, 44), rect(120, 36, 122, 44),
+    ]
+    for cx in (12, 60, 108):
+        shapes.append(dict(type="circle", x0=cx - 0.4, y0=39.6, x1=cx + 0.4, y1=40.4,
+                           line=line, fillcolor=line_color, layer="below"))
+    return shapes
+def plotly_pitch(height: int = 500, title: str | None = None) -> go.Figure:
+    """Terrain vide, axes masqués et ratio 120×80 conservé."""
+    fig = go.Figure()
+    fig.update_layout(
+        shapes=_pitch_shapes(),
+        xaxis=dict(range=[-4, PITCH_LENGTH + 4], visible=False, fixedrange=False),
+        yaxis=dict(range=[PITCH_WIDTH + 4, -4], visible=False, scaleanchor="x", scaleratio=1),
+        paper_bgcolor=BG,
+        plot_bgcolor=BG,
+        font=dict(color=LINE),
+        margin=dict(l=10, r=10, t=40 if title else 10, b=10),
+        height=height,
+        showlegend=False,
+        title=dict(text=title, x=0.5) if title else None,
+    )
+    return fig
+
+def _scatter_cls(n: int):
+    return go.Scattergl if n > WEBGL_THRESHOLD else go.Scatter
+def _arrow_angles(x, y, x2, y2) -> np.ndarray:
+    """Angle des têtes de flèche (degrés, sens horaire depuis le nord) avec l'axe Y inversé."""
+    return np.degrees(np.arctan2(x2 - x, y - y2))
+def add_events(fig: go.Figure, ev: pd.DataFrame, color: str, name: str, width: float = 2.0, size: int = 9):
+    """Ajoute les événements d'un type : flèches X→X2 s'il y a une fin, points sinon."""
+    has_xy2 = ev[['X2', 'Y2']].notna().all(axis=1) if {'X2', 'Y2'}.issubset(ev.columns) else pd.Series(False, index=ev.index)
+    arrows = ev[has_xy2]
+    if not arrows.empty:
+        n = len(arrows)
+        x = arrows['X'].to_numpy(dtype=float)
+        y = arrows['Y'].to_numpy(dtype=float)
+        x2 = arrows['X2'].to_numpy(dtype=float)
+        y2 = arrows['Y2'].to_numpy(dtype=float)
+        # Un seul tracé pour tous les segments, séparés par des NaN
+        seg_x = np.column_stack([x, x2, np.full(n, np.nan)]).ravel()
+        seg_y = np.column_stack([y, y2, np.full(n, np.nan)]).ravel()
+        fig.add_trace(_scatter_cls(n)(
+            x=seg_x, y=seg_y, mode='lines', name=name, hoverinfo='skip',
+            line=dict(color=color, width=width), opacity=0.8, connectgaps=False,
+        ))
+        heads = dict(color=color, size=size)
+        if n <= WEBGL_THRESHOLD:
+            heads.update(symbol='arrow', angle=_arrow_angles(x, y, x2, y2))
+        fig.add_trace(_scatter_cls(n)(
+            x=x2, y=y2, mode='markers', name=name, marker=heads,
+            customdata=np.column_stack([x, y]),
+            hovertemplate=f"{name}<br>(%{{customdata[0]:.0f}}, %{{customdata[1]:.0f}}) → (%{{x:.0f}}, %{{y:.0f}})<extra></extra>",
+        ))
+    points = ev[~has_xy2]
+    if not points.empty:
+        fig.add_trace(_scatter_cls(len(points))(
+            x=points['X'], y=points['Y'], mode='markers', name=name,
+            marker=dict(color=color, size=size + 2, line=dict(color='white', width=0.5)), opacity=0.85,
+            hovertemplate=f"{name}<br>(%{{x:.0f}}, %{{y:.0f}})<extra></extra>",
+        ))
+    return fig
+def plotly_event_map(df: pd.DataFrame, events: list, event_colors: dict, title: str | None = None,
+                     height: int = 500, width: float = 2.0) -> go.Figure:
+    fig = plotly_pitch(height=height, title=title)
+    for event_type in events:
+        ev = df[df['Event'] == event_type]
+        if not ev.empty:
+            add_events(fig, ev, event_colors.get(event_type, '#ffffff'), event_type, width=width)
+    return fig
+
+def _cell_index(x, y, bins) -> tuple[np.ndarray, np.ndarray]:
+    """(masque des points sur le terrain, case à plat ``ligne * bins_x + colonne``) ; bornes comme ``histogram2d``."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    inside = (x >= 0) & (x <= PITCH_LENGTH) & (y >= 0) & (y <= PITCH_WIDTH)
+    ix = np.minimum(np.searchsorted(np.linspace(0, PITCH_LENGTH, bins[0] + 1), x[inside], side="right") - 1, bins[0] - 1)
+    iy = np.minimum(np.searchsorted(np.linspace(0, PITCH_WIDTH, bins[1] + 1), y[inside], side="right") - 1, bins[1] - 1)
+    return inside, iy * bins[0] + ix
+def binned_counts(x, y, bins=(6, 5)) -> np.ndarray:
+    """Comptages 2-D sur le terrain 120×80, forme (bins_y, bins_x)."""
+    _, cells = _cell_index(x, y, bins)
+    return np.bincount(cells, minlength=bins[0] * bins[1]).astype(float).reshape(bins[1], bins[0])
+def plotly_grid(z: np.ndarray, colorscale: str = 'Reds', title: str | None = None, height: int = 500,
+                texttemplate: str = "%{z:.0%}", hovertemplate: str = "%{z:.1%}<extra></extra>") -> go.Figure:
+    """Valeurs par case (forme (bins_y, bins_x)) dessinées sur le terrain."""
+    z = np.asarray(z, dtype=float)
+    x_edges = np.linspace(0, PITCH_LENGTH, z.shape[1] + 1)
+    y_edges = np.linspace(0, PITCH_WIDTH, z.shape[0] + 1)
+    fig = plotly_pitch(height=height, title=title)
+    fig.add_trace(go.Heatmap(
+        z=z, x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        colorscale=getattr(sequential, colorscale, colorscale), showscale=False, opacity=0.8, xgap=1, ygap=1,
+        texttemplate=texttemplate, textfont=dict(color='white', size=13), hovertemplate=hovertemplate,
+    ))
+    return fig
+def plotly_density(z: np.ndarray, colorscale: str = 'Reds', title: str | None = None, height: int = 500) -> go.Figure:
+    """Densité fine (forme (bins_y, bins_x), ex. 80×120 lissée) dessinée sur le terrain, sans libellés."""
+    z = np.asarray(z, dtype=float)
+    x_edges = np.linspace(0, PITCH_LENGTH, z.shape[1] + 1)
+    y_edges = np.linspace(0, PITCH_WIDTH, z.shape[0] + 1)
+    fig = plotly_pitch(height=height, title=title)
+    fig.add_trace(go.Heatmap(
+        z=z, x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        colorscale=getattr(sequential, colorscale, colorscale), showscale=False, opacity=0.85, zsmooth="best",
+        hovertemplate="%{z:.2%} des événements / m²<extra></extra>",
+    ))
+    return fig
+def plotly_heatmap(x, y, bins=(6, 5), colorscale: str = 'Reds', title: str | None = None,
+                   height: int = 500, normalize: bool = True) -> go.Figure:
+    """Heatmap par cases (équivalent de bin_statistic + label_heatmap), libellés en %."""
+    counts = binned_counts(x, y, bins)
+    total = counts.sum()
+    if normalize:
+        return plotly_grid(counts / total if total > 0 else counts, colorscale, title, height)
+    return plotly_grid(counts, colorscale, title, height, texttemplate="%{z:.0f}", hovertemplate="%{z:.0f}<extra></extra>")
+
+def facet_counts(x, y, facets, bins=(6, 5)) -> tuple[np.ndarray, np.ndarray]:
+    """Comptages 2-D de toutes les facettes en un passage, forme (n_facettes, bins_y, bins_x).
+
+    Mêmes cases que ``binned_counts`` (bornes incluses comme ``histogram2d``) ; retourne aussi les
+    valeurs de facette, triées.
+    """
+    codes, keys = pd.factorize(pd.Series(facets).reset_index(drop=True), sort=True)
+    inside, cells = _cell_index(x, y, bins)
+    on_pitch = codes[inside]
+    # Une case à plat par (facette, ligne, colonne) : un seul bincount pour toute la grille
+    flat = on_pitch[on_pitch >= 0] * (bins[0] * bins[1]) + cells[on_pitch >= 0]
+    counts = np.bincount(flat, minlength=len(keys) * bins[0] * bins[1]).astype(float)
+    return np.asarray(keys), counts.reshape(len(keys), bins[1], bins[0])
+def plotly_small_multiples(counts: np.ndarray, titles: list, cols: int = 4, colorscale: str = 'Reds',
+                           normalize: bool = True, panel_height: int = 200) -> go.Figure:
+    """Grille de heatmaps (une par facette) dans une seule figure vectorielle, échelle de couleur commune.
+
+    ``normalize`` : chaque panneau en % de ses propres événements (profils comparables à volume différent).
+    La mise en page (un couple d'axes par panneau) est écrite directement, sans ``make_subplots`` ni
+    validation trace par trace : le coût reste proche de celui d'un seul terrain.
+    """
+    n = len(counts)
+    cols = max(1, min(cols, n))
+    rows = max(1, -(-n // cols))
+    if normalize:
+        totals = counts.reshape(n, -1).sum(axis=1)
+        counts = counts / np.where(totals > 0, totals, 1)[:, None, None]
+    x_edges = np.linspace(0, PITCH_LENGTH, counts.shape[2] + 1)
+    y_edges = np.linspace(0, PITCH_WIDTH, counts.shape[1] + 1)
+    x_mid, y_mid = ((x_edges[:-1] + x_edges[1:]) / 2).tolist(), ((y_edges[:-1] + y_edges[1:]) / 2).tolist()
+    value_fmt = "%{z:.1%}" if normalize else "%{z:.0f}"
+    h_gap, v_gap = 0.02, 0.3 / rows
+    width, height = (1 - h_gap * (cols - 1)) / cols, (1 - v_gap * (rows - 1)) / rows
+    data, shapes, annotations = [], [], []
+    layout = dict(
+        coloraxis=dict(colorscale=getattr(sequential, colorscale, colorscale), showscale=False),
+        paper_bgcolor=BG, plot_bgcolor=BG, font=dict(color=LINE, size=11),
+        margin=dict(l=10, r=10, t=30, b=10), height=panel_height * rows + 40, showlegend=False,
+    )
+    for i, (z, title) in enumerate(zip(counts, titles)):
+        row, col = divmod(i, cols)
+        suffix = "" if i == 0 else str(i + 1)
+        x0, y1 = col * (width + h_gap), 1 - row * (height + v_gap)
+        y0 = max(0.0, y1 - height)
+        layout[f"xaxis{suffix}"] = dict(domain=[x0, min(1.0, x0 + width)], anchor=f"y{suffix}", range=[-3, PITCH_LENGTH + 3], visible=False)
+        layout[f"yaxis{suffix}"] = dict(domain=[y0, y1], anchor=f"x{suffix}", range=[PITCH_WIDTH + 3, -3], visible=False,
+                                        scaleanchor=f"x{suffix}", scaleratio=1)
+        data.append(dict(type="heatmap", z=z.tolist(), x=x_mid, y=y_mid, coloraxis="coloraxis", xgap=1, ygap=1,
+                         xaxis=f"x{suffix}", yaxis=f"y{suffix}", hovertemplate=f"{title}<br>{value_fmt}<extra></extra>"))
+        shapes += [{**shape, "xref": f"x{suffix}", "yref": f"y{suffix}"} for shape in _pitch_shapes(linewidth=1)]
+        annotations.append(dict(text=str(title), x=x0 + width / 2, y=y1, xref="paper", yref="paper",
+                                xanchor="center", yanchor="bottom", showarrow=False, font=dict(size=12)))
+    layout.update(shapes=shapes, annotations=annotations)
+    return go.Figure(data=data, layout=layout, _validate=False)
+
+def opta_to_pitch(x: float, y: float) -> tuple[float, float]:
+    """Coordonnées Opta (0-100, Y vers le haut) → repère du terrain Plotly."""
+    x, y = to_canonical(x, y, COORD_SYSTEMS["opta"])
+    return float(x), float(y)
+def plotly_position_map(x_opta: float, y_opta: float, label: str, height: int = 480) -> go.Figure:
+    x, y = opta_to_pitch(x_opta, y_opta)
+    fig = plotly_pitch(height=height)
+    fig.add_trace(go.Scatter(
+        x=[x], y=[y], mode='markers+text', text=[label], textposition='top center',
+        textfont=dict(color='white', size=13), hoverinfo='text',
+        marker=dict(size=28, color='#3b82f6', line=dict(color='white', width=2), opacity=0.9),
+    ))
+    return fig
+
+def plotly_pass_network(adjacency: np.ndarray, nodes: np.ndarray, volume: np.ndarray, labels: list,
+                        min_passes: int = 1, height: int = 520, title: str | None = None) -> go.Figure:
+    """Réseau de passes : arêtes (passes dans les deux sens) groupées par épaisseur, nœuds à la position moyenne."""
+    fig = plotly_pitch(height=height, title=title)
+    pair = adjacency + adjacency.T
+    src, dst = np.nonzero(np.triu(pair, k=1) >= min_passes)
+    present = np.isfinite(nodes).all(axis=1)
+    keep = present[src] & present[dst]
+    src, dst = src[keep], dst[keep]
+    if len(src):
+        weights = pair[src, dst]
+        # Une trace par classe d'épaisseur plutôt qu'une par arête
+        buckets = np.minimum((weights / weights.max() * 5).astype(int), 4)
+        for b in np.unique(buckets):
+            sel = buckets == b
+            seg_x = np.column_stack([nodes[src[sel], 0], nodes[dst[sel], 0], np.full(sel.sum(), np.nan)]).ravel()
+            seg_y = np.column_stack([nodes[src[sel], 1], nodes[dst[sel], 1], np.full(sel.sum(), np.nan)]).ravel()
+            fig.add_trace(go.Scatter(x=seg_x, y=seg_y, mode='lines', hoverinfo='skip',
+                                     line=dict(color='rgba(94, 234, 212, 0.6)', width=1 + 2 * b)))
+    shown = present & (volume > 0)
+    if shown.any():
+        size = 12 + 28 * np.sqrt(volume[shown] / volume[shown].max())
+        fig.add_trace(go.Scatter(
+            x=nodes[shown, 0], y=nodes[shown, 1], mode='markers+text',
+            text=[labels[i] for i in np.flatnonzero(shown)], textposition='top center',
+            textfont=dict(color='white', size=11),
+            marker=dict(size=size, color='#3b82f6', line=dict(color='white', width=1.5)),
+            customdata=np.column_stack([volume[shown], adjacency.sum(axis=1)[shown]]),
+            hovertemplate="%{text}<br>Événements : %{customdata[0]:.0f}<br>Passes données : %{customdata[1]:.0f}<extra></extra>",
+        ))
+    return fig
@@ -0,0 +1,129 @@
+"""Table des vecteurs radar : tous les joueurs (saison) et tous les joueur × match en une passe.
+
+Les compteurs bruts de la feuille Match sont convertis une seule fois, sommés par joueur,
+puis les métriques sont mises à l'échelle 0-100 de la même façon pour tous les radars :
+échelle fixe (facteur par métrique) ou percentile dans l'effectif. Afficher un radar
+revient à lire une ligne de la table.
+"""
+import numpy as np
+import pandas as pd
+from .core import to_num
+
+# Compteurs bruts : nom interne -> colonnes candidates de la feuille Match
+RAW_COUNTERS = {
+    "minutes": ("Minutes Jouées",),
+    "passes_tent": ("Passe tentées",),
+    "passes_comp": ("Passe complete",),
+    "prog_passes": ("Passe progressive",),
+    "key_passes": ("Passe decisive",),
+    "shots": ("Tir",),
+    "shots_on_target": ("Tir cadre",),
+    "xg": ("xG",),
+    "goals": ("Buts",),
+    "duels_tent": ("Duel tenté", "Duel tente"),
+    "duels_won": ("Duel gagne",),
+    "interceptions": ("Interception",),
+    "recoveries": ("Recuperation du ballon",),
+}
+# Échelle fixe : valeur × facteur, plafonnée à 100 (mêmes noms que les clés de calculate_kpis)
+FIXED_SCALES = {
+    "pass_accuracy": 1, "prog_passes_per_90": 10, "key_passes_per_match": 50,
+    "shot_accuracy": 1, "xg_per_90": 150, "goals_per_xg": 70,
+    "duel_win_rate": 1, "interceptions_per_90": 30, "recoveries_per_90": 10,
+    "xg_per_match": 20, "goals_per_match": 50, "playtime_pct": 1,
+    "goals": 20, "shots": 10, "shots_on_target": 12.5, "xg": 50,
+}
+# Axes de chaque radar : (libellé, métrique)
+RADARS = {
+    "season": [
+        ('Précision Passes', 'pass_accuracy'), ('Passes Prog./90', 'prog_passes_per_90'),
+        ('Passes Décisives', 'key_passes_per_match'), ('Précision Tirs', 'shot_accuracy'),
+        ('xG/90', 'xg_per_90'), ('Efficacité', 'goals_per_xg'), ('Duels Gagnés', 'duel_win_rate'),
+        ('Interceptions/90', 'interceptions_per_90'), ('Récupérations/90', 'recoveries_per_90'),
+    ],
+    "compare": [
+        ('Passes', 'pass_accuracy'), ('Duels', 'duel_win_rate'), ('Tirs', 'shot_accuracy'),
+        ('xG/Match', 'xg_per_match'), ('Buts/Match', 'goals_per_match'), ('Temps de Jeu', 'playtime_pct'),
+    ],
+    "offense": [('Buts', 'goals'), ('Tirs', 'shots'), ('Tirs Cadrés', 'shots_on_target'), ('xG', 'xg')],
+}
+SCALES = {"fixed": "Échelle fixe", "percentile": "Percentile effectif"}
+
+def radar_categories(radar: str) -> list:
+    return [label for label, _ in RADARS[radar]]
+SEASON_RADAR_CATEGORIES = radar_categories("season")
+
+def raw_counters(df_match: pd.DataFrame) -> pd.DataFrame:
+    """Compteurs bruts numériques (0 si colonne absente), un par ligne de la feuille Match."""
+    out = pd.DataFrame(index=df_match.index)
+    for name, candidates in RAW_COUNTERS.items():
+        col = next((c for c in candidates if c in df_match.columns), None)
+        out[name] = to_num(df_match[col]).to_numpy(dtype=float) if col is not None else 0.0
+    return out
+def _ratio(num, den, scale: float = 1.0) -> np.ndarray:
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den * scale, 0.0)
+def derive_metrics(sums: pd.DataFrame) -> pd.DataFrame:
+    """Métriques radar à partir de compteurs sommés et d'une colonne ``matches``."""
+    m = pd.DataFrame(index=sums.index)
+    minutes, matches = sums["minutes"], sums["matches"]
+    m["pass_accuracy"] = _ratio(sums["passes_comp"], sums["passes_tent"], 100)
+    m["prog_passes_per_90"] = _ratio(sums["prog_passes"], minutes, 90)
+    m["key_passes_per_match"] = _ratio(sums["key_passes"], matches)
+    m["shot_accuracy"] = _ratio(sums["shots_on_target"], sums["shots"], 100)
+    m["xg_per_90"] = _ratio(sums["xg"], minutes, 90)
+    m["goals_per_xg"] = _ratio(sums["goals"], sums["xg"])
+    m["duel_win_rate"] = _ratio(sums["duels_won"], sums["duels_tent"], 100)
+    m["interceptions_per_90"] = _ratio(sums["interceptions"], minutes, 90)
+    m["recoveries_per_90"] = _ratio(sums["recoveries"], minutes, 90)
+    m["xg_per_match"] = _ratio(sums["xg"], matches)
+    m["goals_per_match"] = _ratio(sums["goals"], matches)
+    m["playtime_pct"] = np.minimum(_ratio(minutes, matches) / 90 * 100, 100)
+    for col in ("goals", "shots", "shots_on_target", "xg"):
+        m[col] = sums[col].to_numpy(dtype=float)
+    return m
+def scale_metrics(metrics: pd.DataFrame, scale: str = "fixed") -> pd.DataFrame:
+    """Mise à l'échelle 0-100 : facteurs fixes ou rang percentile parmi les lignes de la table."""
+    if scale == "percentile":
+        return metrics.rank(pct=True, method="average").fillna(0) * 100
+    factors = pd.Series(FIXED_SCALES).reindex(metrics.columns).fillna(1)
+    return (metrics * factors).clip(upper=100)
+
+def build_radar_tables(df_match: pd.DataFrame, scale: str = "fixed") -> dict:
+    """Tables radar en lot : ``player`` (index PlayerID_norm) et ``match`` (index de la feuille Match).
+
+    Chaque entrée contient ``raw`` (métriques brutes) et ``scaled`` (0-100) ; ``player`` garde
+    aussi ``sums``, les compteurs bruts sommés (avec ``matches``).
+    """
+    counters = raw_counters(df_match)
+    counters["matches"] = 1.0
+    match_metrics = derive_metrics(counters)
+    pids = df_match["PlayerID_norm"].astype(str) if "PlayerID_norm" in df_match.columns else pd.Series("", index=df_match.index)
+    player_sums = counters.groupby(pids.to_numpy()).sum()
+    player_sums.index.name = "PlayerID_norm"
+    player_metrics = derive_metrics(player_sums)
+    return {
+        "player": {"raw": player_metrics, "scaled": scale_metrics(player_metrics, scale), "sums": player_sums},
+        "match": {"raw": match_metrics, "scaled": scale_metrics(match_metrics, scale), "player_ids": pids},
+        "scale": scale,
+    }
+def radar_vector(tables: dict, key, radar: str, level: str = "player") -> list:
+    """Valeurs 0-100 d'un radar pour un joueur (``level='player'``) ou une ligne match ; zéros si absent."""
+    metrics = [metric for _, metric in RADARS[radar]]
+    scaled = tables[level]["scaled"]
+    key = str(key) if level == "player" else key
+    if key not in scaled.index:
+        return [0.0] * len(metrics)
+    return scaled.loc[key, metrics].astype(float).tolist()
+def radar_matrix(tables: dict, keys, radar: str, level: str = "player") -> pd.DataFrame:
+    """Radars de plusieurs joueurs (ou lignes match) en une lecture : lignes = clés, colonnes = axes."""
+    keys = [str(k) for k in keys] if level == "player" else list(keys)
+    metrics = [metric for _, metric in RADARS[radar]]
+    out = tables[level]["scaled"].reindex(index=keys, columns=metrics).fillna(0.0)
+    out.columns = radar_categories(radar)
+    return out
+def season_radar_values(kpis: dict) -> list:
+    """Radar saison à échelle fixe depuis un dict de KPIs (mêmes facteurs que la table)."""
+    return [min(kpis[metric] * FIXED_SCALES[metric], 100) for _, metric in RADARS["season"]]
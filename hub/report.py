@@ -0,0 +1,173 @@
+"""Rapport joueur headless : cartes KPI, radar tactique et heatmaps terrain en PNG / PDF / HTML.
+
+Les fonctions de rendu sont appelées dans des process workers (voir ``export_reports.py``) :
+les feuilles préparées sont installées une fois par worker via ``init_worker``.
+"""
+import base64
+import html
+import io
+import re
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch
+from .coords import PITCH_TYPE
+from .core import to_num, calculate_kpis, create_radar_chart
+from .radar import SEASON_RADAR_CATEGORIES, season_radar_values
+from .scoring import build_score_components, weighted_scores
+
+REPORT_FORMATS = ("png", "pdf", "html")
+BG = '#0b1220'
+TEXT = '#e2e8f0'
+MUTED = '#94a3b8'
+# Nombre maximum de heatmaps par type d'événement dans un rapport
+MAX_EVENT_HEATMAPS = 3
+
+# Feuilles partagées par le process worker courant (installées par init_worker)
+_FRAMES = {}
+def init_worker(df_players: pd.DataFrame, df_match: pd.DataFrame, df_tracking: pd.DataFrame, weights: dict | None = None):
+    """Initializer du pool : reçoit les feuilles une seule fois par process et score tout l'effectif."""
+    _FRAMES["players"] = df_players
+    _FRAMES["match"] = df_match
+    _FRAMES["tracking"] = df_tracking
+    # Même score global que le Dashboard (sous-scores en lot, pondération de la sidebar ou de --weights)
+    _FRAMES["scores"] = weighted_scores(build_score_components(df_match), weights) if not df_match.empty else pd.Series(dtype=float)
+
+def score_color(score: float) -> str:
+    return '#10b981' if score >= 70 else '#f59e0b' if score >= 50 else '#ef4444'
+def player_summary(df_players: pd.DataFrame, df_match: pd.DataFrame, player_id: str, scores: pd.Series | None = None) -> dict:
+    """Identité, cartes KPI et valeurs radar d'un joueur — mêmes calculs que le Dashboard."""
+    p = {}
+    if not df_players.empty and "PlayerID_norm" in df_players.columns:
+        p_row = df_players[df_players["PlayerID_norm"] == player_id]
+        if not p_row.empty:
+            p = p_row.iloc[0].to_dict()
+    dm = df_match[df_match["PlayerID_norm"] == player_id] if not df_match.empty and "PlayerID_norm" in df_match.columns else pd.DataFrame()
+    total_minutes = to_num(dm.get("Minutes Jouées", 0)).sum() if not dm.empty else 0
+    total_matches = len(dm)
+    if scores is None and not dm.empty:
+        scores = weighted_scores(build_score_components(dm))
+    perf_score = float(scores.get(player_id, 0)) if not dm.empty else 0
+    kpis = calculate_kpis(dm, total_minutes, total_matches, player_id, df_players) if not dm.empty else {}
+    name = f"{p.get('Prénom', '')} {p.get('Nom', '')}".strip() or str(player_id)
+    cards = [
+        (f"{p.get('Taille', '')} cm", "Taille", TEXT),
+        (f"{p.get('Poids', '')} kg", "Poids", TEXT),
+        (str(p.get('Pied', '')), "Pied Fort", TEXT),
+        (f"{int(total_minutes)}", "Minutes Jouées", "#3b82f6"),
+        (f"{total_matches}", "Matchs Joués", "#8b5cf6"),
+        (f"{perf_score:.1f}", "Score Global", score_color(perf_score)),
+    ]
+    return {
+        "player_id": player_id,
+        "name": name,
+        "poste": p.get('Poste Détail', p.get('Poste', 'Défaut')),
+        "club": p.get('Club', ''),
+        "cards": cards,
+        "radar": season_radar_values(kpis) if kpis else [0] * len(SEASON_RADAR_CATEGORIES),
+    }
+
+def _draw_heatmap(ax, pitch: Pitch, ev: pd.DataFrame, cmap: str, title: str):
+    pitch.draw(ax=ax)
+    if not ev.empty:
+        bin_stat = pitch.bin_statistic(ev['X'], ev['Y'], statistic='count', bins=(6, 5), normalize=True)
+        pitch.heatmap(bin_stat, ax=ax, cmap=cmap, edgecolor='white', alpha=0.8)
+        pitch.label_heatmap(bin_stat, ax=ax, str_format='{:.0%}', fontsize=9, color='white', ha='center', va='center')
+    ax.set_title(title, color=TEXT, fontsize=11)
+def render_report_figure(summary: dict, tracking: pd.DataFrame):
+    """Une page matplotlib : en-tête + 6 cartes, radar et heatmaps (générale puis par événement)."""
+    top_events = tracking['Event'].value_counts().index[:MAX_EVENT_HEATMAPS].tolist() if not tracking.empty else []
+    fig = plt.figure(figsize=(14, 13), facecolor=BG)
+    gs = fig.add_gridspec(3, 3, height_ratios=[0.45, 1.4, 1.0], hspace=0.35, wspace=0.15)
+    ax_cards = fig.add_subplot(gs[0, :])
+    ax_cards.axis('off')
+    ax_cards.text(0, 1.0, summary["name"], color=TEXT, fontsize=20, weight='bold', va='top')
+    ax_cards.text(0, 0.62, f"{summary['poste']} • {summary['club']}", color=MUTED, fontsize=12, va='top')
+    for i, (val, label, color) in enumerate(summary["cards"]):
+        x0 = i / 6
+        ax_cards.add_patch(plt.Rectangle((x0 + 0.005, 0.0), 1 / 6 - 0.01, 0.42, transform=ax_cards.transAxes,
+                                         facecolor='#121a2b', edgecolor='#2a3344'))
+        ax_cards.text(x0 + 1 / 12, 0.3, label.upper(), color=MUTED, fontsize=9, ha='center', transform=ax_cards.transAxes)
+        ax_cards.text(x0 + 1 / 12, 0.1, val, color=color, fontsize=15, weight='bold', ha='center', transform=ax_cards.transAxes)
+    # Radar
+    ax_radar = fig.add_subplot(gs[1, 0], projection='polar', facecolor=BG)
+    angles = np.linspace(0, 2 * np.pi, len(SEASON_RADAR_CATEGORIES), endpoint=False)
+    values = np.asarray(summary["radar"], dtype=float)
+    ax_radar.plot(np.append(angles, angles[0]), np.append(values, values[0]), color='#3b82f6', linewidth=2)
+    ax_radar.fill(np.append(angles, angles[0]), np.append(values, values[0]), color='#3b82f6', alpha=0.2)
+    ax_radar.set_ylim(0, 100)
+    ax_radar.set_xticks(angles)
+    ax_radar.set_xticklabels(SEASON_RADAR_CATEGORIES, color=TEXT, fontsize=8)
+    ax_radar.tick_params(axis='y', colors=MUTED, labelsize=7)
+    ax_radar.set_title("Performance Tactique", color=TEXT, fontsize=11, pad=18)
+    # Heatmaps
+    pitch = Pitch(pitch_type=PITCH_TYPE, pitch_color=BG, line_color=TEXT)
+    _draw_heatmap(fig.add_subplot(gs[1, 1:]), pitch, tracking, 'Reds', "Heatmap Générale (%)")
+    for i, event_type in enumerate(top_events):
+        cmap_name = 'Blues' if event_type == 'Pass' else 'Reds' if event_type == 'Shot' else 'Greens'
+        _draw_heatmap(fig.add_subplot(gs[2, i]), pitch, tracking[tracking['Event'] == event_type], cmap_name, f"{event_type} - Densité")
+    return fig
+
+_CARD_CSS = """
+body { background: #0b1220; color: #e2e8f0; font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif; padding: 24px; }
+.grid { display: grid; grid-template-columns: repeat(6, 1fr); gap: 8px; margin: 16px 0; }
+.metric-card { background: #121a2b; border: 1px solid rgba(255,255,255,0.08); border-radius: 16px; padding: 16px; }
+.metric-card h3 { font-size: 13px; color: #94a3b8; margin: 0 0 8px 0; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; }
+.metric-card .value { font-size: 24px; font-weight: 700; line-height: 1.2; }
+.muted { color: #94a3b8; }
+"""
+def render_report_html(summary: dict, png_bytes: bytes) -> str:
+    """Page HTML autonome : cartes KPI en HTML, radar Plotly interactif, planche PNG des heatmaps."""
+    cards = "".join(
+        f'<div class="metric-card"><h3>{html.escape(label)}</h3><div class="value" style="color: {color};">{html.escape(val)}</div></div>'
+        for val, label, color in summary["cards"]
+    )
+    radar = create_radar_chart(summary["radar"], SEASON_RADAR_CATEGORIES, "Performance Tactique Complète")
+    radar_html = radar.to_html(include_plotlyjs='cdn', full_html=False)
+    img = base64.b64encode(png_bytes).decode("ascii")
+    return f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>{html.escape(summary['name'])} — Rapport</title><style>{_CARD_CSS}</style></head>
+<body>
+<h1>{html.escape(summary['name'])}</h1>
+<div class="muted">{html.escape(str(summary['poste']))} • {html.escape(str(summary['club']))}</div>
+<div class="grid">{cards}</div>
+{radar_html}
+<img src="data:image/png;base64,{img}" style="width: 100%;" alt="Heatmaps">
+</body></html>
+"""
+
+def report_basename(summary: dict) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", summary["name"]).strip("_")
+    return f"{summary['player_id']}_{slug}" if slug else str(summary['player_id'])
+def export_player_report(player_id: str, out_dir: str, formats=REPORT_FORMATS) -> tuple[str, list, float]:
+    """Rend le rapport d'un joueur dans les formats demandés. Retourne (PlayerID, fichiers, secondes)."""
+    t0 = time.perf_counter()
+    df_players, df_match, df_tracking = _FRAMES["players"], _FRAMES["match"], _FRAMES["tracking"]
+    summary = player_summary(df_players, df_match, player_id, _FRAMES.get("scores"))
+    tracking = df_tracking[df_tracking['PlayerID_norm'] == player_id] if not df_tracking.empty else df_tracking
+    fig = render_report_figure(summary, tracking)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    base = out / report_basename(summary)
+    written = []
+    try:
+        if "pdf" in formats:
+            fig.savefig(f"{base}.pdf", facecolor=BG)
+            written.append(f"{base}.pdf")
+        if "png" in formats or "html" in formats:
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png", dpi=110, facecolor=BG)
+            png_bytes = buf.getvalue()
+            if "png" in formats:
+                Path(f"{base}.png").write_bytes(png_bytes)
+                written.append(f"{base}.png")
+            if "html" in formats:
+                Path(f"{base}.html").write_text(render_report_html(summary, png_bytes), encoding="utf-8")
+                written.append(f"{base}.html")
+    finally:
+        plt.close(fig)
+    return player_id, written, time.perf_counter() - t0
@@ -0,0 +1,102 @@
+"""Rôles joués : clustering non supervisé (k-means / k-medoids NumPy) des profils par 90 minutes.
+
+Les profils sont ceux de la recherche de similarité (matrice centrée-réduite). Les distances
+point → centre passent par |x|² + |c|² − 2·x·c, soit un produit matriciel (n, k) par
+itération : quelques milliers de joueurs-saisons se regroupent en une fraction de seconde.
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = {"kmeans": "k-means", "kmedoids": "k-medoids"}
+DEFAULT_K = 4
+
+def _sq_dist(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Distances euclidiennes au carré (n, k) en un produit matriciel."""
+    return np.clip((X ** 2).sum(axis=1)[:, None] + (C ** 2).sum(axis=1)[None, :] - 2 * X @ C.T, 0, None)
+def _init_plus_plus(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Indices des k centres initiaux (k-means++)."""
+    idx = [int(rng.integers(len(X)))]
+    d2 = _sq_dist(X, X[idx]).ravel()
+    for _ in range(1, k):
+        total = d2.sum()
+        nxt = int(rng.choice(len(X), p=d2 / total)) if total > 0 else int(rng.integers(len(X)))
+        idx.append(nxt)
+        d2 = np.minimum(d2, _sq_dist(X, X[[nxt]]).ravel())
+    return np.array(idx)
+
+def kmeans(X: np.ndarray, k: int, n_init: int = 5, max_iter: int = 100, seed: int = 0) -> tuple[np.ndarray, np.ndarray, float]:
+    """(labels, centres, inertie) — meilleure de ``n_init`` initialisations k-means++."""
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(n_init):
+        centers = X[_init_plus_plus(X, k, rng)].copy()
+        for _ in range(max_iter):
+            labels = _sq_dist(X, centers).argmin(axis=1)
+            counts = np.bincount(labels, minlength=k)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, labels, X)
+            # Un centre vide garde sa position précédente
+            new_centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+            if np.allclose(new_centers, centers):
+                break
+            centers = new_centers
+        labels = _sq_dist(X, centers).argmin(axis=1)
+        inertia = float(_sq_dist(X, centers)[np.arange(len(X)), labels].sum())
+        if best is None or inertia < best[2]:
+            best = (labels, centers, inertia)
+    return best
+def kmedoids(X: np.ndarray, k: int, max_iter: int = 50, seed: int = 0) -> tuple[np.ndarray, np.ndarray, float]:
+    """(labels, médoïdes, coût) — algorithme alterné ; la mise à jour ne calcule que les distances intra-cluster."""
+    rng = np.random.default_rng(seed)
+    medoids = _init_plus_plus(X, k, rng)
+    for _ in range(max_iter):
+        labels = _sq_dist(X, X[medoids]).argmin(axis=1)
+        new_medoids = medoids.copy()
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if len(members) == 0:
+                continue
+            within = np.sqrt(_sq_dist(X[members], X[members])).sum(axis=1)
+            new_medoids[c] = members[within.argmin()]
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+    d = np.sqrt(_sq_dist(X, X[medoids]))
+    labels = d.argmin(axis=1)
+    return labels, X[medoids], float(d[np.arange(len(X)), labels].sum())
+
+def cluster_roles(model: dict, k: int = DEFAULT_K, method: str = "kmeans", seed: int = 0) -> dict:
+    """Rôles à partir d'un modèle de similarité (``build_similarity_model``).
+
+    Retourne ``labels`` (Series PlayerID_norm → rôle), ``names`` (libellé par rôle, d'après
+    les deux indicateurs les plus marqués du centre), ``centroids_z`` et ``centroid_pct``
+    (percentile effectif 0-100 de chaque centre, pour le radar).
+    """
+    z, profiles = model["z"], model["profiles"]
+    features = model["features"]
+    k = max(1, min(k, len(z)))
+    if len(z) == 0:
+        return {"labels": pd.Series(dtype=int), "names": {}, "centroids_z": np.zeros((0, len(features))),
+                "centroid_pct": pd.DataFrame(columns=features), "k": 0}
+    labels, centers, _ = kmeans(z, k, seed=seed) if method == "kmeans" else kmedoids(z, k, seed=seed)
+    # Centre ramené en unités brutes puis situé dans la distribution de l'effectif
+    raw = profiles.to_numpy(dtype=float)
+    mean, std = raw.mean(axis=0), raw.std(axis=0)
+    std[std == 0] = 1.0
+    centers_raw = centers * std + mean
+    sorted_cols = np.sort(raw, axis=0)
+    pct = np.column_stack([
+        np.searchsorted(sorted_cols[:, j], centers_raw[:, j], side="right") / len(raw) * 100
+        for j in range(len(features))
+    ])
+    names = {}
+    for c in range(k):
+        top = np.argsort(-centers[c])[:2]
+        names[c] = f"Rôle {c + 1} · " + ", ".join(features[j] for j in top)
+    return {
+        "labels": pd.Series(labels, index=model["players"], name="Rôle"),
+        "names": names,
+        "centroids_z": centers,
+        "centroid_pct": pd.DataFrame(pct, index=[names[c] for c in range(k)], columns=features),
+        "k": k,
+    }
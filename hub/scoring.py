@@ -0,0 +1,53 @@
+"""Score global en lot : sous-scores de tous les joueurs dans une matrice (joueurs × composantes).
+
+Cinq sous-scores plafonnés à 100 (passes, duels, contribution offensive et défensive selon
+``ATTACK_POINTS`` / ``DEFENSE_POINTS``, conservation) sont calculés une fois par classeur à partir
+des compteurs sommés ; le score global est leur somme pondérée par ``PERFORMANCE_WEIGHTS``,
+plafonnée à 100. Changer la pondération revient à un seul produit matrice-vecteur : tout
+l'effectif est reclassé sans relire la feuille Match.
+"""
+import numpy as np
+import pandas as pd
+from .core import to_num, PERFORMANCE_WEIGHTS, ATTACK_POINTS, DEFENSE_POINTS
+from .radar import raw_counters, _ratio
+
+# Composantes du score : nom interne (clé de PERFORMANCE_WEIGHTS) -> libellé
+SCORE_COMPONENTS = {
+    'passing_efficiency': "Efficacité Passes",
+    'duel_success': "Duels",
+    'attacking_contribution': "Contribution Offensive",
+    'defensive_contribution': "Contribution Défensive",
+    'ball_retention': "Conservation",
+}
+
+def build_score_components(df_match: pd.DataFrame) -> pd.DataFrame:
+    """Sous-scores 0-100 par joueur (index PlayerID_norm, colonnes = SCORE_COMPONENTS)."""
+    counters = raw_counters(df_match)
+    counters["matches"] = 1.0
+    counters["touches"] = to_num(df_match["Ballon touché"]).to_numpy(dtype=float) if "Ballon touché" in df_match.columns else 0.0
+    pids = df_match["PlayerID_norm"].astype(str) if "PlayerID_norm" in df_match.columns else pd.Series("", index=df_match.index)
+    sums = counters.groupby(pids.to_numpy()).sum()
+    comp = pd.DataFrame(index=sums.index)
+    comp.index.name = "PlayerID_norm"
+    comp["passing_efficiency"] = _ratio(sums["passes_comp"], sums["passes_tent"], 100)
+    comp["duel_success"] = _ratio(sums["duels_won"], sums["duels_tent"], 100)
+    comp["attacking_contribution"] = np.minimum(sum(sums[c] * pts for c, pts in ATTACK_POINTS.items()), 100)
+    comp["defensive_contribution"] = np.minimum(sum(sums[c] * pts for c, pts in DEFENSE_POINTS.items()), 100)
+    comp["ball_retention"] = np.minimum(_ratio(sums["touches"], sums["matches"]), 100)
+    return comp
+def weight_vector(weights: dict | None = None) -> np.ndarray:
+    """Vecteur de pondération dans l'ordre des composantes, normalisé à une somme de 1."""
+    weights = weights or PERFORMANCE_WEIGHTS
+    w = np.array([float(weights.get(name, 0.0)) for name in SCORE_COMPONENTS])
+    total = w.sum()
+    return w / total if total > 0 else w
+def weighted_scores(components: pd.DataFrame, weights: dict | None = None) -> pd.Series:
+    """Score global de tous les joueurs : un produit matrice-vecteur, plafonné à 100."""
+    scores = components[list(SCORE_COMPONENTS)].to_numpy(dtype=float) @ weight_vector(weights)
+    return pd.Series(np.minimum(scores, 100), index=components.index, name="Score")
+def score_ranking(components: pd.DataFrame, weights: dict | None = None) -> pd.DataFrame:
+    """Classement de l'effectif : sous-scores, score pondéré et rang (1 = meilleur)."""
+    table = components.rename(columns=SCORE_COMPONENTS)
+    table["Score"] = weighted_scores(components, weights)
+    table["Rang"] = table["Score"].rank(ascending=False, method="min").astype(int)
+    return table.sort_values(["Rang", "Score"])
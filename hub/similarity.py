@@ -0,0 +1,89 @@
+"""Recherche de profils similaires : vecteurs KPI par 90 minutes centrés-réduits.
+
+Chaque joueur est décrit par les neuf KPIs benchmarkés (table radar) et par des compteurs
+bruts par 90 minutes (passes par longueur, touches par zone...). La matrice centrée-réduite
+est construite une fois ; une requête top-k est un seul produit matrice-vecteur
+(cosinus sur les lignes normalisées, ou Euclidienne via |a|² + |b|² − 2·a·b).
+"""
+import numpy as np
+import pandas as pd
+from .core import to_num
+from .radar import RADARS
+
+# KPIs benchmarkés (clés de calculate_kpis / BENCHMARKS_PAR_POSTE) et leurs libellés radar
+BENCHMARK_KPIS = {metric: label for label, metric in RADARS["season"]}
+# Compteurs bruts ramenés à 90 minutes : libellé -> colonnes candidates de la feuille Match
+PER90_COUNTERS = {
+    "Passes courtes /90": ("Passe courte complète",),
+    "Passes moyennes /90": ("Passe moyenne complète",),
+    "Passes longues /90": ("Passe longue complète",),
+    "Passes clés /90": ("Passe clé",),
+    "Passes dernier tiers /90": ("Passe dernier tier",),
+    "Passes surface /90": ("Passe surface",),
+    "Touches /90": ("Ballon touché",),
+    "Touches haute /90": ("Ballon touché haute",),
+    "Touches médian /90": ("Ballon touché médian",),
+    "Touches basse /90": ("Ballon touché basse",),
+    "Touches surface /90": ("Ballon touché surface",),
+    "Réceptions /90": ("Reception du ballon",),
+    "Duels aériens gagnés /90": ("Duel aérien gagné",),
+    "Progression ballon (m) /90": ("Distance parcouru progression(m)",),
+}
+METRICS = ("cosine", "euclidean")
+# Minutes minimum pour qu'un profil par 90 minutes soit comparable
+DEFAULT_MIN_MINUTES = 90
+
+def build_profiles(df_match: pd.DataFrame, radar_tables: dict, min_minutes: float = DEFAULT_MIN_MINUTES) -> pd.DataFrame:
+    """Profils bruts par joueur (index PlayerID_norm) : KPIs benchmarkés + compteurs /90."""
+    sums = radar_tables["player"]["sums"]
+    profiles = radar_tables["player"]["raw"][list(BENCHMARK_KPIS)].rename(columns=BENCHMARK_KPIS)
+    if "PlayerID_norm" in df_match.columns:
+        pids = df_match["PlayerID_norm"].astype(str).to_numpy()
+        minutes = sums["minutes"].to_numpy(dtype=float)
+        for label, candidates in PER90_COUNTERS.items():
+            col = next((c for c in candidates if c in df_match.columns), None)
+            if col is None:
+                continue
+            total = to_num(df_match[col]).groupby(pids).sum().reindex(profiles.index).fillna(0).to_numpy(dtype=float)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                profiles[label] = np.where(minutes > 0, total / minutes * 90, 0.0)
+    return profiles[sums["minutes"].reindex(profiles.index).fillna(0) >= min_minutes]
+def build_similarity_model(profiles: pd.DataFrame) -> dict:
+    """Matrice centrée-réduite (z), lignes unitaires pour le cosinus et normes au carré pour l'Euclidienne."""
+    X = profiles.to_numpy(dtype=float)
+    mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+    std = X.std(axis=0) if len(X) else np.ones(X.shape[1])
+    std[std == 0] = 1.0
+    z = (X - mean) / std
+    norms = np.linalg.norm(z, axis=1)
+    unit = z / np.where(norms > 0, norms, 1.0)[:, None]
+    return {
+        "players": profiles.index.astype(str).tolist(),
+        "features": list(profiles.columns),
+        "z": z,
+        "unit": unit,
+        "sq_norms": norms ** 2,
+        "profiles": profiles,
+    }
+def nearest_players(model: dict, player_id, k: int = 5, metric: str = "cosine") -> pd.DataFrame:
+    """Top-k des profils les plus proches (joueur exclu) ; vide si le joueur n'a pas de profil."""
+    players = model["players"]
+    pid = str(player_id)
+    if pid not in players or len(players) < 2:
+        return pd.DataFrame(columns=["PlayerID_norm", "Similarité", "Distance"])
+    i = players.index(pid)
+    if metric == "euclidean":
+        dist = np.sqrt(np.clip(model["sq_norms"] + model["sq_norms"][i] - 2 * (model["z"] @ model["z"][i]), 0, None))
+        score = 1.0 / (1.0 + dist)
+    else:
+        score = model["unit"] @ model["unit"][i]
+        dist = np.sqrt(np.clip(2 - 2 * score, 0, None))
+    score[i] = -np.inf
+    k = min(k, len(players) - 1)
+    top = np.argpartition(-score, k - 1)[:k]
+    top = top[np.argsort(-score[top], kind="stable")]
+    return pd.DataFrame({
+        "PlayerID_norm": [players[j] for j in top],
+        "Similarité": score[top],
+        "Distance": dist[top],
+    })
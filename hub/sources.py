@@ -0,0 +1,141 @@
+"""Fédération de classeurs : chaque (source, saison) est une partition chargée et mise en cache seule.
+
+Le registre vient de ``sources.json`` à la racine du dépôt, ou du fichier désigné par la variable
+d'environnement ``HUB_SOURCES`` (optionnel) ; sans ce fichier, seul le classeur Google Sheets par
+défaut est enregistré. Une entrée désigne un ``file_id`` Google Sheets, un ``path`` local ou une
+``url`` xlsx, et peut déclarer le repère de ses coordonnées Tracking (``coords``, voir
+``hub.coords``). Exemple ::
+
+    [
+      {"source": "Équipe première", "season": "2025-2026", "file_id": "1giSd...", "coords": {"system": "opta", "flip": "half"}},
+      {"source": "Équipe première", "season": "2024-2025", "path": "Data/saison-2024.xlsx"},
+      {"source": "Réserve", "season": "2025-2026", "file_id": "..."}
+    ]
+
+Seules les partitions sélectionnées sont téléchargées et lues (élagage par saison). Les feuilles
+portent les colonnes ``Source`` et ``Saison`` ; à plusieurs saisons, les journées sont renumérotées
+à la suite (``Journée``) et la numérotation d'origine est gardée dans ``Journée saison``.
+
+Un même PlayerID dans deux sources désigne deux joueurs : dès que plusieurs sources sont fédérées,
+``PlayerID_norm`` est préfixé par la source (``Réserve:12``). Les sources qui partagent un registre
+de joueurs le déclarent par ``"shared_ids": true`` et gardent leurs identifiants tels quels.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .coords import validate_coords
+from .data import FILE_ID, MAX_DOWNLOAD_BYTES, download_gsheets_as_xlsx, download_workbook, file_md5, unpack_workbook, TRACKING_REQUIRED_COLS, prepare_tracking
+
+SOURCES_FILE = Path(os.environ.get("HUB_SOURCES") or Path(__file__).resolve().parent.parent / "sources.json")
+DEFAULT_SOURCES = [{"source": "Équipe première", "season": "2025-2026", "file_id": FILE_ID}]
+SHEETS = ("players", "match", "wellness", "tracking")
+
+def load_sources(path: Path = SOURCES_FILE) -> list[dict]:
+    """Partitions enregistrées, triées par saison puis source ; registre par défaut si le fichier est absent."""
+    path = Path(path)
+    if not path.exists():
+        return list(DEFAULT_SOURCES)
+    sources = json.loads(path.read_text(encoding="utf-8"))
+    for src in sources:
+        if not {"source", "season"}.issubset(src) or not ({"file_id", "path", "url"} & set(src)):
+            raise ValueError(f"Source invalide dans {path.name} : {src}")
+        if "coords" in src:
+            src["coords"] = validate_coords(src["coords"])
+        if not isinstance(src.get("shared_ids", False), bool):
+            raise ValueError(f"shared_ids doit être un booléen dans {path.name} : {src}")
+        if "path" in src and not Path(src["path"]).is_absolute():
+            src["path"] = str(path.parent / src["path"])
+    return sorted(sources, key=lambda s: (str(s["season"]), str(s["source"])))
+def partition_key(src: dict) -> str:
+    return f"{src['source']} · {src['season']}"
+def coords_key(src: dict) -> str:
+    """Déclaration de repère sérialisée (clé de cache) ; vide en détection automatique."""
+    return json.dumps(src["coords"], sort_keys=True) if "coords" in src else ""
+def partition_sig(sig: str, src: dict) -> str:
+    """Signature d'une partition : classeur + déclarations qui changent ses feuilles (repère, identifiants partagés)."""
+    return "|".join([sig] + [k for k in (coords_key(src), "shared_ids" if src.get("shared_ids") else "") if k])
+def latest_partitions(sources: list[dict]) -> list[str]:
+    """Partitions de la saison la plus récente (sélection par défaut)."""
+    last = max(str(s["season"]) for s in sources)
+    return [partition_key(s) for s in sources if str(s["season"]) == last]
+def fetch_partition(src: dict, max_bytes: int = MAX_DOWNLOAD_BYTES) -> tuple[Path, str, int]:
+    """(chemin xlsx, signature md5, taille) d'une partition : fichier local, URL ou export Google Sheets."""
+    if "path" in src:
+        path = Path(src["path"])
+        return path, file_md5(path), path.stat().st_size
+    if "url" in src:
+        return download_workbook(src["url"], max_bytes=max_bytes)
+    return download_gsheets_as_xlsx(src["file_id"], max_bytes=max_bytes)
+def load_partition(data: dict, src: dict) -> dict:
+    """Feuilles normalisées d'une partition (Tracking préparé), étiquetées Source / Saison."""
+    df_players, df_match, df_well, df_tracking = unpack_workbook(data)
+    coord_info = []
+    if not df_tracking.empty and all(c in df_tracking.columns for c in TRACKING_REQUIRED_COLS):
+        df_tracking, info = prepare_tracking(df_tracking, src.get("coords"))
+        coord_info.append({"partition": partition_key(src), **info})
+    frames = {}
+    for name, df in zip(SHEETS, (df_players, df_match, df_well, df_tracking)):
+        df = df.copy()
+        if not df.empty:
+            df["Source"] = src["source"]
+            df["Saison"] = str(src["season"])
+        frames[name] = df
+    frames["coords"] = coord_info
+    frames["source"] = src["source"]
+    frames["season"] = str(src["season"])
+    frames["shared_ids"] = bool(src.get("shared_ids", False))
+    frames["tracking_ready"] = not df_tracking.empty and all(c in df_tracking.columns for c in TRACKING_REQUIRED_COLS) and "Zone" in df_tracking.columns
+    return frames
+def federation_sig(sigs: list[str]) -> str:
+    """Signature d'un ensemble de partitions (clé des caches calculés sur les feuilles fédérées)."""
+    return sigs[0] if len(sigs) == 1 else hashlib.md5("|".join(sigs).encode()).hexdigest()
+def _renumber_journees(frames: list[pd.DataFrame], offsets: list[float]) -> list[pd.DataFrame]:
+    out = []
+    for df, offset in zip(frames, offsets):
+        if not df.empty and "Journée" in df.columns:
+            df = df.copy()
+            df["Journée saison"] = df["Journée"]
+            df["Journée"] = pd.to_numeric(df["Journée"], errors="coerce") + offset
+        out.append(df)
+    return out
+def _namespace_ids(df: pd.DataFrame, part: dict) -> pd.DataFrame:
+    if part["shared_ids"] or df.empty or "PlayerID_norm" not in df.columns:
+        return df
+    df = df.copy()
+    df["PlayerID_norm"] = part["source"] + ":" + df["PlayerID_norm"].astype(str)
+    return df
+def federate(partitions: list[dict]) -> dict:
+    """Concatène les partitions (ordre du registre). Une seule partition est renvoyée telle quelle."""
+    if len(partitions) == 1:
+        return partitions[0]
+    # Décalage des journées : chaque saison commence après la dernière journée de la précédente ;
+    # les sources d'une même saison gardent la même numérotation (jointures par journée entre sources)
+    last_journee = {}
+    for part in partitions:
+        j = pd.to_numeric(part["match"].get("Journée", pd.Series(dtype=float)), errors="coerce")
+        season_max = float(np.nanmax(j)) if j.notna().any() else 0.0
+        last_journee[part["season"]] = max(last_journee.get(part["season"], 0.0), season_max)
+    season_offsets, offset = {}, 0.0
+    for season in sorted(last_journee):
+        season_offsets[season] = offset
+        offset += last_journee[season]
+    offsets = [season_offsets[part["season"]] for part in partitions]
+    out = {}
+    for name in SHEETS:
+        frames = [part[name] for part in partitions]
+        if len({part["source"] for part in partitions}) > 1:
+            frames = [_namespace_ids(df, part) for df, part in zip(frames, partitions)]
+        if name in ("match", "tracking"):
+            frames = _renumber_journees(frames, offsets)
+        frames = [df for df in frames if not df.empty]
+        out[name] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not out["players"].empty and "PlayerID_norm" in out["players"].columns:
+        # Fiche joueur : une par identifiant, donc une par source (identifiants préfixés) sauf registre
+        # partagé ; la saison la plus récente l'emporte
+        out["players"] = out["players"].drop_duplicates("PlayerID_norm", keep="last").reset_index(drop=True)
+    out["coords"] = [info for part in partitions for info in part["coords"]]
+    out["tracking_ready"] = all(part["tracking_ready"] for part in partitions if not part["tracking"].empty) and not out["tracking"].empty
+    return out
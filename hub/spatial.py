@@ -0,0 +1,94 @@
+"""Index spatial en grille sur les événements Tracking (départ X/Y et arrivée X2/Y2).
+
+Les points sont triés par case (tableau CSR : ``order`` + ``offsets``). Une requête rectangle
+ne lit que les cases qu'elle recouvre — une tranche contiguë par ligne de la grille — puis
+filtre exactement les candidats. Le lasso passe par la boîte englobante puis un test
+point-dans-polygone vectorisé.
+"""
+import numpy as np
+import pandas as pd
+from matplotlib.path import Path as MplPath
+
+# Régions prédéfinies dans le repère 120×80 (x0, y0, x1, y1)
+REGIONS = {
+    "Surface adverse": (102, 18, 120, 62),
+    "Surface défensive": (0, 18, 18, 62),
+    "Dernier tiers": (80, 0, 120, 80),
+    "Tiers médian": (40, 0, 80, 80),
+    "Premier tiers": (0, 0, 40, 80),
+}
+ANCHORS = ("start", "end")
+
+class _GridIndex:
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell: float, length: float, width: float):
+        self.x = x
+        self.y = y
+        self.cell = cell
+        self.nx = max(1, int(np.ceil(length / cell)))
+        self.ny = max(1, int(np.ceil(width / cell)))
+        valid = np.isfinite(x) & np.isfinite(y)
+        cx = np.clip(np.floor(np.where(valid, x, 0) / cell).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip(np.floor(np.where(valid, y, 0) / cell).astype(np.int64), 0, self.ny - 1)
+        cell_id = cy * self.nx + cx
+        rows = np.flatnonzero(valid)
+        self.order = rows[np.argsort(cell_id[rows], kind="stable")]
+        counts = np.bincount(cell_id[rows], minlength=self.nx * self.ny)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+    def _cell_range(self, lo: float, hi: float, n: int) -> tuple[int, int]:
+        return (int(np.clip(np.floor(lo / self.cell), 0, n - 1)),
+                int(np.clip(np.floor(hi / self.cell), 0, n - 1)))
+    def rect(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        ix0, ix1 = self._cell_range(x0, x1, self.nx)
+        iy0, iy1 = self._cell_range(y0, y1, self.ny)
+        slices = [self.order[self.offsets[iy * self.nx + ix0]:self.offsets[iy * self.nx + ix1 + 1]]
+                  for iy in range(iy0, iy1 + 1)]
+        cand = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+        xs, ys = self.x[cand], self.y[cand]
+        keep = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        return np.sort(cand[keep])
+    def polygon(self, vertices) -> np.ndarray:
+        poly = np.asarray(vertices, dtype=float)
+        if len(poly) < 3:
+            return np.empty(0, dtype=np.int64)
+        cand = self.rect(poly[:, 0].min(), poly[:, 1].min(), poly[:, 0].max(), poly[:, 1].max())
+        inside = MplPath(poly).contains_points(np.column_stack([self.x[cand], self.y[cand]]))
+        return cand[inside]
+
+class EventSpatialIndex:
+    """Index des événements d'un DataFrame Tracking préparé (repère 120×80).
+
+    Les requêtes renvoient des positions de lignes (``iloc``) dans le DataFrame indexé.
+    """
+    def __init__(self, df_tracking: pd.DataFrame, cell: float = 5.0):
+        x = pd.to_numeric(df_tracking['X'], errors='coerce').to_numpy(dtype=float)
+        y = pd.to_numeric(df_tracking['Y'], errors='coerce').to_numpy(dtype=float)
+        has_end = {'X2', 'Y2'}.issubset(df_tracking.columns)
+        x2 = pd.to_numeric(df_tracking['X2'], errors='coerce').to_numpy(dtype=float) if has_end else np.full(len(x), np.nan)
+        y2 = pd.to_numeric(df_tracking['Y2'], errors='coerce').to_numpy(dtype=float) if has_end else np.full(len(x), np.nan)
+        all_x, all_y = np.concatenate([x, x2]), np.concatenate([y, y2])
+        length = max(120.0, float(np.nanmax(all_x))) if np.isfinite(all_x).any() else 120.0
+        width = max(80.0, float(np.nanmax(all_y))) if np.isfinite(all_y).any() else 80.0
+        self.size = len(df_tracking)
+        self._grids = {
+            "start": _GridIndex(x, y, cell, length, width),
+            "end": _GridIndex(x2, y2, cell, length, width),
+        }
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float, on: str = "start") -> np.ndarray:
+        """Événements dont le point de départ (``on='start'``) ou d'arrivée (``'end'``) est dans le rectangle."""
+        return self._grids[on].rect(x0, y0, x1, y1)
+    def query_polygon(self, vertices, on: str = "start") -> np.ndarray:
+        """Événements dans un lasso : liste de sommets [(x, y), ...]."""
+        return self._grids[on].polygon(vertices)
+    def query_region(self, name: str, on: str = "start") -> np.ndarray:
+        return self.query_rect(*REGIONS[name], on=on)
+    def query(self, start=None, end=None) -> np.ndarray:
+        """Combine un filtre départ et/ou arrivée (rectangle (x0, y0, x1, y1) ou liste de sommets)."""
+        result = None
+        for on, shape in (("start", start), ("end", end)):
+            if shape is None:
+                continue
+            rows = self.query_rect(*shape, on=on) if len(shape) == 4 and np.ndim(shape) == 1 else self.query_polygon(shape, on=on)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return np.arange(self.size) if result is None else result
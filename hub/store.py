@@ -0,0 +1,154 @@
+"""Stockage SQLite optionnel des feuilles normalisées : index de lecture par joueur et période.
+
+Le store s'ajoute aux feuilles en mémoire, il ne les remplace pas : seuls les accesseurs par
+joueur le lisent, les modèles et vues d'effectif restent calculés sur les DataFrames.
+
+L'ingestion écrit les quatre tables (``players``, ``match``, ``wellness``, ``tracking``) dans un
+fichier temporaire puis le substitue atomiquement au store : les lecteurs déjà connectés gardent
+l'ancienne version, aucun n'observe une écriture partielle. Les tables sont indexées sur
+PlayerID_norm, DATE, Journée et Event ; ``HubStore`` expose les requêtes par joueur et période
+utilisées par les onglets. Chaque ligne garde sa position d'origine (``_row``), rendue comme index.
+"""
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+import pandas as pd
+from .timeline import journee_dates, date_by_journee
+
+STORE_PATH = Path(__file__).resolve().parent.parent / "Data" / "hub-store.sqlite"
+TABLES = ("players", "match", "wellness", "tracking")
+INDEXED_COLUMNS = ("PlayerID_norm", "DATE", "Journée", "Event")
+# Colonne de date utilisée pour les fenêtres (Tracking : date du match de la journée)
+DATE_COLUMN = {"match": "DATE", "wellness": "DATE", "tracking": "_date"}
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+def _sql_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie écrivable par sqlite3 : dates en texte ISO triable, objets mixtes en texte."""
+    out = df.copy()
+    out.insert(0, "_row", range(len(out)))
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime(_TS_FORMAT)
+        elif pd.api.types.is_object_dtype(out[col]):
+            out[col] = out[col].map(lambda v: v if v is None or isinstance(v, (int, float, str)) else str(v))
+    return out
+def ingest(frames: dict, sig: str, path: Path = STORE_PATH) -> bool:
+    """Écrit les feuilles dans le store si sa signature diffère ; retourne True si une ingestion a eu lieu."""
+    path = Path(path)
+    if stored_sig(path) == sig:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frames = dict(frames)
+    tracking = frames.get("tracking", pd.DataFrame())
+    if not tracking.empty:
+        tracking = tracking.copy()
+        dates = date_by_journee(tracking, journee_dates(frames.get("match", pd.DataFrame())))
+        tracking["_date"] = pd.to_datetime(dates, errors="coerce") if dates is not None else pd.NaT
+        frames["tracking"] = tracking
+    fd, tmp = tempfile.mkstemp(suffix=".sqlite", dir=path.parent)
+    os.close(fd)
+    try:
+        with sqlite3.connect(tmp) as con:
+            for table in TABLES:
+                df = frames.get(table, pd.DataFrame())
+                if df.empty:
+                    continue
+                _sql_frame(df).to_sql(table, con, index=False)
+                cols = set(df.columns) | ({"_date"} if table == "tracking" else set())
+                for col in INDEXED_COLUMNS + ("_date",):
+                    if col in cols:
+                        con.execute(f"CREATE INDEX {_quote(f'ix_{table}_{col}')} ON {table} ({_quote(col)})")
+                if "PlayerID_norm" in cols and DATE_COLUMN.get(table) in cols:
+                    # Requête principale des onglets : un joueur sur une période
+                    date_col = DATE_COLUMN[table]
+                    con.execute(f"CREATE INDEX {_quote(f'ix_{table}_player_date')} ON {table} (PlayerID_norm, {_quote(date_col)})")
+            con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            con.execute("INSERT INTO meta VALUES ('sig', ?)", (sig,))
+        # mkstemp crée le fichier en 0600 : lisible par les autres workers
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
+def stored_sig(path: Path = STORE_PATH) -> str | None:
+    """Signature du classeur actuellement dans le store (None si absent ou illisible)."""
+    if not Path(path).exists():
+        return None
+    try:
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as con:
+            row = con.execute("SELECT value FROM meta WHERE key = 'sig'").fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+class HubStore:
+    """Couche d'accès en lecture : requêtes indexées par joueur, période, journées et événements."""
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self._con = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self.tables = {r[0] for r in self._con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self._columns = {t: [r[1] for r in self._con.execute(f"PRAGMA table_info({t})")] for t in self.tables}
+        # Une table sans aucune date n'est pas fenêtrée (comme PlayerTimeline)
+        self._dated = {
+            t: DATE_COLUMN.get(t) in self._columns[t]
+            and self._con.execute(f"SELECT 1 FROM {t} WHERE {_quote(DATE_COLUMN[t])} IS NOT NULL LIMIT 1").fetchone() is not None
+            for t in self.tables
+        }
+    @property
+    def sig(self) -> str | None:
+        row = self._con.execute("SELECT value FROM meta WHERE key = 'sig'").fetchone()
+        return row[0] if row else None
+    def close(self):
+        self._con.close()
+    def _frame(self, table: str, where: list, params: list, order: str = "_row") -> pd.DataFrame:
+        cols = [c for c in self._columns[table] if c not in ("_row", "_date")]
+        sql = f"SELECT _row, {', '.join(_quote(c) for c in cols)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        df = pd.read_sql_query(f"{sql} ORDER BY {order}", self._con, params=params, index_col="_row")
+        df.index.name = None
+        if "DATE" in df.columns:
+            df["DATE"] = pd.to_datetime(df["DATE"], errors="coerce")
+        return df
+    def player_rows(self, table: str, player_id, start=None, end=None, journees=None, events=None) -> pd.DataFrame:
+        """Lignes d'un joueur (toutes si ``player_id`` est None), triées par date puis ordre d'origine.
+
+        ``start``/``end`` bornent la date (jour de fin inclus) ; ``journees`` et ``events`` filtrent par valeurs.
+        """
+        if table not in self.tables:
+            return pd.DataFrame()
+        columns = self._columns[table]
+        where, params = [], []
+        if player_id is not None:
+            where.append("PlayerID_norm = ?")
+            params.append(str(player_id))
+        date_col = DATE_COLUMN.get(table)
+        dated = self._dated[table]
+        if dated and start is not None:
+            where.append(f"{_quote(date_col)} >= ?")
+            params.append(pd.Timestamp(start).strftime(_TS_FORMAT))
+        if dated and end is not None:
+            where.append(f"{_quote(date_col)} < ?")
+            params.append((pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).strftime(_TS_FORMAT))
+        if journees is not None and "Journée" in columns:
+            values = pd.to_numeric(pd.Series(list(journees)), errors="coerce").dropna().unique().tolist()
+            where.append(f'"Journée" IN ({", ".join("?" * len(values))})' if values else "0")
+            params.extend(values)
+        if events is not None and "Event" in columns:
+            events = list(events)
+            where.append(f'Event IN ({", ".join("?" * len(events))})' if events else "0")
+            params.extend(events)
+        order = f"{_quote(date_col)} IS NULL, {_quote(date_col)}, _row" if dated and player_id is not None else "_row"
+        return self._frame(table, where, params, order)
+    def table(self, table: str) -> pd.DataFrame:
+        """Table entière dans l'ordre d'origine."""
+        return self._frame(table, [], []) if table in self.tables else pd.DataFrame()
+    def query_plan(self, table: str) -> list[str]:
+        """Plan SQLite d'une requête joueur × période (pour vérifier l'usage des index)."""
+        date_col = DATE_COLUMN.get(table, "DATE")
+        sql = f"SELECT * FROM {table} WHERE PlayerID_norm = ? AND {_quote(date_col)} >= ? AND {_quote(date_col)} < ?"
+        return [r[-1] for r in self._con.execute(f"EXPLAIN QUERY PLAN {sql}", ("", "", ""))]
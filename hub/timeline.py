@@ -0,0 +1,107 @@
+"""Index temporel par joueur : lignes triées par (joueur, date) et tranches par ``searchsorted``.
+
+Chaque feuille (Match, Wellness, Tracking) est indexée une fois par classeur. Une fenêtre de
+dates pour un joueur est alors deux recherches dichotomiques dans son bloc trié, au lieu d'un
+masque booléen sur toute la feuille. Les lignes sans date sont rangées en fin de bloc : elles
+restent visibles sans fenêtre et sont exclues dès qu'une borne de fin est posée.
+"""
+import numpy as np
+import pandas as pd
+
+_NO_DATE = np.iinfo(np.int64).max
+ONE_DAY = np.int64(86_400 * 10**9)
+
+def _to_ns(value) -> np.int64:
+    return np.int64(pd.Timestamp(value).value)
+
+class PlayerTimeline:
+    """Positions (``iloc``) d'une feuille, groupées par joueur puis triées par date."""
+    def __init__(self, player_ids, dates=None):
+        pids = pd.Series(player_ids).astype(str).to_numpy()
+        n = len(pids)
+        if dates is None:
+            dates = pd.Series(pd.NaT, index=range(n))
+        dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True), errors="coerce")
+        valid = dates.notna().to_numpy()
+        ns = np.where(valid, dates.to_numpy(dtype="datetime64[ns]").astype(np.int64), _NO_DATE)
+        codes, players = pd.factorize(pids, sort=True)
+        # Tri stable (joueur, date) : l'ordre de la feuille est conservé à date égale ou sans date
+        self.order = np.lexsort((np.arange(n), ns, codes))
+        self.dates = ns[self.order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(players)))])
+        self.players = {str(p): i for i, p in enumerate(players)}
+        self.dated = bool(valid.any())
+        self._bounds = (pd.Timestamp(ns[valid].min()), pd.Timestamp(ns[valid].max())) if self.dated else None
+    def bounds(self) -> tuple | None:
+        """(première date, dernière date) de la feuille, ou None si elle n'a pas de dates."""
+        return self._bounds
+    def _span(self, lo: int, hi: int, start, end) -> tuple[int, int]:
+        if not self.dated:
+            return lo, hi
+        block = self.dates[lo:hi]
+        a = lo + int(np.searchsorted(block, _to_ns(start), side="left")) if start is not None else lo
+        b = lo + int(np.searchsorted(block, _to_ns(end) + ONE_DAY, side="left")) if end is not None else hi
+        return a, max(a, b)
+    def rows(self, player_id, start=None, end=None) -> np.ndarray:
+        """Positions d'un joueur dans l'ordre chronologique, bornes incluses (jour de fin compris)."""
+        i = self.players.get(str(player_id))
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        a, b = self._span(self.offsets[i], self.offsets[i + 1], start, end)
+        return self.order[a:b]
+    def rows_all(self, start=None, end=None) -> np.ndarray:
+        """Positions de tous les joueurs dans la fenêtre, dans l'ordre de la feuille."""
+        if not self.dated or (start is None and end is None):
+            return np.arange(len(self.order))
+        spans = [self._span(self.offsets[i], self.offsets[i + 1], start, end) for i in range(len(self.players))]
+        return np.sort(np.concatenate([self.order[a:b] for a, b in spans])) if spans else np.empty(0, dtype=np.int64)
+    def window_means(self, player_id, values: np.ndarray, ends, days: int) -> np.ndarray:
+        """Moyennes (m, k) de ``values`` (n, k) sur les ``days`` jours précédant chaque date de ``ends`` (incluse).
+
+        Sommes préfixes sur le bloc du joueur : chaque fenêtre coûte deux ``searchsorted``.
+        """
+        values = np.asarray(values, dtype=float).reshape(len(self.order), -1)
+        ends = pd.to_datetime(pd.Series(ends), errors="coerce")
+        out = np.full((len(ends), values.shape[1]), np.nan)
+        i = self.players.get(str(player_id))
+        if i is None or not self.dated:
+            return out
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        block_dates = self.dates[lo:hi]
+        block = values[self.order[lo:hi]]
+        finite = np.isfinite(block)
+        csum = np.vstack([np.zeros(block.shape[1]), np.cumsum(np.where(finite, block, 0.0), axis=0)])
+        ccount = np.vstack([np.zeros(block.shape[1]), np.cumsum(finite, axis=0)])
+        ok = ends.notna().to_numpy()
+        end_ns = ends[ok].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        a = np.searchsorted(block_dates, end_ns - days * ONE_DAY, side="left")
+        b = np.searchsorted(block_dates, end_ns + ONE_DAY, side="left")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[ok] = (csum[b] - csum[a]) / (ccount[b] - ccount[a])
+        return out
+
+def journee_dates(df_match: pd.DataFrame) -> pd.Series | None:
+    """Date de chaque (joueur, journée) d'après la feuille Match, pour dater les événements Tracking."""
+    if not {"PlayerID_norm", "Journée", "DATE"}.issubset(df_match.columns):
+        return None
+    dates = pd.to_datetime(df_match["DATE"], errors="coerce")
+    keys = pd.MultiIndex.from_arrays([df_match["PlayerID_norm"].astype(str), pd.to_numeric(df_match["Journée"], errors="coerce")])
+    return pd.Series(dates.to_numpy(), index=keys).groupby(level=[0, 1]).min()
+def date_by_journee(df: pd.DataFrame, dates: pd.Series | None) -> pd.Series | None:
+    """Date de chaque ligne via (PlayerID_norm, Journée) ; None si impossible."""
+    if dates is None or not {"PlayerID_norm", "Journée"}.issubset(df.columns):
+        return None
+    keys = pd.MultiIndex.from_arrays([df["PlayerID_norm"].astype(str), pd.to_numeric(df["Journée"], errors="coerce")])
+    return pd.Series(dates.reindex(keys).to_numpy(), index=df.index)
+def build_timelines(df_match: pd.DataFrame, df_well: pd.DataFrame, df_tracking: pd.DataFrame) -> dict:
+    """Index temporels des trois feuilles (Tracking daté via la journée de la feuille Match)."""
+    def timeline(df, dates):
+        pids = df["PlayerID_norm"] if "PlayerID_norm" in df.columns else pd.Series("", index=df.index)
+        return PlayerTimeline(pids, dates)
+    match_dates = df_match["DATE"] if "DATE" in df_match.columns else None
+    well_dates = df_well["DATE"] if "DATE" in df_well.columns else None
+    return {
+        "match": timeline(df_match, match_dates),
+        "wellness": timeline(df_well, well_dates),
+        "tracking": timeline(df_tracking, date_by_journee(df_tracking, journee_dates(df_match))),
+    }
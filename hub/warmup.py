@@ -0,0 +1,118 @@
+"""Préchauffage en arrière-plan des artefacts par joueur, lancé une fois par classeur.
+
+Après le chargement, un pool de threads calcule pour chaque joueur de l'effectif les artefacts
+de la période complète (KPIs saison, KPIs cumulés match après match, Wellness triée + moyennes
+mobiles 7 jours, positions Tracking + options des filtres) : la première sélection d'un joueur
+ne paie plus ces calculs. Le script Streamlit n'attend jamais le pool : ``get`` renvoie
+l'artefact s'il est prêt, sinon le calcule tout de suite (et le garde pour les autres sessions).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from .core import calculate_kpis, kpi_history, to_num
+
+WARM_WORKERS = 2
+WELLNESS_METRICS = ["Energie générale", "Fraicheur musculaire", "Humeur", "Sommeil", "Intensité douleur"]
+
+def player_builders(frames: dict, timelines: dict) -> dict:
+    """Fonctions ``pid -> artefact`` de la période complète, calculées sur les feuilles fédérées."""
+    df_players, df_match, df_well, df_tracking = (frames[name] for name in ("players", "match", "wellness", "tracking"))
+    def matches(pid):
+        return df_match.iloc[timelines["match"].rows(pid)]
+    def kpis(pid):
+        dm = matches(pid)
+        return calculate_kpis(dm, to_num(dm.get("Minutes Jouées", 0)).sum(), len(dm), pid, df_players) if not dm.empty else {}
+    def history(pid):
+        return kpi_history(matches(pid), pid, df_players)
+    def wellness(pid):
+        # Feuille triée par date + moyenne mobile 7 jours de chaque indicateur (courbes de tendance)
+        rows = timelines["wellness"].rows(pid)
+        dw = df_well.iloc[rows]
+        metrics = [c for c in WELLNESS_METRICS if c in dw.columns]
+        return {"rows": rows, "ma7": dw[metrics].rolling(window=7, min_periods=1).mean()}
+    def tracking(pid):
+        # Positions du joueur et options des filtres Visualisation
+        rows = timelines["tracking"].rows(pid)
+        dt = df_tracking.iloc[rows]
+        options = {col: sorted(dt[col].dropna().unique()) if col in dt.columns else [] for col in ("Event", "Zone", "Journée")}
+        return {"rows": rows, "options": options}
+    builders = {}
+    if not df_match.empty and "PlayerID_norm" in df_match.columns:
+        builders.update(kpis=kpis, kpi_history=history)
+    if not df_well.empty and "PlayerID_norm" in df_well.columns:
+        builders["wellness"] = wellness
+    if not df_tracking.empty and {"PlayerID_norm", "Event", "Zone"}.issubset(df_tracking.columns):
+        builders["tracking"] = tracking
+    return builders
+
+class CacheWarmer:
+    """Artefacts ``(joueur, nom)`` remplis par un pool de threads, partagés entre sessions."""
+    def __init__(self, builders: dict, player_ids, workers: int = WARM_WORKERS):
+        self.builders = builders
+        self.player_ids = list(dict.fromkeys(str(pid) for pid in player_ids))
+        self.workers = workers
+        self._values = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._started = self._finished = None
+        self._pending = 0
+    def start(self) -> "CacheWarmer":
+        """Soumet un job par joueur et rend la main aussitôt (idempotent)."""
+        with self._lock:
+            if self._pool is not None:
+                return self
+            self._started = time.perf_counter()
+            self._pending = len(self.player_ids)
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hub-warmup")
+        for pid in self.player_ids:
+            self._pool.submit(self._warm, pid)
+        self._pool.shutdown(wait=False)
+        if not self.player_ids:
+            self._finished = self._started
+        return self
+    def _build(self, pid: str, name: str):
+        try:
+            value = self.builders[name](pid)
+        except Exception as e:  # un joueur aux données invalides ne doit pas arrêter le préchauffage
+            with self._lock:
+                self._errors[(pid, name)] = repr(e)
+            return None
+        with self._lock:
+            return self._values.setdefault((pid, name), value)
+    def _warm(self, pid: str) -> None:
+        for name in self.builders:
+            if (pid, name) not in self._values:
+                self._build(pid, name)
+        with self._lock:
+            self._pending -= 1
+            if self._pending == 0:
+                self._finished = time.perf_counter()
+    def get(self, pid, name: str):
+        """Artefact préchauffé, ou calculé immédiatement s'il n'est pas encore prêt ; None sans constructeur."""
+        pid = str(pid)
+        value = self._values.get((pid, name))
+        if value is None and name in self.builders:
+            value = self._build(pid, name)
+        return value
+    def progress(self) -> dict:
+        """Joueurs traités, couverture des artefacts (0-1), erreurs et durée écoulée."""
+        with self._lock:
+            expected = len(self.player_ids) * len(self.builders)
+            done_players = len(self.player_ids) - self._pending if self._started is not None else 0
+            ready = len(self._values)
+            end = self._finished if self._finished is not None else time.perf_counter()
+            return {
+                "players_done": done_players, "players_total": len(self.player_ids),
+                "artefacts_ready": ready, "artefacts_expected": expected,
+                "coverage": ready / expected if expected else 1.0,
+                "errors": len(self._errors), "running": self._started is not None and self._finished is None,
+                "elapsed_s": end - self._started if self._started is not None else 0.0,
+            }
+    def coverage_by_artefact(self) -> pd.Series:
+        """Part des joueurs dont chaque artefact est prêt."""
+        with self._lock:
+            keys = list(self._values)
+        counts = pd.Series([name for _, name in keys], dtype=object).value_counts()
+        return pd.Series({name: counts.get(name, 0) / max(len(self.player_ids), 1) for name in self.builders}, dtype=float)
@@ -0,0 +1,73 @@
+"""Modèle xG par localisation (distance et angle de tir), régression logistique NumPy.
+
+Entraîné sur les tirs de l'onglet Tracking (repère 120×80, but adverse en X = 120) quand
+une colonne de résultat permet d'identifier les buts ; sinon des coefficients par défaut
+sont utilisés. Le scoring de tous les tirs se fait en un seul produit matriciel.
+"""
+import numpy as np
+import pandas as pd
+from .xt import shot_goals
+
+GOAL_X = 120.0
+GOAL_Y = 40.0
+GOAL_HALF_WIDTH = 4.0
+# Coefficients (intercept, distance, angle) sur les variables brutes, utilisés sans résultats de tir
+DEFAULT_COEFS = np.array([-1.2, -0.1, 1.6])
+# Minimum de tirs et de buts pour ajuster le modèle sur le classeur
+MIN_SHOTS = 20
+MIN_GOALS = 3
+
+def shot_features(x, y) -> np.ndarray:
+    """Matrice (n, 2) : distance au centre du but et angle d'ouverture (radians) entre les poteaux."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    dx = np.clip(GOAL_X - x, 0, None)
+    dy = y - GOAL_Y
+    distance = np.hypot(dx, dy)
+    angle = np.abs(np.arctan2(GOAL_Y + GOAL_HALF_WIDTH - y, dx) - np.arctan2(GOAL_Y - GOAL_HALF_WIDTH - y, dx))
+    return np.column_stack([distance, angle])
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+def fit_logistic(features: np.ndarray, labels: np.ndarray, l2: float = 1e-2, max_iter: int = 50, tol: float = 1e-8) -> np.ndarray:
+    """Newton-Raphson (IRLS) avec légère pénalité L2 ; retourne (intercept, coefs...) sur les variables brutes."""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1.0
+    X = np.column_stack([np.ones(len(features)), (features - mean) / std])
+    y = labels.astype(float)
+    beta = np.zeros(X.shape[1])
+    penalty = l2 * np.eye(X.shape[1])
+    penalty[0, 0] = 0.0
+    for _ in range(max_iter):
+        p = _sigmoid(X @ beta)
+        grad = X.T @ (y - p) - penalty @ beta
+        hess = (X * (p * (1 - p))[:, None]).T @ X + penalty
+        step = np.linalg.solve(hess, grad)
+        beta += step
+        if np.max(np.abs(step)) < tol:
+            break
+    # Retour aux variables non standardisées
+    coefs = beta[1:] / std
+    return np.concatenate([[beta[0] - np.sum(coefs * mean)], coefs])
+def predict_xg(coefs: np.ndarray, x, y) -> np.ndarray:
+    features = shot_features(x, y)
+    return _sigmoid(coefs[0] + features @ coefs[1:])
+
+def fit_xg(df_tracking: pd.DataFrame) -> dict:
+    """Ajuste le modèle sur les tirs du classeur ; ``fitted`` vaut False si les coefficients par défaut sont gardés."""
+    shots = df_tracking[(df_tracking['Event'] == 'Shot') & df_tracking[['X', 'Y']].notna().all(axis=1)]
+    goals = shot_goals(shots)
+    n_goals = int(goals.sum()) if goals is not None else 0
+    fitted = goals is not None and len(shots) >= MIN_SHOTS and MIN_GOALS <= n_goals < len(shots)
+    coefs = fit_logistic(shot_features(shots['X'], shots['Y']), goals) if fitted else DEFAULT_COEFS.copy()
+    return {"coefs": coefs, "fitted": fitted, "shots": len(shots), "goals": n_goals}
+def score_shots(df_tracking: pd.DataFrame, coefs: np.ndarray, by=("PlayerID_norm", "Journée")) -> pd.DataFrame:
+    """xG modèle de tous les tirs, agrégé par joueur × journée : xG, tirs et buts (si connus)."""
+    by = [c for c in by if c in df_tracking.columns]
+    shots = df_tracking[(df_tracking['Event'] == 'Shot') & df_tracking[['X', 'Y']].notna().all(axis=1)]
+    frame = pd.DataFrame({c: shots[c] for c in by})
+    frame['xg_model'] = predict_xg(coefs, shots['X'], shots['Y'])
+    goals = shot_goals(shots)
+    frame['goals'] = goals.astype(int) if goals is not None else 0
+    return frame.groupby(by).agg(xg_model=('xg_model', 'sum'), shots=('xg_model', 'size'), goals=('goals', 'sum')).reset_index()
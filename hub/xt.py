@@ -0,0 +1,119 @@
+"""Expected Threat (xT) appris sur les passes et tirs de l'onglet Tracking.
+
+Sur une grille ``bins_x × bins_y`` du terrain 120×80 (attaque vers X = 120) :
+    xT = P(tir) · P(but | tir) + P(passe) · T · xT
+résolu par itération de valeur vectorisée (produit matrice-vecteur), puis chaque passe
+est valorisée par xT(arrivée) − xT(départ).
+"""
+import numpy as np
+import pandas as pd
+
+PITCH_LENGTH = 120
+PITCH_WIDTH = 80
+DEFAULT_BINS = (16, 12)
+# Taux de conversion utilisé quand le classeur ne contient aucun résultat de tir
+DEFAULT_CONVERSION = 0.1
+# Colonnes possibles pour le résultat d'un tir et valeurs comptées comme but
+OUTCOME_COLS = ("Outcome", "Résultat", "Resultat", "Result")
+GOAL_VALUES = {"goal", "but", "1", "true", "oui", "yes"}
+# Résultats de passe comptés comme perte de balle (transition vers « hors grille »)
+FAILED_PASS_VALUES = {"incomplete", "incomplète", "incomplete pass", "out", "raté", "rate", "perdu", "failed", "0", "false", "non", "no"}
+
+def shot_goals(df: pd.DataFrame) -> np.ndarray | None:
+    """Booléen « but » par ligne si une colonne de résultat existe, sinon None."""
+    col = next((c for c in OUTCOME_COLS if c in df.columns), None)
+    if col is None:
+        return None
+    return df[col].fillna("").astype(str).str.strip().str.lower().isin(GOAL_VALUES).to_numpy()
+def pass_failed(df: pd.DataFrame) -> np.ndarray:
+    """Booléen « passe ratée » par ligne (False si aucune colonne de résultat)."""
+    col = next((c for c in OUTCOME_COLS if c in df.columns), None)
+    if col is None:
+        return np.zeros(len(df), dtype=bool)
+    return df[col].fillna("").astype(str).str.strip().str.lower().isin(FAILED_PASS_VALUES).to_numpy()
+def cell_index(x, y, bins=DEFAULT_BINS) -> np.ndarray:
+    """Indice de case à plat (ligne = Y, colonne = X) ; -1 si coordonnée manquante."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    cx = np.clip(np.floor(np.where(valid, x, 0) / PITCH_LENGTH * bins[0]), 0, bins[0] - 1).astype(np.int64)
+    cy = np.clip(np.floor(np.where(valid, y, 0) / PITCH_WIDTH * bins[1]), 0, bins[1] - 1).astype(np.int64)
+    return np.where(valid, cy * bins[0] + cx, -1)
+
+def fit_xt(df_tracking: pd.DataFrame, bins=DEFAULT_BINS, max_iter: int = 200, tol: float = 1e-6) -> dict:
+    """Construit les matrices de tir / transition et résout la grille xT.
+
+    Retourne ``{"grid": (bins_y, bins_x), "shot_prob", "move_prob", "goal_prob", "iterations"}``.
+    """
+    n_cells = bins[0] * bins[1]
+    has_end = {'X2', 'Y2'}.issubset(df_tracking.columns)
+    is_pass = (df_tracking['Event'] == 'Pass') & (df_tracking[['X2', 'Y2']].notna().all(axis=1) if has_end else False)
+    passes = df_tracking[is_pass]
+    shots = df_tracking[df_tracking['Event'] == 'Shot']
+    start = cell_index(passes['X'], passes['Y'], bins)
+    end = cell_index(passes['X2'], passes['Y2'], bins) if has_end else np.full(len(passes), -1)
+    end[pass_failed(passes)] = -1
+    valid_start = start >= 0
+    start, end = start[valid_start], end[valid_start]
+    shot_cells = cell_index(shots['X'], shots['Y'], bins)
+    goals = shot_goals(shots)
+    shot_cells_valid = shot_cells >= 0
+    move_counts = np.bincount(start, minlength=n_cells).astype(float)
+    shot_counts = np.bincount(shot_cells[shot_cells_valid], minlength=n_cells).astype(float)
+    if goals is not None and goals[shot_cells_valid].any():
+        goal_counts = np.bincount(shot_cells[shot_cells_valid], weights=goals[shot_cells_valid].astype(float), minlength=n_cells)
+        # Lissage vers le taux global pour les cases avec peu de tirs
+        prior = goal_counts.sum() / max(shot_counts.sum(), 1)
+        goal_prob = (goal_counts + prior * 2) / (shot_counts + 2)
+    else:
+        goal_prob = np.full(n_cells, DEFAULT_CONVERSION)
+    total = move_counts + shot_counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shot_prob = np.where(total > 0, shot_counts / total, 0.0)
+        move_prob = np.where(total > 0, move_counts / total, 0.0)
+    # Matrice de transition T[départ, arrivée] ; les passes ratées (end = -1) sont des pertes
+    valid_end = end >= 0
+    transition = np.zeros((n_cells, n_cells))
+    np.add.at(transition, (start[valid_end], end[valid_end]), 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        transition = np.where(move_counts[:, None] > 0, transition / move_counts[:, None], 0.0)
+    shoot_value = shot_prob * goal_prob
+    move_weighted = move_prob[:, None] * transition
+    xt = np.zeros(n_cells)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        new_xt = shoot_value + move_weighted @ xt
+        converged = np.max(np.abs(new_xt - xt)) < tol
+        xt = new_xt
+        if converged:
+            break
+    return {
+        "grid": xt.reshape(bins[1], bins[0]),
+        "shot_prob": shot_prob.reshape(bins[1], bins[0]),
+        "move_prob": move_prob.reshape(bins[1], bins[0]),
+        "goal_prob": goal_prob.reshape(bins[1], bins[0]),
+        "iterations": iterations,
+        "bins": tuple(bins),
+    }
+
+def score_passes(df_tracking: pd.DataFrame, xt_grid: np.ndarray) -> pd.Series:
+    """xT ajouté (arrivée − départ) de chaque passe, en une seule passe vectorisée ; NaN hors passes."""
+    bins = (xt_grid.shape[1], xt_grid.shape[0])
+    flat = xt_grid.ravel()
+    if not {'X2', 'Y2'}.issubset(df_tracking.columns):
+        return pd.Series(np.nan, index=df_tracking.index)
+    is_pass = (df_tracking['Event'] == 'Pass').to_numpy()
+    start = cell_index(df_tracking['X'], df_tracking['Y'], bins)
+    end = cell_index(df_tracking['X2'], df_tracking['Y2'], bins)
+    ok = is_pass & (start >= 0) & (end >= 0)
+    values = np.full(len(df_tracking), np.nan)
+    values[ok] = flat[end[ok]] - flat[start[ok]]
+    return pd.Series(values, index=df_tracking.index)
+def player_xt_totals(df_tracking: pd.DataFrame, pass_xt: pd.Series, by=("PlayerID_norm",)) -> pd.DataFrame:
+    """Totaux xT par joueur (ou joueur × journée) : xT net, xT positif et nombre de passes valorisées."""
+    by = [c for c in by if c in df_tracking.columns]
+    frame = pd.DataFrame({c: df_tracking[c] for c in by})
+    frame['xt'] = pass_xt
+    frame = frame[frame['xt'].notna()]
+    frame['xt_pos'] = frame['xt'].clip(lower=0)
+    return frame.groupby(by).agg(xt=('xt', 'sum'), xt_pos=('xt_pos', 'sum'), passes=('xt', 'size'))
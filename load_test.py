@@ -0,0 +1,204 @@
+"""Test de charge : N sessions simultanées rejouent un scénario d'interactions sur l'app.
+
+Chaque session est un ``AppTest`` Streamlit (exécution headless du script, sans navigateur)
+piloté dans son propre thread. Le classeur est synthétique, servi par un serveur HTTP local
+déclaré comme source (``HUB_SOURCES``) : aucun accès à Google Drive.
+
+Scénario par session et par tour : changement de joueur, activation / désactivation du mode
+comparaison, filtres Visualisation (formulaire « Appliquer »). Le rapport donne la latence des
+reruns (p50 / p95 / p99, globale et par action) et le pic de mémoire du process.
+
+Exemples :
+    python load_test.py --sessions 8 --rounds 3
+    python load_test.py --sessions 16 --players 25 --events 50000 --json load.json
+"""
+import argparse
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+APP_PATH = Path(__file__).resolve().parent / "clever-hub.py"
+PLAYER_LABEL = "🏃 Sélection joueur"
+COMPARE_LABEL = "🔄 Mode comparaison"
+APPLY_LABEL = "✅ Appliquer"
+WELLNESS_METRICS = ["Energie générale", "Fraicheur musculaire", "Humeur", "Sommeil", "Intensité douleur"]
+
+def build_workbook(path: str, n_players: int = 12, n_journees: int = 20, n_events: int = 20000, seed: int = 0) -> None:
+    """Classeur synthétique aux colonnes du classeur réel (Joueur, Match, Wellness, Tracking)."""
+    rng = np.random.default_rng(seed)
+    postes = ["Attaquant central", "Milieu relayeur", "Milieu offensif", "Défenseur axial", "Latéral droit", "Milieu droit"]
+    ids = np.arange(1, n_players + 1)
+    players = pd.DataFrame({
+        "PlayerID": ids, "Nom": [f"Nom{i}" for i in ids], "Prénom": [f"Joueur{i}" for i in ids], "Club": "FC",
+        "Poste": "Joueur", "Poste Détail": [postes[i % len(postes)] for i in ids], "Taille": 180, "Poids": 75, "Pied": "Droit",
+    })
+    n = n_players * n_journees
+    journee = np.tile(np.arange(1, n_journees + 1), n_players)
+    match = pd.DataFrame({
+        "PlayerID": np.repeat(ids, n_journees), "Journée": journee,
+        "Adversaire": np.array(["Lens", "Lyon", "Nantes", "Rennes", "Brest"])[journee % 5],
+        "DATE": pd.Timestamp("2025-08-10") + pd.to_timedelta(7 * journee, unit="D"),
+        "Minute jouee": rng.integers(10, 91, n), "Buts": rng.integers(0, 2, n), "Tir": rng.integers(0, 5, n),
+        "Tir cadre": rng.integers(0, 3, n), "xG": rng.random(n).round(2), "Passe complete": rng.integers(5, 40, n),
+        "Passe tentées": rng.integers(40, 50, n), "Passe decisive": rng.integers(0, 2, n), "Passe progressive": rng.integers(0, 8, n),
+        "Ballon touché": rng.integers(10, 80, n), "Recuperation du ballon": rng.integers(0, 10, n),
+        "Interception": rng.integers(0, 5, n), "Duel tenté": rng.integers(1, 15, n), "Duel gagne": rng.integers(0, 8, n),
+    })
+    days = pd.date_range("2025-08-01", periods=7 * n_journees + 14)
+    wellness = pd.DataFrame({"PlayerID": np.repeat(ids, len(days)), "DATE": np.tile(days, n_players)})
+    for metric in WELLNESS_METRICS:
+        wellness[metric] = rng.integers(3, 11, len(wellness))
+    events = rng.choice(["Pass", "Shot", "Dribble", "Tackle", "Interception"], n_events, p=[.5, .1, .15, .15, .1])
+    x, y = rng.uniform(0, 100, n_events), rng.uniform(0, 100, n_events)
+    moves = np.isin(events, ["Pass", "Dribble"])
+    tracking = pd.DataFrame({
+        "PlayerID": rng.integers(1, n_players + 1, n_events), "Journée": rng.integers(1, n_journees + 1, n_events),
+        "Event": events, "X": x.round(1), "Y": y.round(1),
+        "X2": np.where(moves, np.clip(x + rng.normal(8, 10, n_events), 0, 100), np.nan).round(1),
+        "Y2": np.where(moves, np.clip(y + rng.normal(0, 10, n_events), 0, 100), np.nan).round(1),
+        "Outcome": np.where(events == "Shot", rng.choice(["Goal", "Saved", "Off T"], n_events, p=[.15, .45, .4]), ""),
+    })
+    with pd.ExcelWriter(path) as writer:
+        for name, df in (("Joueur", players), ("Match", match), ("Wellness", wellness), ("Tracking", tracking)):
+            df.to_excel(writer, sheet_name=name, index=False)
+def serve_file(path: str) -> tuple[http.server.ThreadingHTTPServer, str]:
+    """Serveur HTTP local (thread démon) qui sert ``path`` ; retourne (serveur, URL)."""
+    payload = Path(path).read_bytes()
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *args):
+            pass
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/workbook.xlsx"
+
+class MemoryMonitor:
+    """Échantillonne le RSS du process pendant le test et garde le pic."""
+    def __init__(self, interval: float = 0.05):
+        from hub.memory import rss_bytes
+        self._rss = rss_bytes
+        self.interval = interval
+        self.peak = self.start = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            self._stop.wait(self.interval)
+    def __enter__(self):
+        self._thread.start()
+        return self
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+def _timed(samples: list, action: str, at, timeout: float) -> None:
+    t0 = time.perf_counter()
+    at.run(timeout=timeout)
+    samples.append((action, time.perf_counter() - t0, len(at.exception)))
+def run_session(index: int, rounds: int, timeout: float, samples: list) -> None:
+    """Scénario d'une session : chargement, puis ``rounds`` tours joueur / comparaison / filtres."""
+    from streamlit.testing.v1 import AppTest
+    rng = np.random.default_rng(index)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    _timed(samples, "chargement", at, timeout)
+    for _ in range(rounds):
+        player = next((w for w in at.selectbox if w.label == PLAYER_LABEL), None)
+        if player is not None and len(player.options) > 1:
+            player.set_value(player.options[int(rng.integers(len(player.options)))])
+            _timed(samples, "joueur", at, timeout)
+        compare = next((w for w in at.checkbox if w.label == COMPARE_LABEL), None)
+        if compare is not None:
+            compare.set_value(not compare.value)
+            _timed(samples, "comparaison", at, timeout)
+        events = next((w for w in at.multiselect if w.label == "Événements" and w.form_id), None)
+        apply = next((w for w in at.button if w.label == APPLY_LABEL), None)
+        if events is not None and apply is not None and events.options:
+            k = int(rng.integers(1, len(events.options) + 1))
+            events.set_value(list(rng.choice(events.options, k, replace=False)))
+            apply.click()
+            _timed(samples, "filtres", at, timeout)
+
+def percentiles(values) -> dict:
+    values = np.asarray(values, dtype=float) * 1000
+    if not len(values):
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"n": int(len(values)), "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(values.max())}
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge multi-sessions de l'app Streamlit")
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions simultanées")
+    parser.add_argument("--rounds", type=int, default=3, help="Tours de scénario par session")
+    parser.add_argument("--players", type=int, default=12, help="Joueurs du classeur synthétique")
+    parser.add_argument("--journees", type=int, default=20, help="Journées du classeur synthétique")
+    parser.add_argument("--events", type=int, default=20000, help="Événements Tracking du classeur synthétique")
+    parser.add_argument("--timeout", type=float, default=300, help="Délai maximal d'un rerun (s)")
+    parser.add_argument("--json", help="Écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hub-load-")
+    xlsx = os.path.join(workdir, "workbook.xlsx")
+    build_workbook(xlsx, args.players, args.journees, args.events)
+    server, url = serve_file(xlsx)
+    registry = os.path.join(workdir, "sources.json")
+    Path(registry).write_text(json.dumps([{"source": "Synthétique", "season": "2025-2026", "url": url}]), encoding="utf-8")
+    # Lu à l'import de hub.sources, avant la première exécution du script
+    os.environ["HUB_SOURCES"] = registry
+    print(f"▶ {args.sessions} session(s) × {args.rounds} tour(s) • classeur {Path(xlsx).stat().st_size / 1e6:.1f} Mo servi sur {url}")
+
+    samples, errors = [], []
+    def worker(i):
+        try:
+            run_session(i, args.rounds, args.timeout, samples)
+        except Exception as e:  # une session en échec ne doit pas arrêter les autres
+            errors.append(f"session {i}: {e!r}")
+    t0 = time.perf_counter()
+    with MemoryMonitor() as memory:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - t0
+    server.shutdown()
+
+    by_action = {}
+    for action, secs, _ in samples:
+        by_action.setdefault(action, []).append(secs)
+    report = {
+        "sessions": args.sessions, "rounds": args.rounds, "wall_s": wall,
+        "reruns": percentiles([s for _, s, _ in samples]),
+        "by_action": {action: percentiles(v) for action, v in by_action.items()},
+        "script_exceptions": int(sum(n for _, _, n in samples)),
+        "session_errors": errors,
+        "rss_start_mb": memory.start / 1024 / 1024, "rss_peak_mb": memory.peak / 1024 / 1024,
+    }
+    print(f"\n{'Action':<12} {'n':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+    for action, stats in [("tous", report["reruns"])] + list(report["by_action"].items()):
+        if stats["n"]:
+            print(f"{action:<12} {stats['n']:>5} {stats['p50_ms']:>10.0f} {stats['p95_ms']:>10.0f} {stats['p99_ms']:>10.0f}")
+    print(f"\nTemps mur {wall:.1f}s • RSS {report['rss_start_mb']:.0f} → pic {report['rss_peak_mb']:.0f} Mo"
+          f" • exceptions script {report['script_exceptions']} • sessions en échec {len(errors)}")
+    for err in errors:
+        print(f"  {err}", file=sys.stderr)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if errors or report["script_exceptions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())